@@ -0,0 +1,256 @@
+# benchmarks/bench_services.py
+# 서비스 진입점 지연 시간 벤치마크 - data/ 분포를 따라 N 배로 생성한 카탈로그를 init_db 로 적재한 뒤 측정한다
+# 주의: 설정된 DB(DB_NAME 등)의 카탈로그를 덮어쓴다. 끝나면 data/ 를 다시 적재한다 (--keep-data 면 그대로 둔다)
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import csv
+import json
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+
+from scripts.bulk_load import BASE_PATH, DATA_DIR
+from scripts.generate_data import generate
+
+DEFAULT_SCALES = (1, 100, 10000)
+RESULTS_DIR = os.path.join(BASE_PATH, 'benchmarks', 'results')
+PERCENTILES = (50, 95, 99)
+
+BENCH_USER = ('bench_user', 'bench_password', '우유')
+
+def load_catalog(data_dir):
+    """scripts/init_db.py 와 같은 순서로 적재 -> 소요 시간(초)"""
+    from scripts.init_db import init_database, init_cooking_step_table
+    start = time.perf_counter()
+    init_database(data_dir)
+    init_cooking_step_table(data_dir)
+    return time.perf_counter() - start
+
+
+def _sample_inputs(data_dir, seed):
+    """호출마다 돌려 쓸 인자 후보 (실제 적재된 이름/ID 중에서 뽑는다)"""
+    rng = random.Random(seed)
+
+    def column(file_name, name, limit=2000):
+        with open(os.path.join(data_dir, file_name), newline='', encoding='utf-8-sig') as f:
+            values = [row[name] for row in csv.DictReader(f) if row[name].strip()]
+        return rng.sample(values, min(limit, len(values)))
+
+    return {
+        'recipe_names': column('Recipe.csv', 'recipeName'),
+        'recipe_ids': [int(float(value)) for value in column('Recipe.csv', 'recipeID')],
+        'ingredient_names': column('IngredientName.csv', 'name'),
+        'allergies': ['새우,우유', '두부', '돼지고기, 달걀, 밀가루', '땅콩', '우유, 밀가루'],
+        'budgets': [1000, 3000, 5000, 10000, 50000],
+        'quarters': [1, 2, 3, 4],
+    }
+
+
+def entry_points(inputs, rng):
+    """(이름, 준비 함수, 측정할 함수) 목록 - 준비 함수는 측정 구간 밖에서 실행된다"""
+    from services.price_service import PriceService
+    from services.recipe_detail_service import RecipeDetailService
+    from services.recipe_service import RecipeService
+    from services.user_service import UserService
+
+    def pick(name):
+        return rng.choice(inputs[name])
+
+    def no_setup():
+        return None
+
+    def cold_detail():
+        RecipeDetailService.invalidate_cache()
+
+    return [
+        ('RecipeService.search_recipes_by_budget', no_setup,
+         lambda: RecipeService.search_recipes_by_budget(pick('budgets'), pick('quarters'), rng.randint(1, 5))),
+        ('RecipeService.search_recipes_by_allergy', no_setup,
+         lambda: RecipeService.search_recipes_by_allergy(pick('allergies'), pick('quarters'), rng.randint(1, 5))),
+        ('RecipeService.get_all_recipes', no_setup,
+         lambda: RecipeService.get_all_recipes(pick('quarters'), rng.randint(1, 5))),
+        ('PriceService.get_ingredient_price_by_quarter', no_setup,
+         lambda: PriceService.get_ingredient_price_by_quarter(pick('ingredient_names'))),
+        ('PriceService.get_recipe_price_by_quarter', no_setup,
+         lambda: PriceService.get_recipe_price_by_quarter(pick('recipe_names'))),
+        ('PriceService.analyze_price_trend', no_setup,
+         lambda: PriceService.analyze_price_trend(recipe_name=pick('recipe_names'))),
+        ('RecipeDetailService.get_recipe_details', cold_detail,
+         lambda: RecipeDetailService.get_recipe_details(pick('recipe_ids'))),
+        ('RecipeDetailService.get_recipe_details (cached)', no_setup,
+         lambda: RecipeDetailService.get_recipe_details(inputs['recipe_ids'][0])),
+        ('UserService.login', no_setup,
+         lambda: UserService.login(BENCH_USER[0], BENCH_USER[1])),
+    ]
+
+
+def percentile(sorted_values, pct):
+    """nearest-rank 백분위수"""
+    if not sorted_values:
+        return None
+    rank = max(int(-(-pct * len(sorted_values) // 100)), 1)
+    return sorted_values[rank - 1]
+
+
+def measure(setup, func, iterations, warmup):
+    """func 를 iterations 번 호출 -> 지연 시간 통계 (ms)"""
+    for _ in range(warmup):
+        setup()
+        func()
+    latencies = []
+    errors = 0
+    busy = 0.0
+    for _ in range(iterations):
+        setup()
+        start = time.perf_counter()
+        try:
+            func()
+        except Exception:
+            errors += 1
+        elapsed = time.perf_counter() - start
+        busy += elapsed
+        latencies.append(elapsed * 1000)
+    latencies.sort()
+    stats = {f'p{pct}_ms': percentile(latencies, pct) for pct in PERCENTILES}
+    stats.update({
+        'calls': iterations,
+        'errors': errors,
+        'mean_ms': sum(latencies) / len(latencies) if latencies else None,
+        'max_ms': latencies[-1] if latencies else None,
+        'throughput_per_sec': iterations / busy if busy > 0 else None,
+    })
+    return stats
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_PATH,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(scales, iterations, warmup, backend, seed, work_dir=None, keep_data=False):
+    """배수별로 카탈로그 생성 -> 적재 -> 진입점 측정 -> 결과 딕셔너리"""
+    from database.backend import set_backend
+    from database.events import notify_data_reload
+    from database.instrumentation import get_caller_stats, reset_query_stats
+    from database.statements import get_statement_totals, reset_statement_stats
+    from services.user_service import UserService
+
+    results = []
+    temporary = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix='recipe_bench_')
+    try:
+        for scale in scales:
+            data_dir = os.path.join(work_dir, f'x{scale}')
+            print(f"\n=== {scale}배 카탈로그 ===")
+            start = time.perf_counter()
+            rows = generate(data_dir, scale=scale, seed=seed)
+            generate_seconds = time.perf_counter() - start
+            print(f"생성: {sum(rows.values()):,}행, {generate_seconds:.2f}초")
+
+            load_seconds = None
+            if backend == 'memory':
+                from database.memory_engine import MemoryEngine
+                start = time.perf_counter()
+                set_backend(MemoryEngine(data_dir))
+                load_seconds = time.perf_counter() - start
+                notify_data_reload()
+            else:
+                set_backend(None)
+                load_seconds = load_catalog(data_dir)
+            print(f"적재: {load_seconds:.2f}초")
+
+            UserService.register_user(*BENCH_USER)
+            reset_query_stats()
+            reset_statement_stats()
+            rng = random.Random(seed)
+            inputs = _sample_inputs(data_dir, seed)
+            for name, setup, func in entry_points(inputs, rng):
+                stats = measure(setup, func, iterations, warmup)
+                stats.update({'scale': scale, 'entry_point': name})
+                results.append(stats)
+                print(f"{name:50s} p50 {stats['p50_ms']:8.3f}ms  p95 {stats['p95_ms']:8.3f}ms  "
+                      f"p99 {stats['p99_ms']:8.3f}ms  {stats['throughput_per_sec']:10.1f}회/초")
+
+            # 측정 구간 동안 서비스 메서드별 DB 시간과 준비된 문장 재사용 횟수 (PostgreSQL 백엔드만)
+            results.append({'scale': scale, 'entry_point': None, 'rows': rows,
+                            'generate_seconds': generate_seconds, 'load_seconds': load_seconds,
+                            'queries': get_caller_stats(), 'statements': get_statement_totals()})
+            shutil.rmtree(data_dir, ignore_errors=True)
+    finally:
+        if backend != 'memory' and not keep_data:
+            print("\ndata/ 다시 적재")
+            load_catalog(DATA_DIR)
+        if temporary:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'backend': backend,
+            'scales': list(scales),
+            'iterations': iterations,
+            'warmup': warmup,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def compare(previous, current, threshold=0.1):
+    """이전 결과 대비 p50/p95 변화 출력 -> threshold 이상 느려진 항목 수"""
+    before = {(r['scale'], r['entry_point']): r for r in previous['results'] if r.get('entry_point')}
+    regressions = 0
+    print(f"\n=== 비교 (이전 {previous['meta'].get('revision')} -> 현재 {current['meta'].get('revision')}) ===")
+    for result in current['results']:
+        old = before.get((result['scale'], result.get('entry_point')))
+        if not result.get('entry_point') or not old:
+            continue
+        line = []
+        for key in ('p50_ms', 'p95_ms'):
+            change = (result[key] - old[key]) / old[key] if old[key] else 0.0
+            if change >= threshold:
+                regressions += 1
+            line.append(f"{key[:3]} {change:+7.1%}")
+        print(f"{result['scale']:>6}배 {result['entry_point']:50s} {'  '.join(line)}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="서비스 진입점 지연 시간 벤치마크")
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help="data/ 대비 배수 목록 (쉼표 구분)")
+    parser.add_argument('--iterations', type=int, default=200, help="진입점별 측정 호출 수")
+    parser.add_argument('--warmup', type=int, default=10, help="측정 전 예열 호출 수")
+    parser.add_argument('--backend', choices=['postgres', 'memory'], default='postgres')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--work-dir', help="생성한 CSV 를 둘 디렉터리 (기본: 임시 디렉터리)")
+    parser.add_argument('--output', help="결과 JSON 경로 (기본: benchmarks/results/<시각>.json)")
+    parser.add_argument('--compare', help="비교할 이전 결과 JSON")
+    parser.add_argument('--keep-data', action='store_true', help="끝난 뒤 data/ 를 다시 적재하지 않는다")
+    args = parser.parse_args()
+
+    scales = [int(scale) for scale in args.scales.split(',') if scale.strip()]
+    report = run(scales, args.iterations, args.warmup, args.backend, args.seed,
+                 args.work_dir, args.keep_data)
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime('%Y%m%d-%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(json.load(f), report)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,275 @@
+# benchmarks/load_test.py
+# 요청 기록(JSONL)을 서비스 계층에 다시 보내는 부하 테스트 - 동시성/도착률을 정해 재생하고 연산별 지연 시간과 오류율을 낸다
+# 한 줄 = 연산 하나: {"t": 도착 시각(초), "op": "RecipeService.search_recipes_by_budget", "args": {...}}
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.bench_services import BENCH_USER, PERCENTILES, _sample_inputs, percentile
+from scripts.bulk_load import DATA_DIR
+
+# 합성 기록의 연산 비율 - 목록 검색과 상세 보기가 대부분이고 가격/로그인은 가끔
+DEFAULT_MIX = {
+    'RecipeService.search_recipes_by_budget': 25,
+    'RecipeService.search_recipes_by_allergy': 15,
+    'RecipeService.get_all_recipes': 10,
+    'RecipeDetailService.get_recipe_details': 25,
+    'RecipeDetailService.get_recipe_details_many': 5,
+    'PriceService.get_ingredient_price_by_quarter': 5,
+    'PriceService.get_recipe_price_by_quarter': 5,
+    'PriceService.analyze_price_trend': 5,
+    'UserService.login': 5,
+}
+NEXT_PAGE_PROBABILITY = 0.3   # 목록 검색 뒤 다음 페이지를 보는 비율
+
+
+def operations():
+    """기록에 쓸 수 있는 연산 이름 -> 함수 (이 목록에 없는 연산은 재생하지 않는다)"""
+    from services.price_service import PriceService
+    from services.recipe_detail_service import RecipeDetailService
+    from services.recipe_service import RecipeService
+    from services.user_service import UserService
+
+    return {
+        'RecipeService.search_recipes_by_budget': RecipeService.search_recipes_by_budget,
+        'RecipeService.search_recipes_by_allergy': RecipeService.search_recipes_by_allergy,
+        'RecipeService.get_all_recipes': RecipeService.get_all_recipes,
+        'RecipeService.search_recipes_by_budget_cursor': RecipeService.search_recipes_by_budget_cursor,
+        'RecipeService.search_recipes_by_allergy_cursor': RecipeService.search_recipes_by_allergy_cursor,
+        'RecipeService.get_all_recipes_cursor': RecipeService.get_all_recipes_cursor,
+        'RecipeDetailService.get_recipe_details': RecipeDetailService.get_recipe_details,
+        'RecipeDetailService.get_recipe_details_many': RecipeDetailService.get_recipe_details_many,
+        'PriceService.get_ingredient_price_by_quarter': PriceService.get_ingredient_price_by_quarter,
+        'PriceService.get_recipe_price_by_quarter': PriceService.get_recipe_price_by_quarter,
+        'PriceService.analyze_price_trend': PriceService.analyze_price_trend,
+        'UserService.login': UserService.login,
+        'UserService.register_user': UserService.register_user,
+    }
+
+
+def synthesize(path, count=10000, rate=100.0, mix=None, data_dir=DATA_DIR, seed=42):
+    """실제 적재된 이름/ID 로 합성 기록 생성 -> 쓴 줄 수
+    도착 간격은 평균 1/rate 초의 지수 분포 (포아송 도착)"""
+    rng = random.Random(seed)
+    inputs = _sample_inputs(data_dir, seed)
+    mix = mix or DEFAULT_MIX
+    ops, weights = zip(*mix.items())
+
+    def pick(name):
+        return rng.choice(inputs[name])
+
+    def args_for(op):
+        if op == 'RecipeService.search_recipes_by_budget':
+            return {'budget': pick('budgets'), 'quarter': pick('quarters'), 'page': 1}
+        if op == 'RecipeService.search_recipes_by_allergy':
+            return {'allergy': pick('allergies'), 'quarter': pick('quarters'), 'page': 1}
+        if op == 'RecipeService.get_all_recipes':
+            return {'quarter': pick('quarters'), 'page': 1}
+        if op == 'RecipeDetailService.get_recipe_details':
+            return {'recipe_id': pick('recipe_ids')}
+        if op == 'RecipeDetailService.get_recipe_details_many':
+            return {'recipe_ids': rng.sample(inputs['recipe_ids'], min(10, len(inputs['recipe_ids'])))}
+        if op == 'PriceService.get_ingredient_price_by_quarter':
+            return {'ingredient_name': pick('ingredient_names'), 'quarter': rng.choice([None] + inputs['quarters'])}
+        if op == 'PriceService.get_recipe_price_by_quarter':
+            return {'recipe_name': pick('recipe_names'), 'quarter': rng.choice([None] + inputs['quarters'])}
+        if op == 'PriceService.analyze_price_trend':
+            if rng.random() < 0.5:
+                return {'ingredient_name': pick('ingredient_names')}
+            return {'recipe_name': pick('recipe_names')}
+        if op == 'UserService.login':
+            return {'username': BENCH_USER[0], 'password': BENCH_USER[1]}
+        raise ValueError(f"합성할 수 없는 연산입니다: {op}")
+
+    t = 0.0
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        def write(op, args):
+            nonlocal written
+            f.write(json.dumps({'t': round(t, 6), 'op': op, 'args': args}, ensure_ascii=False) + '\n')
+            written += 1
+
+        # 로그인 연산이 성공하도록 첫 줄에서 사용자를 만든다 (이미 있으면 그대로)
+        write('UserService.register_user',
+              {'username': BENCH_USER[0], 'password': BENCH_USER[1], 'allergy': BENCH_USER[2]})
+        while written < count:
+            op = rng.choices(ops, weights)[0]
+            args = args_for(op)
+            write(op, args)
+            # 같은 사용자가 이어서 다음 페이지를 넘기는 경우
+            page = args.get('page')
+            while page and written < count and rng.random() < NEXT_PAGE_PROBABILITY:
+                page += 1
+                t += rng.expovariate(rate) if rate > 0 else 0.0
+                write(op, dict(args, page=page))
+            t += rng.expovariate(rate) if rate > 0 else 0.0
+    return written
+
+
+def read_trace(path, limit=None):
+    """기록 파일 -> 연산 목록 (빈 줄/주석(#) 무시)"""
+    entries = []
+    with open(path, encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                entry = json.loads(line)
+                entries.append({'t': float(entry.get('t', 0.0)), 'op': entry['op'], 'args': entry.get('args') or {}})
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path}:{line_no}: 잘못된 기록 줄입니다 ({e})")
+            if limit and len(entries) >= limit:
+                break
+    return entries
+
+
+class _Results:
+    """연산별 지연 시간/오류 수집 (스레드 안전)"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)   # 예정 시각부터 끝날 때까지 (대기 포함)
+        self.service = defaultdict(list)     # 실제 호출 시간
+        self.errors = defaultdict(int)
+        self.error_samples = {}
+
+    def add(self, op, latency_ms, service_ms, error=None):
+        with self._lock:
+            self.latencies[op].append(latency_ms)
+            self.service[op].append(service_ms)
+            if error is not None:
+                self.errors[op] += 1
+                self.error_samples.setdefault(op, repr(error)[:200])
+
+
+def _summary(latencies, service, errors):
+    latencies = sorted(latencies)
+    service = sorted(service)
+    summary = {
+        'calls': len(latencies),
+        'errors': errors,
+        'error_rate': errors / len(latencies) if latencies else 0.0,
+        'mean_ms': sum(latencies) / len(latencies) if latencies else None,
+        'max_ms': latencies[-1] if latencies else None,
+    }
+    summary.update({f'p{pct}_ms': percentile(latencies, pct) for pct in PERCENTILES})
+    summary.update({f'service_p{pct}_ms': percentile(service, pct) for pct in PERCENTILES})
+    return summary
+
+
+def replay(entries, concurrency=16, rate=None, speed=1.0, warmup=0):
+    """기록 재생 -> 보고서 딕셔너리
+    rate 를 주면 초당 rate 개를 일정 간격으로, 아니면 기록의 t 를 speed 배로 당겨 보낸다 (speed=0 이면 최대한 빨리)
+    지연 시간은 예정 시각부터 재므로 서버가 밀리면 대기 시간이 그대로 드러난다"""
+    table = operations()
+    unknown = sorted({entry['op'] for entry in entries} - set(table))
+    if unknown:
+        raise ValueError(f"알 수 없는 연산입니다: {', '.join(unknown)}")
+
+    for entry in entries[:warmup]:
+        try:
+            table[entry['op']](**entry['args'])
+        except Exception:
+            pass
+    entries = entries[warmup:]
+
+    results = _Results()
+    base_t = entries[0]['t'] if entries else 0.0
+
+    # 최대 속도(닫힌 루프)일 때는 실행 중인 연산이 concurrency 개를 넘지 않게 제출한다
+    closed_loop = not rate and not speed
+    slots = threading.Semaphore(concurrency)
+
+    def run(entry, scheduled):
+        start = time.perf_counter()
+        error = None
+        try:
+            table[entry['op']](**entry['args'])
+        except Exception as e:
+            error = e
+        finally:
+            end = time.perf_counter()
+            if closed_loop:
+                slots.release()
+        results.add(entry['op'], (end - scheduled) * 1000, (end - start) * 1000, error)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='load') as executor:
+        for index, entry in enumerate(entries):
+            if closed_loop:
+                slots.acquire()
+                scheduled = time.perf_counter()
+            else:
+                offset = index / rate if rate else (entry['t'] - base_t) / speed
+                scheduled = started + offset
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            executor.submit(run, entry, scheduled)
+    elapsed = time.perf_counter() - started
+
+    per_op = {op: _summary(results.latencies[op], results.service[op], results.errors[op])
+              for op in sorted(results.latencies)}
+    all_latencies = [value for values in results.latencies.values() for value in values]
+    all_service = [value for values in results.service.values() for value in values]
+    total = _summary(all_latencies, all_service, sum(results.errors.values()))
+    total.update({'elapsed_seconds': elapsed,
+                  'throughput_per_sec': len(all_latencies) / elapsed if elapsed > 0 else None})
+    return {'total': total, 'operations': per_op, 'error_samples': results.error_samples}
+
+
+def print_report(report):
+    print(f"\n{'연산':50s} {'호출':>7s} {'오류율':>7s} {'p50':>9s} {'p95':>9s} {'p99':>9s}")
+    rows = list(report['operations'].items()) + [('전체', report['total'])]
+    for op, stats in rows:
+        print(f"{op:50s} {stats['calls']:7d} {stats['error_rate']:7.2%} "
+              f"{stats['p50_ms']:8.2f}ms {stats['p95_ms']:8.2f}ms {stats['p99_ms']:8.2f}ms")
+    total = report['total']
+    print(f"\n{total['elapsed_seconds']:.2f}초, {total['throughput_per_sec']:.1f}회/초")
+    for op, sample in report['error_samples'].items():
+        print(f"[오류 예] {op}: {sample}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="요청 기록 재생 부하 테스트")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    synth = commands.add_parser('synthesize', help="실제 연산 비율을 흉내 낸 합성 기록 생성")
+    synth.add_argument('output', help="기록 JSONL 경로")
+    synth.add_argument('--count', type=int, default=10000, help="연산 수")
+    synth.add_argument('--rate', type=float, default=100.0, help="평균 도착률 (초당 연산 수, 0 이면 t 가 모두 0)")
+    synth.add_argument('--mix', help="연산 비율 JSON (예: '{\"UserService.login\": 1}'), 기본은 DEFAULT_MIX")
+    synth.add_argument('--data-dir', default=DATA_DIR, help="이름/ID 를 뽑을 CSV 디렉터리 (DB 에 적재된 것과 같아야 한다)")
+    synth.add_argument('--seed', type=int, default=42)
+
+    play = commands.add_parser('replay', help="기록을 서비스 계층에 재생")
+    play.add_argument('trace', help="기록 JSONL 경로")
+    play.add_argument('--concurrency', type=int, default=16, help="동시에 실행할 연산 수 (스레드 수)")
+    play.add_argument('--rate', type=float, help="초당 연산 수 (주면 기록의 t 대신 일정 간격)")
+    play.add_argument('--speed', type=float, default=1.0, help="기록 시각 배속 (0 이면 기다리지 않고 보낸다)")
+    play.add_argument('--limit', type=int, help="앞에서부터 이 수만큼만 재생")
+    play.add_argument('--warmup', type=int, default=0, help="측정 전에 순서대로 실행할 앞부분 연산 수")
+    play.add_argument('--output', help="보고서 JSON 경로")
+    args = parser.parse_args()
+
+    if args.command == 'synthesize':
+        mix = json.loads(args.mix) if args.mix else None
+        written = synthesize(args.output, args.count, args.rate, mix, args.data_dir, args.seed)
+        print(f"{args.output}: {written:,}개 연산")
+    else:
+        entries = read_trace(args.trace, args.limit)
+        report = replay(entries, args.concurrency, args.rate, args.speed, args.warmup)
+        print_report(report)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"보고서 저장: {args.output}")
+        sys.exit(1 if report['total']['errors'] else 0)
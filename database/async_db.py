@@ -0,0 +1,89 @@
+# async_db.py
+# asyncio 용 커넥션 풀 (asyncpg) - 동기 풀(db_connector)과 같은 접속 정보와 쿼리 문자열(%s 인자)을 쓴다
+import asyncio
+import os
+import time
+from functools import lru_cache
+
+import asyncpg
+
+from database.db_connector import DB_CONFIG, POOL_MIN_SIZE, POOL_TIMEOUT
+from database.instrumentation import caller_name, normalize, recorder
+from database.statements import to_server_params
+
+# 이벤트 루프 하나가 수백 개의 세션을 처리하므로 동기 풀보다 크게 둔다
+ASYNC_POOL_MAX_SIZE = int(os.environ.get('DB_ASYNC_POOL_MAX_SIZE', 20))
+# asyncpg 는 커넥션마다 준비된 문장을 캐시한다 (database/statements.py 와 같은 역할)
+ASYNC_STATEMENT_CACHE_SIZE = int(os.environ.get('DB_ASYNC_STATEMENT_CACHE_SIZE', 256))
+
+_pools = {}   # 이벤트 루프 -> 풀 (asyncpg 풀은 만든 루프에서만 쓸 수 있다)
+
+
+@lru_cache(maxsize=1024)
+def to_asyncpg(query):
+    """psycopg2 형식(%s) 쿼리 -> asyncpg 형식($1, $2, ...) 쿼리"""
+    converted, _ = to_server_params(query)
+    if converted is None:
+        raise ValueError(f"이름 인자(%(name)s)는 지원하지 않습니다: {normalize(query)[:80]}")
+    return converted
+
+
+async def get_async_pool():
+    """현재 이벤트 루프의 공용 풀 (처음 호출할 때 만든다)"""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = await asyncpg.create_pool(
+            host=DB_CONFIG['host'],
+            port=DB_CONFIG['port'],
+            database=DB_CONFIG['dbname'],
+            user=DB_CONFIG['user'],
+            password=DB_CONFIG['password'] or None,
+            min_size=POOL_MIN_SIZE,
+            max_size=ASYNC_POOL_MAX_SIZE,
+            timeout=POOL_TIMEOUT,
+            statement_cache_size=ASYNC_STATEMENT_CACHE_SIZE,
+        )
+        # 기다리는 동안 다른 코루틴이 먼저 만들었으면 그쪽을 쓴다
+        if _pools.setdefault(loop, pool) is not pool:
+            await pool.close()
+            pool = _pools[loop]
+    return pool
+
+
+async def fetch(query, params=()):
+    """조회 쿼리 실행 -> 행 튜플 목록 (동기 커서의 fetchall() 과 같은 모양)"""
+    pool = await get_async_pool()
+    caller = caller_name()
+    async with pool.acquire(timeout=POOL_TIMEOUT) as conn:
+        # 풀 대기 시간은 빼고 쿼리 시간만 잰다 (동기 커서 통계와 같은 기준)
+        start = time.perf_counter()
+        records = None
+        try:
+            records = await conn.fetch(to_asyncpg(query), *params)
+        finally:
+            if recorder.enabled:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                recorder.record(caller, normalize(query), params, elapsed_ms,
+                                len(records) if records is not None else -1, records is None)
+    return [tuple(record) for record in records]
+
+
+async def fetchval(query, params=()):
+    """첫 행의 첫 컬럼 (없으면 None)"""
+    rows = await fetch(query, params)
+    return rows[0][0] if rows else None
+
+
+async def close_async_pool():
+    """현재 이벤트 루프의 풀 닫기 (루프를 끝내기 전에 호출)"""
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
+
+
+def get_async_pool_stats():
+    """루프별 풀 크기/유휴 커넥션 수"""
+    return [{'size': pool.get_size(), 'idle': pool.get_idle_size(),
+             'min_size': pool.get_min_size(), 'max_size': pool.get_max_size()}
+            for pool in _pools.values()]
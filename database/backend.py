@@ -0,0 +1,39 @@
+# backend.py
+# 저장소 백엔드 선택 - 기본은 PostgreSQL, DB_BACKEND=memory 면 CSV 를 메모리에 올린 엔진으로 조회한다
+import os
+import threading
+
+BACKENDS = ('postgres', 'memory')
+
+_lock = threading.Lock()
+_backend = None
+_configured = False
+
+
+def _create_backend(name):
+    if name not in BACKENDS:
+        raise ValueError(f"DB_BACKEND 는 {BACKENDS} 중 하나여야 합니다: {name!r}")
+    if name == 'memory':
+        from database.memory_engine import MemoryEngine
+        return MemoryEngine(os.environ.get('DB_DATA_DIR') or None)
+    return None
+
+
+def get_backend():
+    """현재 백엔드 엔진 - PostgreSQL 이면 None 을 돌려주고 서비스는 SQL 경로를 그대로 쓴다"""
+    global _backend, _configured
+    if not _configured:
+        with _lock:
+            if not _configured:
+                _backend = _create_backend(os.environ.get('DB_BACKEND', 'postgres').lower())
+                _configured = True
+    return _backend
+
+
+def set_backend(backend):
+    """백엔드를 직접 지정 (None 이면 PostgreSQL) - 테스트나 읽기 전용 노드에서 사용"""
+    global _backend, _configured
+    with _lock:
+        _backend = backend
+        _configured = True
+    return backend
@@ -0,0 +1,336 @@
+# db_connector.py
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import extensions
+
+from database.instrumentation import InstrumentedCursor
+
+# 접속 정보는 환경 변수로 덮어쓸 수 있다
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'port': int(os.environ.get('DB_PORT', 5432)),
+    'dbname': os.environ.get('DB_NAME', 'postgres'),
+    'user': os.environ.get('DB_USER', 'postgres'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+}
+
+# 커넥션 풀 설정
+POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', 1))
+POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 10))
+POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))              # 대여 대기 최대 시간(초)
+POOL_IDLE_TIMEOUT = float(os.environ.get('DB_POOL_IDLE_TIMEOUT', 300))   # 유휴 커넥션 정리 기준(초)
+POOL_CHECK_INTERVAL = float(os.environ.get('DB_POOL_CHECK_INTERVAL', 30))  # 이 시간 이상 유휴였던 커넥션만 SELECT 1 검사
+
+
+class PoolExhaustedError(Exception):
+    """대기 시간 안에 커넥션을 대여하지 못한 경우"""
+
+
+class PoolMetrics:
+    """커넥션 풀 사용 통계"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.releases = 0
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.health_check_failures = 0
+            self.exhaustion_count = 0      # 모든 커넥션이 사용 중이라 대기해야 했던 횟수
+            self.timeouts = 0
+            self.total_wait_time = 0.0
+            self.max_wait_time = 0.0
+
+    def incr(self, name, value=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + value)
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_time += seconds
+            if seconds > self.max_wait_time:
+                self.max_wait_time = seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'releases': self.releases,
+                'connections_created': self.connections_created,
+                'connections_closed': self.connections_closed,
+                'health_check_failures': self.health_check_failures,
+                'exhaustion_count': self.exhaustion_count,
+                'timeouts': self.timeouts,
+                'total_wait_time': self.total_wait_time,
+                'avg_wait_time': self.total_wait_time / self.checkouts if self.checkouts else 0.0,
+                'max_wait_time': self.max_wait_time,
+            }
+
+
+class PooledConnection:
+    """풀에서 대여한 커넥션 래퍼 - close() 하면 실제로 닫지 않고 풀에 반환한다"""
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    @property
+    def raw(self):
+        return self._conn
+
+    @property
+    def closed(self):
+        return self._conn is None or self._conn.closed
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.putconn(conn)
+
+    def discard(self):
+        """커넥션을 풀에 되돌리지 않고 폐기"""
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.putconn(conn, discard=True)
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise psycopg2.InterfaceError("connection already returned to pool")
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self._conn is not None and not self._conn.closed:
+                if exc_type is None:
+                    self._conn.commit()
+                else:
+                    self._conn.rollback()
+        finally:
+            self.close()
+
+
+class ConnectionPool:
+    """최소/최대 크기가 있는 스레드 안전 커넥션 풀"""
+    def __init__(self, min_size=POOL_MIN_SIZE, max_size=POOL_MAX_SIZE, timeout=POOL_TIMEOUT,
+                 idle_timeout=POOL_IDLE_TIMEOUT, check_interval=POOL_CHECK_INTERVAL, **conn_kwargs):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("0 <= min_size <= max_size, max_size >= 1 이어야 합니다")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.check_interval = check_interval
+        self.conn_kwargs = conn_kwargs or dict(DB_CONFIG)
+        self.metrics = PoolMetrics()
+
+        self._cond = threading.Condition()
+        self._idle = deque()   # (conn, 마지막 반환 시각) - 최근 반환된 커넥션부터 재사용
+        self._size = 0         # 대여 중 + 유휴 커넥션 수
+        self._closed = False
+
+        for _ in range(min_size):
+            conn = self._connect()
+            self._idle.append((conn, time.monotonic()))
+            self._size += 1
+
+    def _connect(self):
+        # 커서는 기본으로 계측 커서 (database/instrumentation.py)
+        conn = psycopg2.connect(**{'cursor_factory': InstrumentedCursor, **self.conn_kwargs})
+        self.metrics.incr('connections_created')
+        return conn
+
+    def _close_conn(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self.metrics.incr('connections_closed')
+
+    def _is_healthy(self, conn, idle_since):
+        """대여 직전 커넥션 상태 확인 - 오래 쉬었던 커넥션만 왕복 검사"""
+        if conn.closed:
+            return False
+        if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if time.monotonic() - idle_since < self.check_interval:
+            return True
+        try:
+            with conn.cursor(cursor_factory=extensions.cursor) as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _reap_idle(self):
+        """idle_timeout 이 지난 유휴 커넥션을 min_size 까지 정리 (락 보유 상태에서 호출)"""
+        if self.idle_timeout is None:
+            return []
+        now = time.monotonic()
+        expired = []
+        # 가장 오래 쉰 커넥션은 deque 왼쪽에 있다
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+            conn, _ = self._idle.popleft()
+            self._size -= 1
+            expired.append(conn)
+        return expired
+
+    def getconn(self, timeout=None):
+        """커넥션 대여 - 풀이 가득 차면 반환될 때까지 대기"""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+
+        while True:
+            conn = idle_since = None
+            create = False
+            with self._cond:
+                if self._closed:
+                    raise psycopg2.InterfaceError("connection pool is closed")
+                expired = self._reap_idle()
+                while not self._idle and self._size >= self.max_size:
+                    if not waited:
+                        waited = True
+                        self.metrics.incr('exhaustion_count')
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.metrics.incr('timeouts')
+                        raise PoolExhaustedError(
+                            f"{timeout}초 안에 커넥션을 얻지 못했습니다 (max_size={self.max_size})")
+                    self._cond.wait(remaining)
+                    if self._closed:
+                        raise psycopg2.InterfaceError("connection pool is closed")
+                if self._idle:
+                    conn, idle_since = self._idle.pop()
+                else:
+                    self._size += 1
+                    create = True
+
+            for old in expired:
+                self._close_conn(old)
+
+            if create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_healthy(conn, idle_since):
+                self.metrics.incr('health_check_failures')
+                self._close_conn(conn)
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                continue
+
+            self.metrics.record_wait(time.monotonic() - start)
+            return PooledConnection(self, conn)
+
+    def putconn(self, conn, discard=False):
+        """커넥션 반환 - 진행 중인 트랜잭션은 롤백해서 돌려놓는다"""
+        self.metrics.incr('releases')
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            if discard or conn.closed or self._closed:
+                self._size -= 1
+                keep = False
+            else:
+                self._idle.append((conn, time.monotonic()))
+                keep = True
+            self._cond.notify()
+
+        if not keep:
+            self._close_conn(conn)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """with 문으로 커넥션 사용 - 정상 종료 시 commit, 예외 시 rollback 후 반환"""
+        conn = self.getconn(timeout)
+        with conn:
+            yield conn
+
+    def stats(self):
+        """현재 풀 상태 + 누적 통계"""
+        with self._cond:
+            size = self._size
+            idle = len(self._idle)
+        stats = self.metrics.snapshot()
+        stats.update({
+            'size': size,
+            'idle': idle,
+            'in_use': size - idle,
+            'min_size': self.min_size,
+            'max_size': self.max_size,
+        })
+        return stats
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            self._close_conn(conn)
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """프로세스 단위 공용 커넥션 풀 (fork 된 자식 프로세스는 새 풀을 만든다)"""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                _pool = ConnectionPool()
+                _pool_pid = os.getpid()
+    return _pool
+
+
+def get_connection():
+    """풀에서 커넥션 대여 - 사용 후 close() 하면 풀로 반환된다"""
+    return get_pool().getconn()
+
+
+@contextmanager
+def connection(timeout=None):
+    """with connection() as conn: 형태로 풀 커넥션 사용"""
+    with get_pool().connection(timeout) as conn:
+        yield conn
+
+
+def get_pool_metrics():
+    """풀 크기 조정을 위한 통계 (대기 시간, 대여 횟수, 고갈 횟수 등)"""
+    return get_pool().stats()
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
@@ -0,0 +1,111 @@
+# events.py
+# 데이터 재적재 알림 - 메모리 인덱스/캐시가 등록해 두면 scripts/init_db.py 가 적재 후 호출한다
+# 다른 프로세스(서버 등)는 적재 트랜잭션이 올린 data_version 을 확인해서 바뀐 테이블을 알게 된다
+import os
+import threading
+import time
+
+# data_version 확인 주기(초) - 메모리 인덱스는 조회 전에 확인하되 이 간격 안에서는 다시 묻지 않는다
+DATA_VERSION_CHECK_INTERVAL = float(os.environ.get('DATA_VERSION_CHECK_INTERVAL', 1.0))
+
+_listeners = []
+_lock = threading.Lock()
+
+_version_lock = threading.Lock()
+_seen_versions = None       # 마지막으로 확인한 {테이블: 버전} (None 이면 아직 확인하지 않음)
+_checked_at = None          # 마지막 확인 시각 (time.monotonic)
+
+
+def on_data_reload(callback):
+    """재적재 콜백 등록 - callback(tables) 형태, tables 가 None 이면 전체 재적재"""
+    with _lock:
+        if callback not in _listeners:
+            _listeners.append(callback)
+    return callback
+
+
+def notify_data_reload(tables=None):
+    """등록된 콜백 호출 - 하나가 실패해도 나머지는 계속 호출한다"""
+    with _lock:
+        listeners = list(_listeners)
+    for callback in listeners:
+        try:
+            callback(tables)
+        except Exception as e:
+            print(f"재적재 알림 처리 중 오류 발생: {e}")
+
+
+def touches(tables, names):
+    """재적재된 테이블 목록에 names 중 하나라도 있는지 (대소문자 무시)"""
+    if tables is None:
+        return True
+    reloaded = {t.lower() for t in tables}
+    return any(name.lower() in reloaded for name in names)
+
+
+def create_data_version_table(cur):
+    """테이블별 적재 버전 - 적재 트랜잭션이 올리고, 다른 프로세스는 이 값으로 재적재를 알아챈다"""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS data_version (
+            table_name VARCHAR(64) PRIMARY KEY,
+            version BIGINT NOT NULL
+        );
+    """)
+
+
+def bump_data_versions(cur, tables):
+    """적재 트랜잭션 안에서 호출 - 커밋되는 순간 다른 프로세스의 다음 확인에 보인다"""
+    cur.execute("""
+        INSERT INTO data_version (table_name, version)
+        SELECT DISTINCT lower(name), 1 FROM unnest(%s::TEXT[]) AS name
+        ON CONFLICT (table_name) DO UPDATE SET version = data_version.version + 1
+    """, (list(tables),))
+
+
+def _read_versions():
+    """data_version 조회 -> {테이블: 버전} (PostgreSQL 백엔드가 아니면 None)"""
+    from database.backend import get_backend
+    if get_backend():
+        return None   # 메모리 엔진은 다른 프로세스가 바꿀 수 없다
+    from database.db_connector import get_connection
+    conn = None
+    cur = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("SELECT table_name, version FROM data_version")
+        return dict(cur.fetchall())
+    except Exception as e:
+        print(f"data_version 확인 중 오류 발생: {e}")
+        if conn:
+            conn.rollback()
+        return None
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
+
+
+def check_data_versions(max_age=None):
+    """다른 프로세스가 재적재한 테이블이 있으면 이 프로세스의 인덱스/캐시에 notify_data_reload 로 알린다
+    메모리 인덱스는 스냅샷을 쓰기 전에 호출한다 - 마지막 확인이 max_age 초(기본 DATA_VERSION_CHECK_INTERVAL)
+    안이면 묻지 않고, 0 이면 매번 확인한다"""
+    global _seen_versions, _checked_at
+    max_age = DATA_VERSION_CHECK_INTERVAL if max_age is None else max_age
+    checked_at = _checked_at
+    if checked_at is not None and time.monotonic() - checked_at < max_age:
+        return
+    with _version_lock:
+        if _checked_at is not None and _checked_at != checked_at and time.monotonic() - _checked_at < max_age:
+            return   # 기다리는 동안 다른 스레드가 확인했다
+        versions = _read_versions()
+        _checked_at = time.monotonic()
+        if versions is None:
+            return
+        previous, _seen_versions = _seen_versions, versions
+    if previous is None:
+        return   # 첫 확인 - 아직 만든 스냅샷이 없다
+    changed = [table for table, version in versions.items() if previous.get(table) != version]
+    if changed:
+        notify_data_reload(changed)
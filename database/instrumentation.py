@@ -0,0 +1,287 @@
+# instrumentation.py
+# 쿼리 계측 - 풀 커넥션의 커서가 실행하는 모든 SQL 의 지연 시간/행 수/호출한 서비스 메서드를 모은다
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from functools import lru_cache
+
+from psycopg2 import extensions
+
+# 계측 설정 (환경 변수로 덮어쓸 수 있다)
+ENABLED = os.environ.get('DB_INSTRUMENT', '1') not in ('0', 'false', 'no')
+SLOW_QUERY_MS = float(os.environ.get('DB_SLOW_QUERY_MS', 100))          # 이 시간 이상이면 느린 쿼리 로그에 남긴다
+SLOW_LOG_SIZE = int(os.environ.get('DB_SLOW_LOG_SIZE', 200))            # 느린 쿼리 로그 최대 개수 (오래된 것부터 버림)
+EXPLAIN_SLOW = os.environ.get('DB_EXPLAIN_SLOW', '0') in ('1', 'true', 'yes')   # 느린 SELECT 의 실행 계획 수집
+
+# 히스토그램 구간 상한 (ms) - 마지막 구간은 무한대
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_WHITESPACE = re.compile(r'\s+')
+_READ_ONLY = re.compile(r'^\s*(SELECT|WITH)\b', re.IGNORECASE)
+# 실행 계획에 인자 값(비밀번호 등)이 그대로 찍히는 테이블 - 느린 쿼리여도 EXPLAIN 하지 않는다
+_SENSITIVE = re.compile(r'\busers\b', re.IGNORECASE)
+# 호출 위치를 찾을 때 건너뛰는 모듈 (계측/커넥션 코드 자신)
+_SKIP_MODULES = ('database.instrumentation', 'database.db_connector', 'database.statements', 'database.async_db',
+                 'psycopg2')
+
+
+@lru_cache(maxsize=1024)
+def normalize(query):
+    """통계 키로 쓸 쿼리 문자열 (공백을 하나로)"""
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', 'replace')
+    return _WHITESPACE.sub(' ', str(query)).strip()
+
+
+def caller_name(depth=1):
+    """쿼리를 실행한 서비스 메서드 이름 (예: RecipeService._search_by_budget, user_db.create_user)"""
+    frame = sys._getframe(depth)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if not module.startswith(_SKIP_MODULES):
+            code = frame.f_code
+            name = getattr(code, 'co_qualname', code.co_name)
+            if '.' not in name:
+                name = f"{module.rsplit('.', 1)[-1]}.{name}"
+            return name
+        frame = frame.f_back
+    return '<unknown>'
+
+
+def describe_params(params):
+    """느린 쿼리 로그에 남길 인자 요약 - 값은 남기지 않고 타입만 (비밀번호 같은 값이 로그에 남지 않도록)"""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: type(value).__name__ for key, value in params.items()}
+    return [type(value).__name__ for value in params]
+
+
+class QueryStats:
+    """(호출 메서드, 쿼리) 별 누적 통계"""
+    __slots__ = ('caller', 'query', 'calls', 'errors', 'rows', 'total_ms', 'min_ms', 'max_ms', 'buckets')
+
+    def __init__(self, caller, query):
+        self.caller = caller
+        self.query = query
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, elapsed_ms, rows, failed):
+        self.calls += 1
+        if failed:
+            self.errors += 1
+        if rows and rows > 0:
+            self.rows += rows
+        self.total_ms += elapsed_ms
+        self.min_ms = elapsed_ms if self.min_ms is None else min(self.min_ms, elapsed_ms)
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.buckets[bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+
+    def percentile(self, pct):
+        """히스토그램에서 구한 백분위수 (해당 구간의 상한값, 마지막 구간은 최댓값)"""
+        if not self.calls:
+            return None
+        rank = pct / 100 * self.calls
+        seen = 0
+        for pos, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return min(BUCKETS_MS[pos], self.max_ms) if pos < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self):
+        return {
+            'caller': self.caller,
+            'query': self.query,
+            'calls': self.calls,
+            'errors': self.errors,
+            'rows': self.rows,
+            'total_ms': self.total_ms,
+            'avg_ms': self.total_ms / self.calls if self.calls else 0.0,
+            'min_ms': self.min_ms,
+            'max_ms': self.max_ms,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'histogram': dict(zip([f'<={bound}ms' for bound in BUCKETS_MS] + [f'>{BUCKETS_MS[-1]}ms'],
+                                  self.buckets)),
+        }
+
+
+class QueryRecorder:
+    """쿼리 통계와 느린 쿼리 로그를 모으는 수집기 (스레드 안전)"""
+    def __init__(self, slow_query_ms=SLOW_QUERY_MS, slow_log_size=SLOW_LOG_SIZE, explain_slow=EXPLAIN_SLOW,
+                 enabled=ENABLED):
+        self.enabled = enabled
+        self.slow_query_ms = slow_query_ms
+        self.explain_slow = explain_slow
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._slow = deque(maxlen=slow_log_size)
+
+    def record(self, caller, query, params, elapsed_ms, rows, failed=False, plan=None):
+        key = (caller, query)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = QueryStats(caller, query)
+            stats.add(elapsed_ms, rows, failed)
+            if elapsed_ms >= self.slow_query_ms:
+                self._slow.append({
+                    'timestamp': time.time(),
+                    'caller': caller,
+                    'query': query,
+                    'params': describe_params(params),
+                    'elapsed_ms': elapsed_ms,
+                    'rows': rows,
+                    'failed': failed,
+                    'plan': plan,
+                })
+
+    def is_slow(self, elapsed_ms):
+        return elapsed_ms >= self.slow_query_ms
+
+    def stats(self, sort_by='total_ms'):
+        """쿼리별 통계 목록 (기본: 누적 시간이 큰 순)"""
+        with self._lock:
+            snapshots = [stats.snapshot() for stats in self._stats.values()]
+        return sorted(snapshots, key=lambda item: item[sort_by] or 0, reverse=True)
+
+    def by_caller(self):
+        """서비스 메서드별로 합친 통계 - 어떤 메서드가 DB 시간을 가장 많이 쓰는지"""
+        totals = {}
+        for item in self.stats():
+            total = totals.setdefault(item['caller'], {'caller': item['caller'], 'calls': 0, 'errors': 0,
+                                                       'rows': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            total['calls'] += item['calls']
+            total['errors'] += item['errors']
+            total['rows'] += item['rows']
+            total['total_ms'] += item['total_ms']
+            total['max_ms'] = max(total['max_ms'], item['max_ms'])
+        return sorted(totals.values(), key=lambda item: item['total_ms'], reverse=True)
+
+    def slow_queries(self):
+        with self._lock:
+            return list(self._slow)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+
+    def report(self, top=10):
+        """사람이 읽을 요약 문자열"""
+        lines = ["=== 쿼리 통계 (누적 시간 순) ==="]
+        for item in self.stats()[:top]:
+            lines.append(f"{item['caller']:45s} {item['calls']:7d}회  평균 {item['avg_ms']:8.3f}ms  "
+                         f"p95 {item['p95_ms']:8.3f}ms  최대 {item['max_ms']:8.3f}ms  누적 {item['total_ms']:10.1f}ms")
+            lines.append(f"    {item['query'][:120]}")
+        slow = self.slow_queries()
+        if slow:
+            lines.append(f"=== 느린 쿼리 {len(slow)}건 (>= {self.slow_query_ms}ms) ===")
+            for entry in slow[-top:]:
+                lines.append(f"{entry['elapsed_ms']:10.1f}ms  {entry['caller']}  {entry['query'][:100]}")
+        return '\n'.join(lines)
+
+
+recorder = QueryRecorder()
+
+
+class InstrumentedCursor(extensions.cursor):
+    """execute/executemany 시간을 recorder 에 기록하는 커서 (풀 커넥션의 기본 cursor_factory)"""
+
+    def execute(self, query, vars=None, label=None):
+        """label: 통계 키로 쓸 쿼리 (EXECUTE 문장 이름 대신 원래 쿼리로 모을 때)"""
+        if not recorder.enabled:
+            return super().execute(query, vars)
+        caller = caller_name()
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = super().execute(query, vars)
+            failed = False
+            return result
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            plan = None
+            if not failed and recorder.explain_slow and recorder.is_slow(elapsed_ms):
+                plan = self._explain(query, vars, label)
+            recorder.record(caller, normalize(label or query), vars, elapsed_ms, self.rowcount, failed, plan)
+
+    def executemany(self, query, vars_list):
+        if not recorder.enabled:
+            return super().executemany(query, vars_list)
+        caller = caller_name()
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = super().executemany(query, vars_list)
+            failed = False
+            return result
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            recorder.record(caller, normalize(query), None, elapsed_ms, self.rowcount, failed)
+
+    def _explain(self, query, vars, label=None):
+        """느린 SELECT 의 EXPLAIN (ANALYZE, BUFFERS) - 별도 커서와 savepoint 에서 실행해 원래 결과/트랜잭션에 영향이 없다"""
+        statement = normalize(label or query)
+        if not _READ_ONLY.match(statement):
+            return None   # ANALYZE 는 쿼리를 실제로 실행하므로 조회 쿼리만
+        if _SENSITIVE.search(statement):
+            return None
+        conn = self.connection
+        use_savepoint = not conn.autocommit
+        cur = conn.cursor(cursor_factory=extensions.cursor)
+        try:
+            if use_savepoint:
+                cur.execute("SAVEPOINT explain_slow_query")
+            cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + str(query), vars)
+            plan = '\n'.join(row[0] for row in cur.fetchall())
+            if use_savepoint:
+                cur.execute("RELEASE SAVEPOINT explain_slow_query")
+            return plan
+        except Exception as e:
+            if use_savepoint:
+                try:
+                    cur.execute("ROLLBACK TO SAVEPOINT explain_slow_query")
+                except Exception:
+                    pass
+            return f"EXPLAIN 실패: {e}"
+        finally:
+            cur.close()
+
+
+def get_query_stats(sort_by='total_ms'):
+    return recorder.stats(sort_by)
+
+
+def get_caller_stats():
+    return recorder.by_caller()
+
+
+def get_slow_queries():
+    return recorder.slow_queries()
+
+
+def reset_query_stats():
+    recorder.reset()
+
+
+def configure(enabled=None, slow_query_ms=None, explain_slow=None):
+    """실행 중에 계측 설정 변경"""
+    if enabled is not None:
+        recorder.enabled = enabled
+    if slow_query_ms is not None:
+        recorder.slow_query_ms = slow_query_ms
+    if explain_slow is not None:
+        recorder.explain_slow = explain_slow
@@ -0,0 +1,404 @@
+# memory_engine.py
+# CSV 를 컬럼 배열로 메모리에 올려 서비스 조회를 DB 없이 처리하는 엔진
+# 결과가 SQL 경로와 같도록 DECIMAL 컬럼은 Decimal 로 반올림하고, 문자열 정렬은 C collation(코드 포인트 순)을 따른다
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from decimal import Context, Decimal, ROUND_HALF_UP
+
+from database.events import on_data_reload, touches
+from scripts.bulk_load import DATA_DIR, LOAD_SPECS, key_positions, read_rows
+
+CENT = Decimal('0.01')
+ZERO = Decimal(0)
+_EXACT = Context(prec=1000)   # 자릿수 이동/곱셈에서 반올림이 일어나지 않도록
+
+# DECIMAL(10, 2) 컬럼 - 나머지 DECIMAL 컬럼은 자릿수 제한이 없다
+SCALED_COLUMNS = {('IngredientPrice', 'price'), ('RecipeIngredient_info', 'amount')}
+NUMERIC_COLUMNS = SCALED_COLUMNS | {('recipe_nutrition', column)
+                                   for column in ('calories', 'carbohydrate', 'protein', 'fat')}
+
+
+def to_numeric(value, scale=None):
+    """파이썬 값 -> PostgreSQL numeric 과 같은 Decimal (COPY/파라미터가 보내는 문자열 기준, 반올림은 0 에서 먼 쪽)"""
+    if value is None:
+        return None
+    number = Decimal(str(value))
+    return number.quantize(scale, rounding=ROUND_HALF_UP) if scale is not None else number
+
+
+def _scale(number):
+    return max(-number.as_tuple().exponent, 0)
+
+
+def _leading_digit(number):
+    """numeric 내부 표현(10000 진수)의 (최상위 자리 weight, 그 자리 값)"""
+    if not number:
+        return 0, 0
+    number = abs(number)
+    weight = number.adjusted() // 4
+    return weight, int(number.scaleb(-4 * weight, context=_EXACT))
+
+
+def numeric_div(dividend, divisor):
+    """PostgreSQL numeric 나눗셈 - 결과 자릿수(select_div_scale)와 반올림 방식을 그대로 따른다"""
+    weight1, first1 = _leading_digit(dividend)
+    weight2, first2 = _leading_digit(divisor)
+    qweight = weight1 - weight2 - (1 if first1 <= first2 else 0)
+    rscale = min(max(16 - qweight * 4, _scale(dividend), _scale(divisor), 0), 1000)
+
+    # 정수 나눗셈으로 rscale 자리까지 구한 뒤 반올림 (중간 반올림 없음)
+    a, b = dividend.as_tuple(), divisor.as_tuple()
+    numerator = int(''.join(map(str, a.digits))) * (-1 if a.sign else 1)
+    denominator = int(''.join(map(str, b.digits))) * (-1 if b.sign else 1)
+    if not denominator:
+        raise ZeroDivisionError("division by zero")
+    shift = a.exponent - b.exponent + rscale
+    if shift >= 0:
+        numerator *= 10 ** shift
+    else:
+        denominator *= 10 ** -shift
+    quotient, remainder = divmod(abs(numerator), abs(denominator))
+    if remainder * 2 >= abs(denominator):
+        quotient += 1
+    if (numerator < 0) != (denominator < 0):
+        quotient = -quotient
+    return Decimal(quotient).scaleb(-rscale, context=_EXACT)
+
+
+def _read_table(data_dir, table):
+    """CSV -> 키 기준으로 중복 제거한 행 목록 (같은 키는 뒤 행 우선, 키 순 - bulk_load 결과와 같다)"""
+    spec = LOAD_SPECS[table]
+    positions = key_positions(table)
+    names = [column for _, column, _ in spec['columns']]
+    numeric = [(table, column) in NUMERIC_COLUMNS for column in names]
+    scales = [CENT if (table, column) in SCALED_COLUMNS else None for column in names]
+    rows = {}
+    for row in read_rows(table, data_dir):
+        key = tuple(row[pos] for pos in positions)
+        if None in key:
+            continue
+        rows[key] = tuple(to_numeric(value, scale) if is_numeric else value
+                          for value, is_numeric, scale in zip(row, numeric, scales))
+    return [rows[key] for key in sorted(rows)]
+
+
+def _to_columns(table, rows):
+    """행 목록 -> {컬럼: 배열} (정수 컬럼은 array, 나머지는 list)"""
+    names = [column for _, column, _ in LOAD_SPECS[table]['columns']]
+    columns = {}
+    for pos, name in enumerate(names):
+        values = [row[pos] for row in rows]
+        if all(isinstance(value, int) for value in values):
+            columns[name] = array('q', values)
+        else:
+            columns[name] = values
+    return columns
+
+
+class MemoryEngine:
+    """읽기 전용 카탈로그 엔진 - RecipeService/PriceService/RecipeDetailService/user_db 의 조회를 대신 처리"""
+    def __init__(self, data_dir=None):
+        self.data_dir = data_dir or DATA_DIR
+        self._lock = threading.Lock()
+        self._users = []
+        self._tables = {}
+        self._snapshot = None
+        self.reload()
+        on_data_reload(self._on_reload)
+
+    # ---------- 적재 ----------
+
+    def reload(self, tables=None):
+        """CSV 를 다시 읽어 새 스냅샷으로 교체 - 조회 중인 요청은 이전 스냅샷을 끝까지 쓴다"""
+        with self._lock:
+            loaded = dict(self._tables)
+            for table in LOAD_SPECS:
+                if table not in loaded or touches(tables, [table]):
+                    loaded[table] = _to_columns(table, _read_table(self.data_dir, table))
+            self._tables = loaded
+            self._snapshot = self._build(loaded)
+
+    def _on_reload(self, tables):
+        if touches(tables, LOAD_SPECS):
+            self.reload(tables)
+
+    @staticmethod
+    def _build(tables):
+        """컬럼 배열 -> 조회용 인덱스"""
+        recipe = tables['Recipe']
+        recipe_names = dict(zip(recipe['recipeID'], recipe['recipeName']))
+        recipes_by_name = {}
+        for recipe_id, name in recipe_names.items():
+            recipes_by_name.setdefault(name, []).append(recipe_id)
+
+        ingredient = tables['IngredientName']
+        ingredient_names = dict(zip(ingredient['ingredientID'], ingredient['name']))
+        ingredients_by_name = {}
+        for ingredient_id, name in ingredient_names.items():
+            ingredients_by_name.setdefault(name, []).append(ingredient_id)
+
+        price = tables['IngredientPrice']
+        prices = {}
+        for ingredient_id, quarter, value in zip(price['ingredientID'], price['quarter'], price['price']):
+            prices.setdefault(ingredient_id, {})[quarter] = value
+
+        substitute = tables['IngredientSubstitute']
+        substitute_groups = dict(zip(substitute['ingredientID'], substitute['group_name']))
+
+        info = tables['RecipeIngredient_info']
+        recipe_ingredients = {}
+        for recipe_id, ingredient_id, amount in zip(info['recipeID'], info['ingredientID'], info['amount']):
+            recipe_ingredients.setdefault(recipe_id, []).append((ingredient_id, amount))
+
+        # 조리 단계: 레시피별 step_no 순 텍스트 튜플
+        method = tables['cooking_step']
+        cooking_steps = {}
+        for recipe_id, _, text in sorted(zip(method['recipe_id'], method['step_no'], method['text']),
+                                         key=lambda row: (row[0], row[1])):
+            cooking_steps.setdefault(recipe_id, []).append(text)
+        cooking_steps = {recipe_id: tuple(steps) for recipe_id, steps in cooking_steps.items()}
+
+        nutrition = tables['recipe_nutrition']
+        nutrition_rows = dict(zip(nutrition['recipe_id'], zip(nutrition['calories'], nutrition['carbohydrate'],
+                                                               nutrition['protein'], nutrition['fat'])))
+
+        # recipe_cost 와 같은 분기별 비용/상세 문자열 (재료명이 없는 재료는 빠진다)
+        # 재료 중 하나라도 가격이 있는 분기마다 만들고, 그 분기 가격이 없는 재료는 0원으로 넣는다
+        # 상세 문자열은 재료 ID 순 (RecipeIngredient_info 행이 키 순이다)
+        costs = {}
+        for recipe_id, items in recipe_ingredients.items():
+            quarters = sorted({quarter for ingredient_id, _ in items for quarter in prices.get(ingredient_id, {})})
+            per_quarter = {}
+            for ingredient_id, amount in items:
+                name = ingredient_names.get(ingredient_id)
+                if name is None:
+                    continue
+                priced = prices.get(ingredient_id, {})
+                for quarter in quarters:
+                    value = priced.get(quarter, ZERO)
+                    cost = amount * value
+                    entry = per_quarter.setdefault(quarter, [ZERO, []])
+                    entry[0] += cost
+                    entry[1].append(f"{name} ({amount}g × {value}원/g = {cost.quantize(CENT, ROUND_HALF_UP)}원)")
+            for quarter, (total, lines) in per_quarter.items():
+                costs.setdefault(quarter, {})[recipe_id] = (total.quantize(CENT, ROUND_HALF_UP),
+                                                            '\n   '.join(lines))
+
+        return {
+            'recipe_names': recipe_names,
+            'recipes_by_name': recipes_by_name,
+            'ingredient_names': ingredient_names,
+            'ingredients_by_name': ingredients_by_name,
+            'prices': prices,
+            'substitute_groups': substitute_groups,
+            'recipe_ingredients': recipe_ingredients,
+            'cooking_steps': cooking_steps,
+            'nutrition': nutrition_rows,
+            'costs': costs,
+            # 예산 검색: 분기별 (비용, ID) 오름차순 - 역방향으로 읽으면 비용 내림차순
+            'budget_keys': {quarter: sorted((total, recipe_id) for recipe_id, (total, _) in by_recipe.items())
+                            for quarter, by_recipe in costs.items()},
+            # 알레르기 검색: (이름, ID) 오름차순
+            'name_keys': sorted((name, recipe_id) for recipe_id, name in recipe_names.items()),
+            # 전체 조회: 분기별 (비용 또는 0, ID) 오름차순 - 처음 조회할 때 만든다
+            'all_keys': {},
+        }
+
+    # ---------- 레시피 검색 (RecipeService) ----------
+
+    @staticmethod
+    def _quarter_costs(snapshot, quarter):
+        return snapshot['costs'].get(quarter, {})
+
+    @staticmethod
+    def _page_descending(keys, end, limit, offset):
+        """keys[:end] 를 뒤에서부터 offset 만큼 건너뛰고 limit 개"""
+        end = max(end - offset, 0)
+        return keys[max(end - limit, 0):end][::-1]
+
+    def budget_rows(self, budget, quarter, limit, offset=0, seek=None):
+        """예산 이하 레시피 (ID, 이름, 비용, 상세) 비용 내림차순 -> (행 목록, 전체 일치 수)"""
+        snapshot = self._snapshot
+        keys = snapshot['budget_keys'].get(quarter, [])
+        costs = self._quarter_costs(snapshot, quarter)
+        matched = bisect_right(keys, (to_numeric(budget), float('inf')))
+        end = matched
+        if seek:
+            end = min(end, bisect_left(keys, (seek[0], seek[1])))
+            offset = 0
+        rows = [(recipe_id, snapshot['recipe_names'][recipe_id], total, costs[recipe_id][1])
+                for total, recipe_id in self._page_descending(keys, end, limit, offset)]
+        return rows, matched
+
+    def allergy_rows(self, quarter, excluded_ids, limit, offset=0, seek=None):
+        """제외 목록에 없는 레시피 (ID, 이름, 비용 또는 0, 상세) 이름순 -> 행 목록"""
+        snapshot = self._snapshot
+        keys = snapshot['name_keys']
+        costs = self._quarter_costs(snapshot, quarter)
+        excluded = set(excluded_ids)
+        start = 0
+        if seek:
+            start = bisect_right(keys, (seek[0], seek[1]))
+            offset = 0
+        rows = []
+        for name, recipe_id in keys[start:]:
+            if recipe_id in excluded:
+                continue
+            if offset:
+                offset -= 1
+                continue
+            total, detail = costs.get(recipe_id, (ZERO, None))
+            rows.append((recipe_id, name, total, detail))
+            if len(rows) >= limit:
+                break
+        return rows
+
+    def all_rows(self, quarter, limit, offset=0, seek=None):
+        """전체 레시피 (ID, 이름, 비용, 상세, 정렬 비용) 비용 내림차순 -> (행 목록, 전체 레시피 수)"""
+        snapshot = self._snapshot
+        costs = self._quarter_costs(snapshot, quarter)
+        keys = snapshot['all_keys'].get(quarter)
+        if keys is None:
+            keys = sorted((costs[recipe_id][0] if recipe_id in costs else ZERO, recipe_id)
+                          for recipe_id in snapshot['recipe_names'])
+            snapshot['all_keys'][quarter] = keys
+        end = len(keys)
+        if seek:
+            end = bisect_left(keys, (seek[0], seek[1]))
+            offset = 0
+        rows = []
+        for sort_cost, recipe_id in self._page_descending(keys, end, limit, offset):
+            total, detail = costs.get(recipe_id, (None, None))
+            rows.append((recipe_id, snapshot['recipe_names'][recipe_id], total, detail, sort_cost))
+        return rows, len(keys)
+
+    def allergen_source(self):
+        """알레르기 인덱스 원본 - (재료 목록, 레시피 ID 목록, (레시피 ID, 재료 ID) 목록)"""
+        snapshot = self._snapshot
+        ingredients = list(snapshot['ingredient_names'].items())
+        pairs = [(recipe_id, ingredient_id)
+                 for recipe_id, items in snapshot['recipe_ingredients'].items()
+                 for ingredient_id, _ in items]
+        return ingredients, sorted(snapshot['recipe_names']), pairs
+
+    # ---------- 가격 (PriceService) ----------
+
+    def price_source(self):
+        """가격 행렬 원본 - (레시피 목록, 레시피별 재료 사용량, 재료 가격, 재료 이름)"""
+        snapshot = self._snapshot
+        recipes = sorted(snapshot['recipe_names'].items())
+        amounts = [(recipe_id, ingredient_id, amount)
+                   for recipe_id, items in snapshot['recipe_ingredients'].items()
+                   for ingredient_id, amount in items]
+        prices = [(ingredient_id, quarter, price)
+                  for ingredient_id, by_quarter in snapshot['prices'].items()
+                  for quarter, price in by_quarter.items()]
+        return recipes, amounts, prices, list(snapshot['ingredient_names'].items())
+
+    def substitute_source(self):
+        """(재료 ID, 대체 그룹) 목록"""
+        return sorted(self._snapshot['substitute_groups'].items())
+
+    def ingredient_prices(self, ingredient_name, quarter=None):
+        """재료명의 (분기, 가격, 이름) 분기순"""
+        snapshot = self._snapshot
+        rows = []
+        for ingredient_id in snapshot['ingredients_by_name'].get(ingredient_name, ()):
+            for row_quarter, price in snapshot['prices'].get(ingredient_id, {}).items():
+                if not quarter or row_quarter == quarter:
+                    rows.append((row_quarter, price, ingredient_name))
+        rows.sort(key=lambda row: row[0])
+        return rows
+
+    def recipe_prices(self, recipe_name, quarter=None):
+        """레시피명의 (분기, 이름, 비용, 상세) 분기순"""
+        snapshot = self._snapshot
+        rows = []
+        for recipe_id in snapshot['recipes_by_name'].get(recipe_name, ()):
+            for row_quarter in sorted(snapshot['costs']):
+                if quarter and row_quarter != quarter:
+                    continue
+                cost = snapshot['costs'][row_quarter].get(recipe_id)
+                if cost is not None:
+                    rows.append((row_quarter, recipe_name, cost[0], cost[1]))
+        rows.sort(key=lambda row: row[0])
+        return rows
+
+    @staticmethod
+    def _with_change(rows):
+        """(이름, 분기, 가격) -> (이름, 분기, 가격, 직전 분기 대비 변동률) - SQL 의 LAG 계산과 같다"""
+        result = []
+        previous = None
+        for name, quarter, price in rows:
+            if previous is None:
+                change = 0
+            elif previous == 0:
+                # SQL 의 NULLIF(LAG, 0) 처럼 직전 가격이 0 이면 NULL
+                change = None
+            else:
+                change = _EXACT.multiply(numeric_div(price - previous, previous), 100)
+            result.append((name, quarter, price, change))
+            previous = price
+        return result
+
+    def ingredient_trend(self, ingredient_name):
+        return self._with_change([(name, quarter, price)
+                                  for quarter, price, name in self.ingredient_prices(ingredient_name)])
+
+    def recipe_trend(self, recipe_name):
+        """레시피명 기준 분기별 재료비 합계 (반올림 없이) 와 변동률"""
+        snapshot = self._snapshot
+        totals = {}
+        for recipe_id in snapshot['recipes_by_name'].get(recipe_name, ()):
+            for ingredient_id, amount in snapshot['recipe_ingredients'].get(recipe_id, ()):
+                for quarter, price in snapshot['prices'].get(ingredient_id, {}).items():
+                    totals[quarter] = totals.get(quarter, ZERO) + amount * price
+        return self._with_change([(recipe_name, quarter, totals[quarter]) for quarter in sorted(totals)])
+
+    # ---------- 상세 (RecipeDetailService) ----------
+
+    def recipe_details(self, recipe_ids):
+        """레시피 상세 행 (ID, 이름, 조리 단계 목록, 재료, 칼로리, 탄수화물, 단백질, 지방) - 없는 ID 는 빠진다"""
+        snapshot = self._snapshot
+        rows = []
+        for recipe_id in dict.fromkeys(recipe_ids):
+            name = snapshot['recipe_names'].get(recipe_id)
+            if name is None:
+                continue
+            names = sorted({snapshot['ingredient_names'][ingredient_id]
+                            for ingredient_id, _ in snapshot['recipe_ingredients'].get(recipe_id, ())
+                            if ingredient_id in snapshot['ingredient_names']})
+            steps = list(snapshot['cooking_steps'].get(recipe_id, ()))
+            nutrition = snapshot['nutrition'].get(recipe_id, (None,) * 4)
+            rows.append((recipe_id, name, steps, ', '.join(names) if names else None) + nutrition)
+        return rows
+
+    def search_source(self):
+        """(레시피 ID, 레시피명, 조리 단계 튜플) 목록 - 전문 검색 인덱스용"""
+        snapshot = self._snapshot
+        return [(recipe_id, name, snapshot['cooking_steps'].get(recipe_id, ()))
+                for recipe_id, name in sorted(snapshot['recipe_names'].items())]
+
+    def nutrition_source(self):
+        """(레시피 ID, 칼로리, 탄수화물, 단백질, 지방) 목록 - 식단 계획용"""
+        return [(recipe_id,) + values for recipe_id, values in sorted(self._snapshot['nutrition'].items())]
+
+    # ---------- 사용자 (user_db) ----------
+
+    def create_user(self, username, password, allergy):
+        """사용자 추가 -> user_id (이미 있으면 None) - 메모리에만 저장되어 재시작하면 사라진다"""
+        with self._lock:
+            if any(user[1] == username for user in self._users):
+                return None
+            user_id = len(self._users) + 1
+            self._users.append((user_id, username, password, allergy))
+            return user_id
+
+    def get_user_by_credentials(self, username, password):
+        with self._lock:
+            for user in self._users:
+                if user[1] == username and user[2] == password:
+                    return user
+        return None
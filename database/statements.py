@@ -0,0 +1,230 @@
+# statements.py
+# 자주 쓰는 서비스 쿼리를 풀 커넥션마다 한 번만 PREPARE 하고, 이후에는 EXECUTE 이름으로 실행한다
+# (쿼리 문자열 전송/파싱/분석을 건너뛰고 서버의 계획 캐시를 쓴다)
+import hashlib
+import os
+import threading
+import weakref
+
+from psycopg2 import errors, extensions
+
+from database.instrumentation import InstrumentedCursor, normalize
+
+ENABLED = os.environ.get('DB_PREPARED', '1') not in ('0', 'false', 'no')
+
+# EXECUTE 가 실패해도 다시 PREPARE 하면 되는 오류 (DISCARD ALL 로 지워짐, 스키마 변경으로 결과 형식이 바뀜)
+_STALE_ERRORS = (errors.InvalidSqlStatementName, errors.FeatureNotSupported)
+
+
+def to_server_params(query):
+    """psycopg2 형식(%s, %%) 쿼리 -> PREPARE 용 ($1, $2, ...) 쿼리와 인자 수
+    %(name)s 같은 이름 인자는 지원하지 않는다 (None 을 돌려주면 일반 실행)"""
+    parts = []
+    count = 0
+    pos = 0
+    while True:
+        found = query.find('%', pos)
+        if found < 0:
+            parts.append(query[pos:])
+            break
+        parts.append(query[pos:found])
+        marker = query[found + 1:found + 2]
+        if marker == 's':
+            count += 1
+            parts.append(f'${count}')
+        elif marker == '%':
+            parts.append('%')
+        else:
+            return None, 0
+        pos = found + 2
+    return ''.join(parts), count
+
+
+class Statement:
+    """등록된 쿼리 하나와 누적 통계"""
+    __slots__ = ('name', 'query', 'server_query', 'param_count', 'preparable',
+                 'prepares', 'executions', 'hits', 'fallbacks', 'errors')
+
+    def __init__(self, name, query):
+        self.name = name
+        self.query = normalize(query)
+        self.server_query, self.param_count = to_server_params(query)
+        self.preparable = self.server_query is not None
+        self.prepares = 0       # 커넥션별 PREPARE 횟수
+        self.executions = 0     # EXECUTE 로 실행한 횟수
+        self.hits = 0           # 이미 준비된 문장을 다시 쓴 횟수 (파싱/분석을 건너뜀)
+        self.fallbacks = 0      # 일반 실행으로 처리한 횟수
+        self.errors = 0         # PREPARE/EXECUTE 실패 횟수
+
+    def snapshot(self):
+        return {
+            'name': self.name,
+            'query': self.query,
+            'preparable': self.preparable,
+            'prepares': self.prepares,
+            'executions': self.executions,
+            'hits': self.hits,
+            'fallbacks': self.fallbacks,
+            'errors': self.errors,
+            'hit_rate': self.hits / self.executions if self.executions else 0.0,
+        }
+
+
+class StatementRegistry:
+    """쿼리 문자열 -> 준비된 문장 이름, 커넥션별로 어떤 문장을 PREPARE 했는지 기억한다"""
+    def __init__(self, enabled=ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._statements = {}
+        self._prepared = weakref.WeakKeyDictionary()   # 실제 커넥션 -> PREPARE 한 이름 집합
+
+    def statement(self, query):
+        """쿼리 문자열로 등록된 Statement (처음 보면 등록) - 이름은 쿼리 해시라 프로세스가 달라도 같다"""
+        statement = self._statements.get(query)
+        if statement is None:
+            with self._lock:
+                statement = self._statements.get(query)
+                if statement is None:
+                    digest = hashlib.md5(normalize(query).encode('utf-8')).hexdigest()[:16]
+                    statement = self._statements[query] = Statement(f'svc_{digest}', query)
+        return statement
+
+    def _prepared_names(self, conn):
+        with self._lock:
+            names = self._prepared.get(conn)
+            if names is None:
+                names = self._prepared[conn] = set()
+            return names
+
+    def execute(self, cur, query, params=None):
+        """준비된 문장으로 실행 - 준비할 수 없으면 cur.execute(query, params) 와 같다"""
+        params = list(params or ())
+        statement = self.statement(query)
+        conn = cur.connection
+        if not self.enabled or not statement.preparable or statement.param_count != len(params):
+            return self._fallback(cur, statement, query, params)
+
+        names = self._prepared_names(conn)
+        idle = conn.get_transaction_status() == extensions.TRANSACTION_STATUS_IDLE
+        hit = statement.name in names
+        if not hit:
+            # 트랜잭션 중간에 PREPARE 가 실패하면 앞선 작업까지 버려지므로 트랜잭션 밖에서만 준비한다
+            if not idle:
+                return self._fallback(cur, statement, query, params)
+            try:
+                _run(cur, f"PREPARE {statement.name} AS {statement.server_query}", None, query)
+            except errors.DuplicatePreparedStatement:
+                conn.rollback()   # 다른 경로로 이미 준비된 경우
+            except Exception as e:
+                conn.rollback()
+                statement.errors += 1
+                statement.preparable = False   # 타입 추론 실패 등 - 이 쿼리는 앞으로 일반 실행
+                print(f"문장 준비 실패, 일반 실행으로 전환합니다 ({statement.name}): {e}")
+                return self._fallback(cur, statement, query, params)
+            else:
+                statement.prepares += 1
+            names.add(statement.name)
+
+        args = f" ({', '.join(['%s'] * len(params))})" if params else ""
+        try:
+            result = _run(cur, f"EXECUTE {statement.name}{args}", params, query)
+        except _STALE_ERRORS:
+            statement.errors += 1
+            names.discard(statement.name)
+            if not idle:
+                raise
+            # 서버에서 문장이 사라졌거나 계획이 무효화됨 -> 이번에는 일반 실행, 다음 호출 때 다시 준비
+            conn.rollback()
+            _deallocate(cur, statement.name)
+            return self._fallback(cur, statement, query, params)
+        statement.executions += 1
+        if hit:
+            statement.hits += 1
+        return result
+
+    def _fallback(self, cur, statement, query, params):
+        statement.fallbacks += 1
+        return _run(cur, query, params, query)
+
+    def forget(self, conn):
+        """커넥션의 준비 기록 삭제 (DISCARD ALL 등으로 서버 쪽 문장이 사라졌을 때)"""
+        with self._lock:
+            self._prepared.pop(conn, None)
+
+    def stats(self):
+        """문장별 통계 (실행 횟수가 많은 순)"""
+        with self._lock:
+            snapshots = [statement.snapshot() for statement in self._statements.values()]
+        return sorted(snapshots, key=lambda item: item['executions'] + item['fallbacks'], reverse=True)
+
+    def totals(self):
+        totals = {'statements': 0, 'prepares': 0, 'executions': 0, 'hits': 0, 'fallbacks': 0, 'errors': 0}
+        for item in self.stats():
+            totals['statements'] += 1
+            for key in ('prepares', 'executions', 'hits', 'fallbacks', 'errors'):
+                totals[key] += item[key]
+        totals['hit_rate'] = totals['hits'] / totals['executions'] if totals['executions'] else 0.0
+        return totals
+
+    def reset(self):
+        """누적 통계만 초기화 (커넥션에 준비된 문장은 그대로)"""
+        with self._lock:
+            for statement in self._statements.values():
+                statement.prepares = statement.executions = statement.hits = 0
+                statement.fallbacks = statement.errors = 0
+
+
+def _run(cur, query, params, label):
+    """계측 커서면 원래 쿼리 문자열로 통계를 남긴다"""
+    if isinstance(cur, InstrumentedCursor):
+        return cur.execute(query, params, label=label)
+    return cur.execute(query, params)
+
+
+def _deallocate(cur, name):
+    try:
+        cur.execute(f"DEALLOCATE {name}")
+    except Exception:
+        cur.connection.rollback()
+
+
+registry = StatementRegistry()
+
+
+def execute(cur, query, params=None):
+    """서비스 쿼리 실행 진입점 - cur.execute(query, params) 대신 쓴다"""
+    return registry.execute(cur, query, params)
+
+
+def get_statement_stats():
+    return registry.stats()
+
+
+def get_statement_totals():
+    return registry.totals()
+
+
+def reset_statement_stats():
+    registry.reset()
+
+
+def server_plan_stats(conn):
+    """이 커넥션에서 준비된 문장의 서버 측 계획 캐시 통계 (generic_plans 가 늘면 재계획 없이 실행된 것)"""
+    cur = conn.cursor(cursor_factory=extensions.cursor)
+    try:
+        cur.execute("""
+            SELECT name, generic_plans, custom_plans
+            FROM pg_prepared_statements
+            WHERE name LIKE 'svc\\_%%'
+            ORDER BY name
+        """)
+        return [{'name': name, 'generic_plans': generic, 'custom_plans': custom}
+                for name, generic, custom in cur.fetchall()]
+    finally:
+        cur.close()
+
+
+def configure(enabled=None):
+    """실행 중에 준비된 문장 사용 여부 변경"""
+    if enabled is not None:
+        registry.enabled = enabled
@@ -1,11 +1,23 @@
+from database import statements
+from database.backend import get_backend
 from database.db_connector import get_connection
 
+# 로그인 조회 - users(user_name) UNIQUE 인덱스로 한 행을 찾는다
+USER_BY_CREDENTIALS_QUERY = """
+    SELECT user_id, user_name, password, allergy
+    FROM users
+    WHERE user_name = %s AND password = %s
+"""
+
 def create_user(username, password, allergy):
+    backend = get_backend()
+    if backend:
+        return backend.create_user(username, password, allergy)
     conn = get_connection()
     cur = conn.cursor()
     try:
         # 이미 존재하는 사용자인지 확인
-        cur.execute("SELECT user_id FROM users WHERE user_name = %s", (username,))
+        statements.execute(cur, "SELECT user_id FROM users WHERE user_name = %s", (username,))
         if cur.fetchone():
             return None  # 이미 존재하는 사용자
             
@@ -22,14 +34,13 @@ def create_user(username, password, allergy):
         conn.close()
 
 def get_user_by_credentials(username, password):
+    backend = get_backend()
+    if backend:
+        return backend.get_user_by_credentials(username, password)
     conn = get_connection()
     cur = conn.cursor()
     try:
-        cur.execute("""
-            SELECT user_id, user_name, password, allergy
-            FROM users
-            WHERE user_name = %s AND password = %s
-        """, (username, password))
+        statements.execute(cur, USER_BY_CREDENTIALS_QUERY, (username, password))
         return cur.fetchone()
     finally:
         cur.close()
@@ -2,9 +2,11 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from database.backend import get_backend
 from services.user_service import UserService
 from services.recipe_service import RecipeService
 from services.price_service import PriceService
+from services.recipe_detail_service import RecipeDetailService, display_recipe_detail_menu
 
 def get_user_input(prompt):
    """사용자 입력을 받는 유틸리티 함수"""
@@ -21,7 +23,9 @@ def display_recipes(result):
         print("\n검색 결과가 없습니다.")
         return False
         
-    print(f"\n=== 검색 결과 (총 {total_count}개 중 {(current_page-1)*10+1}-{min(current_page*10, total_count)}개 표시) ===")
+    # estimate 모드에서는 총 개수가 추정치
+    approx = "약 " if result.get('count_mode') == 'estimate' else ""
+    print(f"\n=== 검색 결과 ({approx}총 {total_count}개 중 {(current_page-1)*10+1}-{min(current_page*10, total_count)}개 표시) ===")
     for recipe in recipes:
         name = recipe.get('recipe_name', '이름 없음')
         recipe_id = recipe.get('recipe_id', '번호 없음')
@@ -32,6 +36,12 @@ def display_recipes(result):
         print(f"총 예상 비용: {price:.0f}원")
         print("-" * 50)
     
+    # 목록에 보이는 레시피의 상세 정보를 한 번에 캐시에 올려 둔다
+    try:
+        RecipeDetailService.get_recipe_details_many([recipe['recipe_id'] for recipe in recipes])
+    except Exception as e:
+        print(f"상세 정보 미리 불러오기 실패: {e}")
+    
     while True:
         print("\n1. 레시피 상세 정보 보기")
         print("2. 더 많은 결과 보기") if has_more else None
@@ -40,7 +50,6 @@ def display_recipes(result):
         choice = get_user_input("선택해주세요: ").strip()
         
         if choice == "1":
-            from services.recipe_detail_service import display_recipe_detail_menu
             display_recipe_detail_menu()
         elif choice == "2" and has_more:
             return True
@@ -69,13 +78,13 @@ def display_recipe_menu(user):
                    print("올바른 분기를 입력하세요 (1-4)")
                    continue
                
-               page = 1
+               cursor = None
                while True:
-                   result = RecipeService.search_recipes_by_budget(budget, quarter, page)
+                   result = RecipeService.search_recipes_by_budget_cursor(budget, quarter, cursor)
                    show_more = display_recipes(result)
                    if not show_more:
                        break
-                   page += 1
+                   cursor = result['next_cursor']
                    
            elif choice == "2":
                allergy = get_user_input("알레르기 정보를 입력하세요 (엔터: 내 알레르기 정보 사용, 쉼표로 구분): ")
@@ -89,13 +98,13 @@ def display_recipe_menu(user):
                    print("올바른 분기를 입력하세요 (1-4)")
                    continue
                
-               page = 1
+               cursor = None
                while True:
-                   result = RecipeService.search_recipes_by_allergy(allergy, quarter, page)
+                   result = RecipeService.search_recipes_by_allergy_cursor(allergy, quarter, cursor)
                    show_more = display_recipes(result)
                    if not show_more:
                        break
-                   page += 1
+                   cursor = result['next_cursor']
                
            elif choice == "3":
                quarter = int(get_user_input("분기를 입력하세요 (1-4): "))
@@ -104,13 +113,13 @@ def display_recipe_menu(user):
                    print("올바른 분기 입력하세요 (1-4)")
                    continue
                
-               page = 1
+               cursor = None
                while True:
-                   result = RecipeService.get_all_recipes(quarter, page)
+                   result = RecipeService.get_all_recipes_cursor(quarter, cursor)
                    show_more = display_recipes(result)
                    if not show_more:
                        break
-                   page += 1
+                   cursor = result['next_cursor']
                
            elif choice == "4":
                break
@@ -190,7 +199,7 @@ def display_price_menu():
                        for r in results:
                            print(f"\n{r['quarter']}분기:")
                            print(f"가격: {r['price']:,.2f}원/g")
-                           if r['price_change_percent'] != 0:
+                           if r['price_change_percent'] not in (0, None):
                                print(f"변동률: {r['price_change_percent']:+.2f}%")
                    else:
                        print("\n재료를 찾을 수 없습니다.")
@@ -204,7 +213,7 @@ def display_price_menu():
                        for r in results:
                            print(f"\n{r['quarter']}분기:")
                            print(f"총 가격: {r['price']:,.2f}원")
-                           if r['price_change_percent'] != 0:
+                           if r['price_change_percent'] not in (0, None):
                                print(f"변동률: {r['price_change_percent']:+.2f}%")
                    else:
                        print("\n레시피를 찾을 수 없습니다.")
@@ -229,6 +238,8 @@ def display_main_menu():
 
 def main():
    """메인 프로그램 실행 함수"""
+   # DB_BACKEND=memory 면 시작할 때 CSV 를 메모리에 올려 둔다
+   get_backend()
    while True:
        print("\n=== 대학생 식비 최적화 도우미 ===")
        print("1. 로그인")
@@ -0,0 +1,331 @@
+# scripts/bulk_load.py
+# CSV -> PostgreSQL 대량 적재 (COPY FROM STDIN + 스테이징 테이블 교체)
+import csv
+import hashlib
+import io
+import os
+import time
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_PATH, 'data')
+
+
+def _int(value):
+    value = value.strip()
+    return int(float(value)) if value else None
+
+def _float(value):
+    value = value.strip()
+    return float(value) if value else None
+
+def _text(value):
+    return value if value.strip() else None
+
+
+# 테이블별 적재 정의 - FK 순서대로 나열 (부모 테이블이 먼저)
+# columns: (CSV 컬럼, 테이블 컬럼, 변환 함수), key: 중복 행은 CSV 에서 뒤에 나온 행이 이긴다
+# upsert: key 가 테이블 제약조건이라 ON CONFLICT 를 쓸 수 있는지 (아니면 증분 동기화 때 삭제 후 삽입)
+LOAD_SPECS = {
+    'Recipe': {
+        'file': 'Recipe.csv',
+        'columns': [('recipeID', 'recipeID', _int), ('recipeName', 'recipeName', _text)],
+        'key': ['recipeID'],
+        'upsert': True,
+    },
+    'IngredientName': {
+        'file': 'IngredientName.csv',
+        'columns': [('ingredientID', 'ingredientID', _int), ('name', 'name', _text)],
+        'key': ['ingredientID'],
+        'upsert': True,
+    },
+    'IngredientPrice': {
+        'file': 'IngredientPrice.csv',
+        'columns': [('ingredientID', 'ingredientID', _int), ('quarter', 'quarter', _int),
+                    ('price', 'price', _float)],
+        'key': ['ingredientID', 'quarter'],
+        'upsert': True,
+    },
+    'IngredientSubstitute': {
+        'file': 'IngredientSubstitute.csv',
+        'columns': [('ingredientID', 'ingredientID', _int), ('group_name', 'group_name', _text)],
+        'key': ['ingredientID'],   # 재료당 대체 그룹 하나
+        'upsert': True,
+    },
+    'RecipeIngredient_info': {
+        'file': 'RecipeIngredientInfo.csv',
+        'columns': [('recipeID', 'recipeID', _int), ('ingredientID', 'ingredientID', _int),
+                    ('amount', 'amount', _float)],
+        'key': ['recipeID', 'ingredientID'],
+        'upsert': True,
+    },
+    'recipe_nutrition': {
+        'file': 'RecipeNutrition.csv',
+        'columns': [('recipe_ID', 'recipe_id', _int), ('calories', 'calories', _float),
+                    ('carbohydrate', 'carbohydrate', _float), ('protein', 'protein', _float),
+                    ('fat', 'fat', _float)],
+        'key': ['recipe_id'],
+        'upsert': True,
+    },
+    'cooking_step': {
+        'file': 'CookingMethod.csv',
+        # CSV 는 레시피당 한 줄(MANUAL01, MANUAL02, ...) - iter_step_rows 가 단계당 한 행으로 펼친다
+        'columns': [('recipe_ID', 'recipe_id', _int), ('MANUAL', 'step_no', _int), ('MANUAL', 'text', _text)],
+        'key': ['recipe_id', 'step_no'],
+        'upsert': True,
+        'reader': 'steps',
+    },
+}
+
+
+def key_positions(table):
+    columns = [column for _, column, _ in LOAD_SPECS[table]['columns']]
+    return [columns.index(column) for column in LOAD_SPECS[table]['key']]
+
+def row_key(positions, row):
+    """manifest 에 저장하는 행 키 문자열 (키 값을 | 로 연결)"""
+    return '|'.join(str(row[pos]) for pos in positions)
+
+def row_hash(row):
+    """변환된 값 기준 행 해시 (마지막 줄 번호 컬럼은 제외)"""
+    return hashlib.blake2b(repr(row[:-1]).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def iter_csv_rows(path, columns):
+    """CSV 를 한 줄씩 읽어 (변환된 값..., 줄 번호) 튜플을 만든다 - 파일 전체를 메모리에 올리지 않는다"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        positions = [header.index(csv_column) for csv_column, _, _ in columns]
+        converters = [convert for _, _, convert in columns]
+        for line_no, record in enumerate(reader, 2):
+            if not record:
+                continue
+            yield tuple(convert(record[pos]) if pos < len(record) else None
+                        for pos, convert in zip(positions, converters)) + (line_no,)
+
+
+def iter_step_rows(path, columns):
+    """조리 단계 CSV (recipe_ID, MANUAL01, MANUAL02, ...) -> (recipe_id, step_no, text, 줄 번호) 튜플
+    MANUAL 컬럼 수에 제한이 없고, 빈 단계는 건너뛰고 남은 단계에 1 부터 번호를 매긴다"""
+    id_column, _, convert_id = columns[0]
+    prefix = columns[1][0]
+    convert_text = columns[2][2]
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        id_pos = header.index(id_column)
+        step_positions = [pos for _, pos in sorted((int(name[len(prefix):]), pos) for pos, name in enumerate(header)
+                                                   if name.startswith(prefix) and name[len(prefix):].isdigit())]
+        for line_no, record in enumerate(reader, 2):
+            if not record:
+                continue
+            recipe_id = convert_id(record[id_pos]) if id_pos < len(record) else None
+            step_no = 0
+            for pos in step_positions:
+                text = convert_text(record[pos]) if pos < len(record) else None
+                if text:
+                    step_no += 1
+                    yield (recipe_id, step_no, text, line_no)
+
+
+_READERS = {'csv': iter_csv_rows, 'steps': iter_step_rows}
+
+def read_rows(table, data_dir=DATA_DIR):
+    """테이블 적재 정의대로 CSV 를 읽어 (변환된 값..., 줄 번호) 튜플을 만든다"""
+    spec = LOAD_SPECS[table]
+    return _READERS[spec.get('reader', 'csv')](os.path.join(data_dir, spec['file']), spec['columns'])
+
+
+class CsvCopyStream:
+    """행 iterator 를 COPY ... FROM STDIN (FORMAT csv) 용 파일 객체로 감싼다"""
+    def __init__(self, rows, chunk_rows=5000):
+        self._rows = iter(rows)
+        self._chunk_rows = chunk_rows
+        self._chunk = io.StringIO()
+        self.row_count = 0
+
+    def _fill(self):
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator='\n')
+        for _ in range(self._chunk_rows):
+            row = next(self._rows, None)
+            if row is None:
+                break
+            writer.writerow(row)
+            self.row_count += 1
+        return out.getvalue()
+
+    def read(self, size=-1):
+        data = self._chunk.read(size)
+        while size < 0 or len(data) < size:
+            chunk = self._fill()
+            if not chunk:
+                break
+            self._chunk = io.StringIO(chunk)
+            data += self._chunk.read(size - len(data) if size >= 0 else -1)
+        return data
+
+
+def create_manifest_table(cur):
+    """마지막으로 적재한 CSV 행의 키/해시 - 증분 동기화 때 바뀐 행만 골라내는 기준"""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS load_manifest (
+            table_name VARCHAR(64),
+            row_key TEXT,
+            row_hash CHAR(32) NOT NULL,
+            PRIMARY KEY (table_name, row_key)
+        );
+    """)
+
+
+def record_hashes(table, rows, hashes):
+    """행을 그대로 흘려보내면서 {행 키: 해시} 를 기록 (같은 키는 마지막 행 기준)"""
+    positions = key_positions(table)
+    for row in rows:
+        hashes[row_key(positions, row)] = row_hash(row)
+        yield row
+
+
+def write_manifest(cur, table, hashes, deleted_keys=(), replace=False):
+    """manifest 갱신 - replace 면 테이블의 기존 항목을 모두 지우고 다시 쓴다"""
+    if replace:
+        cur.execute("DELETE FROM load_manifest WHERE table_name = %s", (table,))
+    elif deleted_keys:
+        cur.execute("DELETE FROM load_manifest WHERE table_name = %s AND row_key = ANY(%s)",
+                    (table, list(deleted_keys)))
+    if not hashes:
+        return
+    cur.execute("DROP TABLE IF EXISTS pg_temp.stage_manifest;")
+    cur.execute("CREATE TEMP TABLE pg_temp.stage_manifest (LIKE load_manifest) ON COMMIT DROP;")
+    cur.copy_expert(
+        "COPY pg_temp.stage_manifest (table_name, row_key, row_hash) FROM STDIN WITH (FORMAT csv)",
+        CsvCopyStream((table, key, value) for key, value in hashes.items())
+    )
+    cur.execute("""
+        INSERT INTO load_manifest (table_name, row_key, row_hash)
+        SELECT table_name, row_key, row_hash FROM pg_temp.stage_manifest
+        ON CONFLICT (table_name, row_key) DO UPDATE SET row_hash = EXCLUDED.row_hash
+    """)
+
+
+def stage_table(cur, table, data_dir=DATA_DIR, rows=None):
+    """스테이징 임시 테이블을 만들고 CSV 를 COPY 로 적재 -> (스테이징 테이블명, 행 수, 소요 시간)"""
+    spec = LOAD_SPECS[table]
+    stage = f"pg_temp.stage_{table.lower()}"
+    columns = [column for _, column, _ in spec['columns']]
+
+    cur.execute(f"DROP TABLE IF EXISTS {stage};")
+    cur.execute(f"CREATE TEMP TABLE {stage} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP;")
+    cur.execute(f"ALTER TABLE {stage} ADD COLUMN _line BIGINT;")
+
+    if rows is None:
+        rows = read_rows(table, data_dir)
+    stream = CsvCopyStream(rows)
+    start = time.perf_counter()
+    cur.copy_expert(
+        f"COPY {stage} ({', '.join(columns)}, _line) FROM STDIN WITH (FORMAT csv)",
+        stream
+    )
+    return stage, stream.row_count, time.perf_counter() - start
+
+
+def staged_select(table, stage):
+    """스테이징 행을 키 기준으로 중복 제거해서 읽는 SELECT (같은 키는 마지막 줄 우선)"""
+    spec = LOAD_SPECS[table]
+    columns = ', '.join(column for _, column, _ in spec['columns'])
+    if spec['key']:
+        key = ', '.join(spec['key'])
+        return (f"SELECT DISTINCT ON ({key}) {columns} FROM {stage} "
+                f"ORDER BY {key}, _line DESC")
+    return f"SELECT {columns} FROM {stage} ORDER BY _line"
+
+
+def _referencing_tables(cur, tables):
+    """tables 를 FK 로 참조하는 (ON DELETE CASCADE 가 아닌) 다른 테이블 - 참조하는 쪽이 먼저 오도록"""
+    found = []
+    targets = [table.lower() for table in tables]
+    while targets:
+        cur.execute("""
+            SELECT DISTINCT child.relname
+            FROM pg_constraint c
+            JOIN pg_class child ON child.oid = c.conrelid
+            JOIN pg_class parent ON parent.oid = c.confrelid
+            WHERE c.contype = 'f' AND c.confdeltype <> 'c'
+              AND parent.relname = ANY(%s) AND child.relname <> parent.relname
+        """, (targets,))
+        known = {table.lower() for table in tables} | set(found)
+        targets = [row[0] for row in cur.fetchall() if row[0] not in known]
+        found = targets + found
+    return found
+
+
+def _replace_rows(cur, table, stage):
+    """테이블 내용을 스테이징 내용으로 바꾼다 - 스테이징에 없는 키는 지우고, 나머지는 바뀐 행만 넣거나 고친다
+    같은 데이터를 다시 적재하면 아무 행도 건드리지 않는다 (죽은 행/인덱스 항목이 쌓이지 않는다)"""
+    spec = LOAD_SPECS[table]
+    columns = [column for _, column, _ in spec['columns']]
+    key_columns = spec['key']
+    if not (key_columns and spec['upsert']):
+        cur.execute(f"DELETE FROM {table};")
+        cur.execute(f"INSERT INTO {table} ({', '.join(columns)}) {staged_select(table, stage)};")
+        return
+    values = [column for column in columns if column not in key_columns]
+    if values:
+        on_conflict = f"""DO UPDATE
+            SET {', '.join(f"{column} = EXCLUDED.{column}" for column in values)}
+            WHERE ({', '.join(f"t.{column}" for column in values)})
+                IS DISTINCT FROM ({', '.join(f"EXCLUDED.{column}" for column in values)})"""
+    else:
+        on_conflict = "DO NOTHING"
+    cur.execute(f"""
+        INSERT INTO {table} AS t ({', '.join(columns)})
+        {staged_select(table, stage)}
+        ON CONFLICT ({', '.join(key_columns)}) {on_conflict};
+    """)
+
+
+def swap_tables(cur, staged):
+    """스테이징 -> 실제 테이블 교체 (DELETE + INSERT ... ON CONFLICT)
+    TRUNCATE 는 ACCESS EXCLUSIVE 잠금을 커밋까지 잡아 읽기를 막는다 - 행 단위로 바꾸면 같은 트랜잭션의
+    recipe_cost 재계산/ANALYZE 가 끝나 커밋될 때까지 읽기 쪽은 막히지 않고 이전 데이터를 본다"""
+    tables = [table for table in LOAD_SPECS if table in staged]
+    # 적재하지 않는 자식 테이블은 TRUNCATE ... CASCADE 때처럼 비운다
+    for table in _referencing_tables(cur, tables):
+        cur.execute(f"DELETE FROM {table};")
+    # 참조하는 쪽부터 스테이징에 없는 키를 지운다
+    for table in reversed(tables):
+        key_columns = LOAD_SPECS[table]['key']
+        if key_columns and LOAD_SPECS[table]['upsert']:
+            match = ' AND '.join(f"s.{column} = t.{column}" for column in key_columns)
+            cur.execute(f"DELETE FROM {table} t WHERE NOT EXISTS (SELECT 1 FROM {staged[table]} s WHERE {match});")
+    for table in tables:
+        _replace_rows(cur, table, staged[table])
+
+
+def bulk_load(cur, tables, data_dir=DATA_DIR):
+    """CSV 들을 스테이징에 모두 적재한 뒤 한 번에 교체하고 테이블별 처리량을 출력"""
+    staged = {}
+    stats = {}
+    manifests = {}
+    for table in tables:
+        spec = LOAD_SPECS[table]
+        manifests[table] = {}
+        rows = record_hashes(table, read_rows(table, data_dir), manifests[table])
+        stage, rows, elapsed = stage_table(cur, table, data_dir, rows)
+        staged[table] = stage
+        stats[table] = {
+            'rows': rows,
+            'seconds': elapsed,
+            'rows_per_sec': rows / elapsed if elapsed > 0 else float('inf'),
+        }
+
+    start = time.perf_counter()
+    swap_tables(cur, staged)
+    for table, hashes in manifests.items():
+        write_manifest(cur, table, hashes, replace=True)
+    swap_elapsed = time.perf_counter() - start
+
+    for table, stat in stats.items():
+        print(f"{table}: {stat['rows']:,}행, {stat['seconds']:.2f}초 ({stat['rows_per_sec']:,.0f}행/초)")
+    print(f"테이블 교체: {swap_elapsed:.2f}초")
+    return stats
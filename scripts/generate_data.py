@@ -0,0 +1,235 @@
+# scripts/generate_data.py
+# data/ 와 같은 형식의 합성 카탈로그 생성기 - 원본의 분포(레시피당 재료 수, 재료별 가격대/사용량, 분기 범위,
+# 조리 단계 수 - 일부는 원본보다 길게, 영양 정보)를 따르고, 행을 바로 파일에 써서 수백만 행도 일정한 메모리로 만든다
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import csv
+import random
+import re
+import time
+from collections import Counter, defaultdict
+from itertools import accumulate, islice
+
+from scripts.bulk_load import DATA_DIR
+
+# 변형 재료명 앞에 붙는 수식어 (원본 재료명과 조합해 한국어 재료명을 만든다)
+NAME_PREFIXES = ['국산', '수입', '유기농', '냉동', '손질', '다진', '건', '생', '무농약', '훈제',
+                 '저염', '볶은', '채썬', '통', '어린']
+DISH_TYPES = ['찜', '볶음', '국', '찌개', '조림', '무침', '구이', '전', '죽', '샐러드', '덮밥', '볶음밥',
+              '비빔밥', '스프', '파스타', '전골', '말이', '김밥', '탕', '꼬치']
+STEP_NUMBER = re.compile(r'^\s*\d+\.\s*')
+PRICE_JITTER = 0.15        # 변형 재료의 가격 배율 (로그 정규분포 표준편차)
+AMOUNT_JITTER = 0.2        # 사용량 배율 범위 (±)
+NUTRITION_JITTER = 0.1
+# 원본보다 긴 조리 단계 - 레시피의 이 비율만큼은 원본 단계 수에 1..LONG_STEP_EXTRA 단계를 더한다
+LONG_STEP_RATE = 0.05
+LONG_STEP_EXTRA = 10
+
+
+def _read(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f))
+
+
+def build_profile(source_dir=DATA_DIR):
+    """원본 CSV 에서 분포를 뽑는다 (원본 크기에 비례하는 작은 메모리)"""
+    names = {}
+    for row in _read(os.path.join(source_dir, 'IngredientName.csv')):
+        names[int(float(row['ingredientID']))] = row['name'].strip()
+    base_ids = sorted(names)
+    base_pos = {ingredient_id: pos for pos, ingredient_id in enumerate(base_ids)}
+
+    # 재료별 분기 가격 - 분기 범위와 분기 간 변동을 그대로 쓰고 배율만 바꾼다
+    prices = defaultdict(dict)
+    for row in _read(os.path.join(source_dir, 'IngredientPrice.csv')):
+        ingredient_id = int(float(row['ingredientID']))
+        if ingredient_id in base_pos and row['price'].strip():
+            prices[base_pos[ingredient_id]][int(float(row['quarter']))] = float(row['price'])
+
+    per_recipe = Counter()
+    amounts = defaultdict(list)
+    usage = Counter()
+    for row in _read(os.path.join(source_dir, 'RecipeIngredientInfo.csv')):
+        ingredient_id = int(float(row['ingredientID']))
+        if ingredient_id not in base_pos or not row['amount'].strip():
+            continue
+        per_recipe[row['recipeID']] += 1
+        amounts[base_pos[ingredient_id]].append(float(row['amount']))
+        usage[base_pos[ingredient_id]] += 1
+
+    steps = []
+    step_counts = []
+    for row in _read(os.path.join(source_dir, 'CookingMethod.csv')):
+        # MANUAL01, MANUAL02, ... (단계 수 제한 없음)
+        columns = sorted((column for column in row if column.startswith('MANUAL') and column[6:].isdigit()),
+                         key=lambda column: int(column[6:]))
+        texts = [STEP_NUMBER.sub('', row[column]).strip() for column in columns if (row[column] or '').strip()]
+        steps.extend(texts)
+        step_counts.append(len(texts))
+
+    nutrition = [tuple(float(row[column] or 0) for column in ('calories', 'carbohydrate', 'protein', 'fat'))
+                 for row in _read(os.path.join(source_dir, 'RecipeNutrition.csv'))]
+
+    # 대체 재료 그룹 - 그룹이 없는 재료는 같은 원본의 변형끼리 한 그룹이 된다
+    groups = {}
+    for row in _read(os.path.join(source_dir, 'IngredientSubstitute.csv')):
+        ingredient_id = int(float(row['ingredientID']))
+        if ingredient_id in base_pos and row['group_name'].strip():
+            groups[base_pos[ingredient_id]] = row['group_name'].strip()
+
+    all_amounts = [amount for values in amounts.values() for amount in values]
+    return {
+        'base_names': [names[ingredient_id] for ingredient_id in base_ids],
+        'prices': [prices.get(pos, {}) for pos in range(len(base_ids))],
+        'amounts': [amounts.get(pos) or all_amounts for pos in range(len(base_ids))],
+        # 자주 쓰이는 재료(소금, 마늘 등)가 더 자주 뽑히도록 사용 횟수 + 1 을 가중치로
+        'usage_weights': [usage[pos] + 1 for pos in range(len(base_ids))],
+        'ingredients_per_recipe': list(per_recipe.values()) or [1],
+        'steps': steps or ['재료를 손질한다.'],
+        'step_counts': step_counts or [3],
+        'nutrition': nutrition or [(0.0, 0.0, 0.0, 0.0)],
+        'groups': [groups.get(pos) or names[ingredient_id] for pos, ingredient_id in enumerate(base_ids)],
+    }
+
+
+def ingredient_name(profile, index):
+    """재료 번호(0 부터) -> 재료명, 번호만으로 정해지므로 이름 목록을 메모리에 들고 있지 않아도 된다"""
+    base_names = profile['base_names']
+    base, variant = index % len(base_names), index // len(base_names)
+    name = base_names[base]
+    if variant:
+        prefix = NAME_PREFIXES[(variant - 1) % len(NAME_PREFIXES)]
+        round_no = (variant - 1) // len(NAME_PREFIXES)
+        name = f"{prefix}{name}" + (f" {round_no + 1}" if round_no else "")
+    return name
+
+
+def _number(value):
+    """CSV 에 쓸 숫자 문자열 (소수점 둘째 자리까지, 불필요한 0 은 뺀다)"""
+    return f"{round(value, 2):.2f}".rstrip('0').rstrip('.')
+
+
+class _Writers:
+    """출력 파일 7개를 열고 csv.writer 를 돌려준다"""
+    HEADERS = {
+        'Recipe.csv': ['recipeID', 'recipeName'],
+        'IngredientName.csv': ['ingredientID', 'name'],
+        'IngredientPrice.csv': ['ingredientID', 'quarter', 'price'],
+        'IngredientSubstitute.csv': ['ingredientID', 'group_name'],
+        'RecipeIngredientInfo.csv': ['recipeID', 'ingredientID', 'amount'],
+        'RecipeNutrition.csv': ['recipe_ID', 'calories', 'carbohydrate', 'protein', 'fat'],
+    }
+
+    def __init__(self, out_dir, max_steps):
+        os.makedirs(out_dir, exist_ok=True)
+        self._files = {}
+        self.writers = {}
+        self.counts = Counter()
+        # 조리 단계 컬럼은 가장 긴 레시피의 단계 수만큼 (MANUAL01, MANUAL02, ...)
+        self.max_steps = max(max_steps, 1)
+        headers = dict(self.HEADERS)
+        headers['CookingMethod.csv'] = ['recipe_ID'] + [f'MANUAL{i:02d}' for i in range(1, self.max_steps + 1)]
+        for file_name, header in headers.items():
+            f = open(os.path.join(out_dir, file_name), 'w', newline='', encoding='utf-8')
+            self._files[file_name] = f
+            self.writers[file_name] = csv.writer(f)
+            self.writers[file_name].writerow(header)
+
+    def write(self, file_name, row):
+        self.writers[file_name].writerow(row)
+        self.counts[file_name] += 1
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+
+
+def _step_counts(profile, seed):
+    """레시피 순서대로 조리 단계 수 - 같은 seed 면 같은 순서라 헤더 폭을 정할 때 한 번, 쓸 때 한 번 뽑는다"""
+    rng = random.Random(f"{seed}-steps")
+    while True:
+        count = rng.choice(profile['step_counts'])
+        if rng.random() < LONG_STEP_RATE:
+            count += rng.randint(1, LONG_STEP_EXTRA)
+        yield count
+
+
+def generate(out_dir, recipes=None, ingredients=None, scale=1, seed=42, source_dir=DATA_DIR, progress_every=0):
+    """합성 카탈로그를 out_dir 에 쓴다 -> 파일별 행 수
+    recipes/ingredients 를 주지 않으면 원본 행 수 × scale"""
+    profile = build_profile(source_dir)
+    base_count = len(profile['base_names'])
+    source_recipes = len(profile['nutrition'])
+    recipes = recipes or max(source_recipes * scale, 1)
+    ingredients = ingredients or max(base_count * scale, 1)
+    rng = random.Random(seed)
+    writers = _Writers(out_dir, max(islice(_step_counts(profile, seed), recipes)))
+    step_counts = _step_counts(profile, seed)
+    start = time.perf_counter()
+    try:
+        # 재료: 원본 재료를 기준으로 변형을 만들고, 가격은 원본 분기 가격에 같은 배율을 곱한다
+        for index in range(ingredients):
+            ingredient_id = index + 1
+            writers.write('IngredientName.csv', [ingredient_id, ingredient_name(profile, index)])
+            writers.write('IngredientSubstitute.csv', [ingredient_id, profile['groups'][index % base_count]])
+            base_prices = profile['prices'][index % base_count]
+            factor = 1.0 if index < base_count else rng.lognormvariate(0, PRICE_JITTER)
+            for quarter in sorted(base_prices):
+                writers.write('IngredientPrice.csv',
+                              [ingredient_id, quarter, _number(max(base_prices[quarter] * factor, 0.01))])
+
+        # 재료 번호 = 변형 번호 × 원본 재료 수 + 원본 위치
+        variants = [(ingredients - base - 1) // base_count + 1 if base < ingredients else 0
+                    for base in range(base_count)]
+        bases = [base for base in range(base_count) if variants[base]]
+        cum_weights = list(accumulate(profile['usage_weights'][base] for base in bases))
+
+        for recipe_id in range(1, recipes + 1):
+            wanted = min(rng.choice(profile['ingredients_per_recipe']), ingredients)
+            chosen = {}
+            while len(chosen) < wanted:
+                base = rng.choices(bases, cum_weights=cum_weights)[0]
+                index = rng.randrange(variants[base]) * base_count + base
+                if index not in chosen:
+                    amount = rng.choice(profile['amounts'][base]) * rng.uniform(1 - AMOUNT_JITTER, 1 + AMOUNT_JITTER)
+                    chosen[index] = max(round(amount), 1)
+
+            # 레시피명 = 주재료명(번호 없이) + 요리 종류
+            main = next(iter(chosen)) % (base_count * (len(NAME_PREFIXES) + 1))
+            writers.write('Recipe.csv', [recipe_id, f"{ingredient_name(profile, main)}{rng.choice(DISH_TYPES)}"])
+            for index, amount in chosen.items():
+                writers.write('RecipeIngredientInfo.csv', [recipe_id, index + 1, amount])
+
+            nutrition = rng.choice(profile['nutrition'])
+            writers.write('RecipeNutrition.csv', [recipe_id] + [
+                _number(value * rng.uniform(1 - NUTRITION_JITTER, 1 + NUTRITION_JITTER)) for value in nutrition])
+
+            steps = [f"{no}. {rng.choice(profile['steps'])}" for no in range(1, next(step_counts) + 1)]
+            writers.write('CookingMethod.csv', [recipe_id] + steps + [''] * (writers.max_steps - len(steps)))
+
+            if progress_every and recipe_id % progress_every == 0:
+                print(f"레시피 {recipe_id:,}/{recipes:,} ({time.perf_counter() - start:.1f}초)")
+    finally:
+        writers.close()
+    return dict(writers.counts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="합성 레시피 카탈로그 CSV 생성")
+    parser.add_argument('out_dir', help="CSV 를 쓸 디렉터리")
+    parser.add_argument('--scale', type=int, default=1, help="원본 data/ 대비 배수")
+    parser.add_argument('--recipes', type=int, help="레시피 수 (지정하면 --scale 대신 사용)")
+    parser.add_argument('--ingredients', type=int, help="재료 수 (지정하면 --scale 대신 사용)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--source-dir', default=DATA_DIR, help="분포를 뽑을 원본 CSV 디렉터리")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = generate(args.out_dir, args.recipes, args.ingredients, args.scale, args.seed, args.source_dir,
+                      progress_every=100000)
+    for file_name, count in counts.items():
+        print(f"{file_name}: {count:,}행")
+    print(f"완료: {time.perf_counter() - start:.2f}초")
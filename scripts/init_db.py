@@ -1,175 +1,508 @@
-import pandas as pd
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+
 from database.db_connector import get_connection
+from database.events import bump_data_versions, create_data_version_table, notify_data_reload
+from database.user_db import USER_BY_CREDENTIALS_QUERY
+from scripts.bulk_load import DATA_DIR, bulk_load, create_manifest_table
+from scripts.sync_data import sync_tables
+from services.price_service import INGREDIENT_PRICE_QUERY
+from services.recipe_detail_service import RECIPE_DETAILS_QUERY
+from services.recipe_service import (BUDGET_MATCH_QUERY, _allergy_page_query, _budget_page_query,
+                                     _count_query)
 
-def init_database():
-    conn = get_connection()
-    cur = conn.cursor()
-    
+def create_recipe_cost_schema(cur):
+    """레시피 분기별 비용 테이블과 갱신 함수 생성"""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS recipe_cost (
+            recipeID INT REFERENCES Recipe(recipeID) ON DELETE CASCADE,
+            quarter INT CHECK (quarter BETWEEN 1 AND 4),
+            total_cost DECIMAL(10, 2) NOT NULL,
+            ingredients_detail TEXT,
+            PRIMARY KEY (recipeID, quarter)
+        );
+    """)
+    # 예산 검색은 (분기, 비용) 범위 스캔으로 처리된다
+    # recipeID 까지 포함해 커서 페이지네이션의 (total_cost, recipeID) 비교도 인덱스로 처리
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_recipe_cost_quarter_cost
+        ON recipe_cost (quarter, total_cost, recipeID);
+    """)
+
+    # 지정한 레시피/분기의 비용을 다시 계산 (NULL 이면 전체)
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION refresh_recipe_cost(p_recipe_ids INT[], p_quarters INT[])
+        RETURNS void AS $$
+        BEGIN
+            DELETE FROM recipe_cost rc
+            WHERE (p_recipe_ids IS NULL OR rc.recipeID = ANY(p_recipe_ids))
+              AND (p_quarters IS NULL OR rc.quarter = ANY(p_quarters));
+
+            -- 재료 중 하나라도 가격이 있는 분기에 행을 만들고, 그 분기 가격이 없는 재료는 0원으로 상세에 남긴다
+            -- 상세 문자열은 실행 계획/물리 순서와 상관없이 재료 ID 순으로 잇는다 (메모리 엔진과 같은 순서)
+            INSERT INTO recipe_cost (recipeID, quarter, total_cost, ingredients_detail)
+            SELECT
+                ri.recipeID,
+                q.quarter,
+                CAST(SUM(ri.amount * COALESCE(ip.price, 0)) AS DECIMAL(10,2)),
+                string_agg(
+                    concat(
+                        in_name.name, ' (',
+                        ri.amount, 'g × ',
+                        COALESCE(ip.price, 0), '원/g = ',
+                        CAST(ri.amount * COALESCE(ip.price, 0) AS DECIMAL(10,2)), '원)'
+                    ),
+                    E'\\n   '
+                    ORDER BY ri.ingredientID
+                )
+            FROM RecipeIngredient_info ri
+            JOIN IngredientName in_name ON ri.ingredientID = in_name.ingredientID
+            CROSS JOIN (
+                SELECT DISTINCT quarter FROM IngredientPrice
+                WHERE p_quarters IS NULL OR quarter = ANY(p_quarters)
+            ) q
+            LEFT JOIN IngredientPrice ip ON ri.ingredientID = ip.ingredientID
+                AND ip.quarter = q.quarter
+            WHERE (p_recipe_ids IS NULL OR ri.recipeID = ANY(p_recipe_ids))
+            GROUP BY ri.recipeID, q.quarter
+            HAVING bool_or(ip.price IS NOT NULL);
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # 가격 변경 -> 해당 재료를 쓰는 레시피의 변경된 분기만 갱신
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION recipe_cost_on_price_change()
+        RETURNS trigger AS $$
+        DECLARE
+            changed_ids INT[];
+            changed_quarters INT[];
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                SELECT array_agg(DISTINCT ingredientID), array_agg(DISTINCT quarter)
+                INTO changed_ids, changed_quarters FROM new_rows;
+            ELSIF TG_OP = 'DELETE' THEN
+                SELECT array_agg(DISTINCT ingredientID), array_agg(DISTINCT quarter)
+                INTO changed_ids, changed_quarters FROM old_rows;
+            ELSE
+                SELECT array_agg(DISTINCT ingredientID), array_agg(DISTINCT quarter)
+                INTO changed_ids, changed_quarters
+                FROM (SELECT ingredientID, quarter FROM new_rows
+                      UNION SELECT ingredientID, quarter FROM old_rows) changed;
+            END IF;
+
+            IF changed_ids IS NOT NULL THEN
+                PERFORM refresh_recipe_cost(
+                    ARRAY(SELECT DISTINCT recipeID FROM RecipeIngredient_info
+                          WHERE ingredientID = ANY(changed_ids)),
+                    changed_quarters
+                );
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # 레시피 재료 구성 변경 -> 해당 레시피의 모든 분기 갱신
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION recipe_cost_on_recipe_ingredient_change()
+        RETURNS trigger AS $$
+        DECLARE
+            changed_ids INT[];
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                SELECT array_agg(DISTINCT recipeID) INTO changed_ids FROM new_rows;
+            ELSIF TG_OP = 'DELETE' THEN
+                SELECT array_agg(DISTINCT recipeID) INTO changed_ids FROM old_rows;
+            ELSE
+                SELECT array_agg(DISTINCT recipeID) INTO changed_ids
+                FROM (SELECT recipeID FROM new_rows UNION SELECT recipeID FROM old_rows) changed;
+            END IF;
+
+            IF changed_ids IS NOT NULL THEN
+                PERFORM refresh_recipe_cost(changed_ids, NULL);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # 재료명 변경 -> ingredients_detail 문자열 갱신
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION recipe_cost_on_ingredient_rename()
+        RETURNS trigger AS $$
+        DECLARE
+            changed_ids INT[];
+        BEGIN
+            SELECT array_agg(DISTINCT n.ingredientID) INTO changed_ids
+            FROM new_rows n JOIN old_rows o ON n.ingredientID = o.ingredientID
+            WHERE n.name IS DISTINCT FROM o.name;
+
+            IF changed_ids IS NOT NULL THEN
+                PERFORM refresh_recipe_cost(
+                    ARRAY(SELECT DISTINCT recipeID FROM RecipeIngredient_info
+                          WHERE ingredientID = ANY(changed_ids)),
+                    NULL
+                );
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+RECIPE_COST_TRIGGERS = [
+    # (트리거 이름, 테이블, 이벤트, 전이 테이블, 함수)
+    ('trg_recipe_cost_price_ins', 'IngredientPrice', 'INSERT', 'NEW TABLE AS new_rows',
+     'recipe_cost_on_price_change'),
+    ('trg_recipe_cost_price_upd', 'IngredientPrice', 'UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows',
+     'recipe_cost_on_price_change'),
+    ('trg_recipe_cost_price_del', 'IngredientPrice', 'DELETE', 'OLD TABLE AS old_rows',
+     'recipe_cost_on_price_change'),
+    ('trg_recipe_cost_ri_ins', 'RecipeIngredient_info', 'INSERT', 'NEW TABLE AS new_rows',
+     'recipe_cost_on_recipe_ingredient_change'),
+    ('trg_recipe_cost_ri_upd', 'RecipeIngredient_info', 'UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows',
+     'recipe_cost_on_recipe_ingredient_change'),
+    ('trg_recipe_cost_ri_del', 'RecipeIngredient_info', 'DELETE', 'OLD TABLE AS old_rows',
+     'recipe_cost_on_recipe_ingredient_change'),
+    ('trg_recipe_cost_name_upd', 'IngredientName', 'UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows',
+     'recipe_cost_on_ingredient_rename'),
+]
+
+def ensure_recipe_cost_triggers(cur):
+    """없는 트리거만 만든다 - DROP/CREATE TRIGGER 는 테이블에 ACCESS EXCLUSIVE 잠금을 잡아
+    동기화 트랜잭션이 끝날 때까지 읽기를 막으므로, 이미 있으면 건드리지 않는다"""
+    cur.execute("""
+        SELECT tgname FROM pg_trigger
+        WHERE NOT tgisinternal AND tgname = ANY(%s)
+    """, ([name for name, _, _, _, _ in RECIPE_COST_TRIGGERS],))
+    existing = {row[0] for row in cur.fetchall()}
+    for name, table, event, referencing, func in RECIPE_COST_TRIGGERS:
+        if name not in existing:
+            cur.execute(f"""
+                CREATE TRIGGER {name}
+                AFTER {event} ON {table}
+                REFERENCING {referencing}
+                FOR EACH STATEMENT EXECUTE FUNCTION {func}();
+            """)
+
+def set_recipe_cost_triggers(cur, enabled):
+    """증분 갱신 트리거를 켜거나 끈다 (대량 적재 중에는 끄고 끝난 뒤 한 번에 재계산)
+    ENABLE/DISABLE TRIGGER 는 SHARE ROW EXCLUSIVE 잠금이라 DROP TRIGGER 와 달리 읽기를 막지 않는다"""
+    action = 'ENABLE' if enabled else 'DISABLE'
+    for name, table, _, _, _ in RECIPE_COST_TRIGGERS:
+        cur.execute(f"ALTER TABLE {table} {action} TRIGGER {name};")
+
+def rebuild_recipe_cost(cur):
+    """recipe_cost 전체 재계산"""
+    cur.execute("SELECT refresh_recipe_cost(NULL, NULL);")
+
+def create_count_estimate_function(cur):
+    """플래너 추정 행 수를 돌려주는 함수 (검색 결과 개수를 estimate 모드로 셀 때 사용)"""
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION count_estimate(query TEXT)
+        RETURNS BIGINT AS $$
+        DECLARE
+            plan JSONB;
+        BEGIN
+            EXECUTE 'EXPLAIN (FORMAT JSON) ' || query INTO plan;
+            RETURN (plan->0->'Plan'->>'Plan Rows')::BIGINT;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+def create_tables(cur):
+    """카탈로그 테이블과 보조 테이블/함수 생성 (이미 있으면 그대로 둔다)"""
+    # Create tables
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS Recipe (
+            recipeID INT PRIMARY KEY,
+            recipeName VARCHAR(100) NOT NULL
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS IngredientName (
+            ingredientID INT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS IngredientPrice (
+            ingredientID INT REFERENCES IngredientName(ingredientID),
+            quarter INT CHECK (quarter BETWEEN 1 AND 4),
+            price DECIMAL(10, 2) NOT NULL,
+            PRIMARY KEY (ingredientID, quarter)
+        );
+    """)
+
+    # 대체 재료 그룹 - 같은 그룹의 재료끼리 서로 바꿔 쓸 수 있다 (substitution_service)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS IngredientSubstitute (
+            ingredientID INT PRIMARY KEY REFERENCES IngredientName(ingredientID),
+            group_name VARCHAR(50) NOT NULL
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS RecipeIngredient_info (
+            recipeID INT REFERENCES Recipe(recipeID),
+            ingredientID INT REFERENCES IngredientName(ingredientID),
+            amount DECIMAL(10, 2) NOT NULL,
+            PRIMARY KEY (recipeID, ingredientID)
+        );
+    """)
+
+    # 알레르기 검색의 이름순 커서 페이지네이션용
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_recipe_name
+        ON Recipe (recipeName, recipeID);
+    """)
+
+    # recipe_nutrition 테이블 생성
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS recipe_nutrition (
+            recipe_id INTEGER PRIMARY KEY,
+            calories DECIMAL,
+            carbohydrate DECIMAL,
+            protein DECIMAL,
+            fat DECIMAL
+        );
+    """)
+
+    create_count_estimate_function(cur)
+
+    create_recipe_cost_schema(cur)
+    create_manifest_table(cur)
+    create_data_version_table(cur)
+    create_service_indexes(cur)
+
+def enable_trigram(cur):
+    """pg_trgm 확장을 켠다 -> 사용 가능 여부 (설치되지 않은 서버면 False)"""
+    cur.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm';")
+    if not cur.fetchone():
+        return False
+    cur.execute("SAVEPOINT enable_trigram;")
     try:
-        # 기존 데이터 삭제 추가
-        cur.execute("TRUNCATE TABLE RecipeIngredient_info CASCADE;")
-        cur.execute("TRUNCATE TABLE IngredientPrice CASCADE;")
-        cur.execute("TRUNCATE TABLE Recipe CASCADE;")
-        cur.execute("TRUNCATE TABLE IngredientName CASCADE;")
-        cur.execute("TRUNCATE TABLE recipe_nutrition CASCADE;")
-        cur.execute("DROP TABLE IF EXISTS users;")  # user 테이블이 있다면 삭제
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+        cur.execute("RELEASE SAVEPOINT enable_trigram;")
+        return True
+    except Exception as e:
+        # 권한이 없으면 확장 없이 진행 (부분 일치 검색은 인덱스 없이 처리된다)
+        print(f"pg_trgm 확장을 켜지 못했습니다: {e}")
+        cur.execute("ROLLBACK TO SAVEPOINT enable_trigram;")
+        return False
 
-        # Create tables
+def create_service_indexes(cur):
+    """서비스 쿼리의 접근 경로에 맞춘 보조 인덱스 (재적재에도 유지된다)"""
+    # 분기만으로 거르는 가격 조회 (recipe_cost 재계산의 quarter = ANY(...))
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_ingredient_price_quarter
+        ON IngredientPrice (quarter, ingredientID) INCLUDE (price);
+    """)
+    # PriceService 의 재료명 일치 조회
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_ingredient_name
+        ON IngredientName (name);
+    """)
+    # 대소문자 무시 재료명 조회 (LOWER(name) = / LIKE '접두어%')
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_ingredient_name_lower
+        ON IngredientName (LOWER(name) text_pattern_ops);
+    """)
+    # 부분 일치 (LIKE '%재료%') 는 pg_trgm 이 있을 때만
+    if enable_trigram(cur):
         cur.execute("""
-            CREATE TABLE IF NOT EXISTS Recipe (
-                recipeID INT PRIMARY KEY,
-                recipeName VARCHAR(100) NOT NULL
-            );
+            CREATE INDEX IF NOT EXISTS idx_ingredient_name_trgm
+            ON IngredientName USING gin (LOWER(name) gin_trgm_ops);
         """)
+    # 재료 -> 레시피 역방향 조회 (가격/재료명 변경 트리거)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_recipe_ingredient_ingredient
+        ON RecipeIngredient_info (ingredientID, recipeID);
+    """)
 
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS IngredientName (
-                ingredientID INT PRIMARY KEY,
-                name VARCHAR(100) NOT NULL
-            );
-        """)
+def _has_index(cur, name):
+    cur.execute("SELECT 1 FROM pg_class WHERE relkind = 'i' AND relname = %s;", (name,))
+    return cur.fetchone() is not None
 
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS IngredientPrice (
-                ingredientID INT REFERENCES IngredientName(ingredientID),
-                quarter INT CHECK (quarter BETWEEN 1 AND 4),
-                price DECIMAL(10, 2) NOT NULL,
-                PRIMARY KEY (ingredientID, quarter)
-            );
-        """)
+def _plan_indexes(plan):
+    """EXPLAIN (FORMAT JSON) 계획 트리에서 쓰인 인덱스 이름"""
+    names = set()
+    if 'Index Name' in plan:
+        names.add(plan['Index Name'])
+    for child in plan.get('Plans', []):
+        names |= _plan_indexes(child)
+    return names
 
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS RecipeIngredient_info (
-                recipeID INT REFERENCES Recipe(recipeID),
-                ingredientID INT REFERENCES IngredientName(ingredientID),
-                amount DECIMAL(10, 2) NOT NULL,
-                PRIMARY KEY (recipeID, ingredientID)
-            );
-        """)
+def index_checks(trigram=False):
+    """(이름, 쿼리, 인자, 계획에 있어야 하는 인덱스) 목록
+    검색 페이지 쿼리는 RecipeService 가 만드는 쿼리 그대로 (첫 페이지와 커서 페이지) 확인한다"""
+    budget_first = _budget_page_query("COUNT(*) OVER ()", [], 5000, 1, 10, 0, None)
+    budget_seek = _budget_page_query("COUNT(*) OVER ()", [], 5000, 1, 10, 0, (1000, 1))
+    allergy_first = _allergy_page_query(1, [1], 10, 0, None)
+    allergy_seek = _allergy_page_query(1, [1], 10, 0, ('가', 1))
+    checks = [
+        ('RecipeService.search_recipes_by_budget', budget_first[0], budget_first[1],
+         ['idx_recipe_cost_quarter_cost']),
+        ('RecipeService.search_recipes_by_budget (커서)', budget_seek[0], budget_seek[1],
+         ['idx_recipe_cost_quarter_cost']),
+        ('RecipeService.search_recipes_by_budget (개수)', _count_query(BUDGET_MATCH_QUERY), (1, 5000),
+         ['idx_recipe_cost_quarter_cost']),
+        ('RecipeService.search_recipes_by_allergy', allergy_first[0], allergy_first[1],
+         ['idx_recipe_name', 'recipe_cost_pkey']),
+        ('RecipeService.search_recipes_by_allergy (커서)', allergy_seek[0], allergy_seek[1],
+         ['idx_recipe_name', 'recipe_cost_pkey']),
+        ('PriceService.get_ingredient_price_by_quarter',
+         INGREDIENT_PRICE_QUERY + " AND ip.quarter = %s ORDER BY ip.quarter", ('두부', 1),
+         ['idx_ingredient_name']),
+        ('refresh_recipe_cost (분기별 가격)',
+         "SELECT ingredientID, price FROM IngredientPrice WHERE quarter = ANY(%s)", ([1],),
+         ['idx_ingredient_price_quarter']),
+        ('recipe_cost 트리거 (재료 -> 레시피)',
+         "SELECT DISTINCT recipeID FROM RecipeIngredient_info WHERE ingredientID = ANY(%s)", ([1],),
+         ['idx_recipe_ingredient_ingredient']),
+        ('RecipeDetailService.get_recipe_details',
+         RECIPE_DETAILS_QUERY, ([1],),
+         ['cooking_step_pkey', 'recipe_nutrition_pkey']),
+        ('user_db.get_user_by_credentials',
+         USER_BY_CREDENTIALS_QUERY, ('user', 'password'),
+         ['users_user_name_key']),
+        ('재료명 접두어 조회',
+         "SELECT ingredientID FROM IngredientName WHERE LOWER(name) LIKE %s", ('두부%',),
+         ['idx_ingredient_name_lower']),
+    ]
+    if trigram:
+        checks.append(('재료명 부분 일치 조회',
+                       "SELECT ingredientID FROM IngredientName WHERE LOWER(name) LIKE %s", ('%두부%',),
+                       ['idx_ingredient_name_trgm']))
+    return checks
 
-        # recipe_nutrition 테이블 생성
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS recipe_nutrition (
-                recipe_id INTEGER PRIMARY KEY,
-                calories DECIMAL,
-                carbohydrate DECIMAL,
-                protein DECIMAL,
-                fat DECIMAL
-            );
-        """)
+def verify_indexes():
+    """EXPLAIN 으로 서비스 쿼리가 인덱스를 쓰는지 확인 -> 실패 목록 (빈 목록이면 통과)
+    적재 직후 테이블이 작으면 플래너가 순차 스캔을 고르므로 순차 스캔을 끄고 쓸 수 있는 경로인지만 본다"""
+    conn = None
+    cur = None
+    failures = []
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("SET LOCAL enable_seqscan = off;")
+        for name, query, params, expected in index_checks(_has_index(cur, 'idx_ingredient_name_trgm')):
+            cur.execute("EXPLAIN (FORMAT JSON) " + query, params)
+            plan = cur.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            used = _plan_indexes(plan[0]['Plan'])
+            missing = [index for index in expected if index not in used]
+            if missing:
+                failures.append({'query': name, 'missing': missing, 'used': sorted(used)})
+                print(f"[인덱스 미사용] {name}: {', '.join(missing)} (사용: {', '.join(sorted(used)) or '없음'})")
+            else:
+                print(f"[확인] {name}: {', '.join(expected)}")
+        return failures
+    finally:
+        if conn:
+            conn.rollback()
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
+
+def init_database(data_dir=DATA_DIR):
+    conn = get_connection()
+    cur = conn.cursor()
+    
+    try:
+        cur.execute("DROP TABLE IF EXISTS users;")  # user 테이블이 있다면 삭제
+
+        create_tables(cur)
+
+        # 적재 중에는 트리거를 끄고, 끝난 뒤 한 번에 전체 재계산한다
+        ensure_recipe_cost_triggers(cur)
+        set_recipe_cost_triggers(cur, False)
 
-        # users 테이블 생성
+        # users 테이블 생성 (database/user_db.py 가 쓰는 컬럼)
         cur.execute("""
             CREATE TABLE IF NOT EXISTS users (
-                id SERIAL PRIMARY KEY,
-                username VARCHAR(50) UNIQUE NOT NULL,
+                user_id SERIAL PRIMARY KEY,
+                user_name VARCHAR(50) UNIQUE NOT NULL,
                 password VARCHAR(100) NOT NULL,
-                email VARCHAR(100) UNIQUE NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                allergy TEXT
             );
         """)
 
-        # Read CSV files
-        base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        recipes_df = pd.read_csv(os.path.join(base_path, 'data', 'Recipe.csv'))
-        ingredients_df = pd.read_csv(os.path.join(base_path, 'data', 'IngredientName.csv'))
-        prices_df = pd.read_csv(os.path.join(base_path, 'data', 'IngredientPrice.csv'))
-        recipe_ingredients_df = pd.read_csv(os.path.join(base_path, 'data', 'RecipeIngredientInfo.csv'))
-
-        # Insert data
-        for _, row in recipes_df.iterrows():
-            cur.execute(
-                "INSERT INTO Recipe (recipeID, recipeName) VALUES (%s, %s)",
-                (row['recipeID'], row['recipeName'])
-            )
-
-        for _, row in ingredients_df.iterrows():
-            cur.execute(
-                "INSERT INTO IngredientName (ingredientID, name) VALUES (%s, %s)",
-                (row['ingredientID'], row['name'])
-            )
-
-        for _, row in prices_df.iterrows():
-            cur.execute(
-                "INSERT INTO IngredientPrice (ingredientID, quarter, price) VALUES (%s, %s, %s)",
-                (int(row['ingredientID']), int(row['quarter']), float(row['price']))
-            )
-
-        for _, row in recipe_ingredients_df.iterrows():
-            cur.execute(
-                """
-                INSERT INTO RecipeIngredient_info (recipeID, ingredientID, amount) 
-                VALUES (%s, %s, %s)
-                ON CONFLICT (recipeID, ingredientID) DO UPDATE 
-                SET amount = EXCLUDED.amount
-                """,
-                (int(row['recipeID']), int(row['ingredientID']), float(row['amount']))
-            )
-
-        # RecipeNutrition.csv 데이터 읽기 및 삽입
-        nutrition_df = pd.read_csv(os.path.join(base_path, 'data', 'RecipeNutrition.csv'))
-        for _, row in nutrition_df.iterrows():
-            cur.execute("""
-                INSERT INTO recipe_nutrition (recipe_id, calories, carbohydrate, protein, fat)
-                VALUES (%s, %s, %s, %s, %s)
-            """, (
-                float(row['recipe_ID']),
-                float(row['calories']),
-                float(row['carbohydrate']),
-                float(row['protein']),
-                float(row['fat'])
-            ))
+        # CSV -> 스테이징 테이블 COPY 후 한 트랜잭션 안에서 교체 (커밋 전까지 읽기 쪽은 이전 데이터를 본다)
+        bulk_load(cur, ['Recipe', 'IngredientName', 'IngredientPrice', 'IngredientSubstitute',
+                        'RecipeIngredient_info', 'recipe_nutrition'], data_dir)
 
+        rebuild_recipe_cost(cur)
+        set_recipe_cost_triggers(cur, True)
+
+        # estimate 모드의 개수 추정이 맞도록 통계 갱신
+        cur.execute("ANALYZE Recipe, IngredientName, IngredientPrice, IngredientSubstitute, RecipeIngredient_info, "
+                    "recipe_cost, recipe_nutrition, users;")
+
+        # 다른 프로세스(서버 등)는 커밋된 버전을 보고, 같은 프로세스는 알림으로 메모리 인덱스/캐시를 무효화
+        reloaded = ['Recipe', 'IngredientName', 'IngredientPrice', 'IngredientSubstitute',
+                    'RecipeIngredient_info', 'recipe_nutrition', 'recipe_cost']
+        bump_data_versions(cur, reloaded)
         conn.commit()
+        notify_data_reload(reloaded)
 
     finally:
         cur.close()
         conn.close()
 
-def init_cooking_method_table():
+def create_cooking_step_table(cur):
+    # 조리 단계는 단계당 한 행 - 단계 수 제한이 없고, 상세 조회는 (recipe_id, step_no) 기본 키 순서대로 읽는다
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS cooking_step (
+        recipe_id INTEGER NOT NULL,
+        step_no INTEGER NOT NULL,
+        text TEXT NOT NULL,
+        PRIMARY KEY (recipe_id, step_no)
+    );
+    """)
+
+    # 이전 형식(cooking_method, 레시피당 manual01~06 컬럼) 테이블이 남아 있으면 단계 행으로 옮기고 지운다
+    cur.execute("SELECT to_regclass('cooking_method') IS NOT NULL;")
+    if cur.fetchone()[0]:
+        cur.execute("""
+            INSERT INTO cooking_step (recipe_id, step_no, text)
+            SELECT cm.recipe_id,
+                   ROW_NUMBER() OVER (PARTITION BY cm.recipe_id ORDER BY step.ordinality),
+                   step.text
+            FROM cooking_method cm
+            CROSS JOIN LATERAL unnest(ARRAY[cm.manual01, cm.manual02, cm.manual03,
+                                            cm.manual04, cm.manual05, cm.manual06])
+                 WITH ORDINALITY AS step(text, ordinality)
+            WHERE cm.recipe_id IS NOT NULL AND btrim(step.text) <> ''
+            ON CONFLICT (recipe_id, step_no) DO NOTHING;
+        """)
+        cur.execute("DROP TABLE cooking_method;")
+
+def init_cooking_step_table(data_dir=DATA_DIR):
+    conn = None
+    cur = None
     try:
         conn = get_connection()
         cur = conn.cursor()
         
-        # 테이블 생성
-        create_table_query = """
-        DROP TABLE IF EXISTS cooking_method;  -- 기존 테이블 삭제
-        CREATE TABLE cooking_method (
-            recipe_id INTEGER,
-            manual01 TEXT,
-            manual02 TEXT,
-            manual03 TEXT,
-            manual04 TEXT,
-            manual05 TEXT,
-            manual06 TEXT
-        );
-        """
-        cur.execute(create_table_query)
-        
-        # pandas로 CSV 파일 읽기
-        csv_path = os.path.join('data', 'CookingMethod.csv')
-        df = pd.read_csv(csv_path)
+        create_cooking_step_table(cur)
         
-        # 데이터 삽입
-        for _, row in df.iterrows():
-            cur.execute("""
-                INSERT INTO cooking_method (recipe_id, manual01, manual02, manual03, manual04, manual05, manual06)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """, (
-                row['recipe_ID'],
-                row['MANUAL01'],
-                row['MANUAL02'],
-                row['MANUAL03'],
-                row['MANUAL04'],
-                row['MANUAL05'],
-                row['MANUAL06']
-            ))
+        # CookingMethod.csv (레시피당 한 줄) -> 단계당 한 행으로 펼쳐 COPY 후 교체 (빈 단계는 빠진다)
+        bulk_load(cur, ['cooking_step'], data_dir)
+
+        cur.execute("ANALYZE cooking_step;")
 
+        create_data_version_table(cur)
+        bump_data_versions(cur, ['cooking_step'])
         conn.commit()
-        print("cooking_method 테이블 생성 및 데이터 import 완료")
+        notify_data_reload(['cooking_step'])
+        print("cooking_step 테이블 생성 및 데이터 import 완료")
         
     except Exception as e:
         print(f"Error: {e}")
@@ -181,6 +514,61 @@ def init_cooking_method_table():
         if conn:
             conn.close()
 
+SYNC_TABLES = ['Recipe', 'IngredientName', 'IngredientPrice', 'IngredientSubstitute', 'RecipeIngredient_info',
+               'recipe_nutrition', 'cooking_step']
+
+def sync_database(data_dir=DATA_DIR, tables=SYNC_TABLES):
+    """CSV 와 비교해 바뀐 행만 반영 (users 등 다른 테이블은 건드리지 않는다)"""
+    conn = None
+    cur = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+
+        create_tables(cur)
+        create_cooking_step_table(cur)
+        # recipe_cost 는 트리거가 바뀐 레시피/분기만 다시 계산한다 (트리거가 없을 때만 만든다)
+        ensure_recipe_cost_triggers(cur)
+
+        stats = sync_tables(cur, tables, data_dir)
+        changed = [table for table, stat in stats.items()
+                   if stat['inserted'] or stat['updated'] or stat['deleted']]
+        if changed:
+            bump_data_versions(cur, changed + ['recipe_cost'])
+        conn.commit()
+
+        if changed:
+            notify_data_reload(changed + ['recipe_cost'])
+        return stats
+
+    except Exception as e:
+        print(f"동기화 중 오류 발생: {e}")
+        if conn:
+            conn.rollback()
+        raise
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
+
 if __name__ == "__main__":
-    init_database()
-    init_cooking_method_table()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="CSV 데이터를 데이터베이스에 적재")
+    parser.add_argument('--sync', action='store_true',
+                        help="전체 재적재 대신 바뀐 행만 반영 (users 테이블 유지)")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="CSV 디렉터리")
+    parser.add_argument('--verify-indexes', action='store_true',
+                        help="적재하지 않고 서비스 쿼리의 인덱스 사용만 확인 (실패하면 종료 코드 1)")
+    args = parser.parse_args()
+
+    if args.verify_indexes:
+        sys.exit(1 if verify_indexes() else 0)
+
+    if args.sync:
+        sync_database(args.data_dir)
+    else:
+        init_database(args.data_dir)
+        init_cooking_step_table(args.data_dir)
+    verify_indexes()
\ No newline at end of file
@@ -0,0 +1,138 @@
+# scripts/sync_data.py
+# CSV 와 마지막 적재 상태(load_manifest)를 비교해 바뀐 행만 반영하는 증분 동기화
+import os
+import time
+
+from scripts.bulk_load import (DATA_DIR, LOAD_SPECS, CsvCopyStream, key_positions, read_rows,
+                               row_hash, row_key, stage_table, staged_select, write_manifest)
+
+
+def _changed_rows(table, rows, stored, result):
+    """저장된 해시와 다른 행만 통과시키고, 본 키/새 해시를 result 에 기록"""
+    positions = key_positions(table)
+    seen = result['seen']
+    hashes = result['hashes']
+    for row in rows:
+        key = row_key(positions, row)
+        value = row_hash(row)
+        repeated = key in seen
+        seen.add(key)
+        hashes[key] = value
+        # 같은 키가 CSV 에 여러 번 나오면 마지막 행이 이기도록 전부 스테이징한다
+        if repeated or stored.get(key) != value:
+            yield row
+
+
+def _stage_deleted_keys(cur, table, keys):
+    """삭제할 키를 임시 테이블에 적재"""
+    key_columns = LOAD_SPECS[table]['key']
+    stage = f"pg_temp.delete_{table.lower()}"
+    cur.execute(f"DROP TABLE IF EXISTS {stage};")
+    cur.execute(f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS "
+                f"SELECT {', '.join(key_columns)} FROM {table} LIMIT 0;")
+    cur.copy_expert(
+        f"COPY {stage} ({', '.join(key_columns)}) FROM STDIN WITH (FORMAT csv)",
+        CsvCopyStream(key.split('|') for key in keys)
+    )
+    return stage
+
+
+def _key_match(alias_a, alias_b, key_columns):
+    return ' AND '.join(f"{alias_a}.{column} = {alias_b}.{column}" for column in key_columns)
+
+
+def _apply_changes(cur, table, stage):
+    """스테이징된 행을 반영 -> (삽입 수, 수정 수)"""
+    spec = LOAD_SPECS[table]
+    columns = [column for _, column, _ in spec['columns']]
+    key_columns = spec['key']
+
+    if spec['upsert']:
+        values = [column for column in columns if column not in key_columns]
+        cur.execute(f"""
+            INSERT INTO {table} AS t ({', '.join(columns)})
+            {staged_select(table, stage)}
+            ON CONFLICT ({', '.join(key_columns)}) DO UPDATE
+            SET {', '.join(f"{column} = EXCLUDED.{column}" for column in values)}
+            WHERE ({', '.join(f"t.{column}" for column in values)})
+                IS DISTINCT FROM ({', '.join(f"EXCLUDED.{column}" for column in values)})
+            RETURNING (xmax = 0)
+        """)
+        flags = [row[0] for row in cur.fetchall()]
+        inserted = sum(1 for flag in flags if flag)
+        return inserted, len(flags) - inserted
+
+    # 키 제약조건이 없는 테이블은 해당 키의 행을 지우고 다시 넣는다
+    cur.execute(f"""
+        DELETE FROM {table} t
+        USING (SELECT DISTINCT {', '.join(key_columns)} FROM {stage}) s
+        WHERE {_key_match('t', 's', key_columns)}
+    """)
+    replaced = cur.rowcount
+    cur.execute(f"INSERT INTO {table} ({', '.join(columns)}) {staged_select(table, stage)}")
+    inserted = cur.rowcount
+    return max(inserted - replaced, 0), min(inserted, replaced)
+
+
+def sync_tables(cur, tables, data_dir=DATA_DIR):
+    """바뀐 행만 삽입/수정/삭제 - TRUNCATE 없이 행 단위 잠금만 쓰므로 읽기를 막지 않는다"""
+    tables = [table for table in LOAD_SPECS if table in tables]
+    plans = {}
+    for table in tables:
+        start = time.perf_counter()
+        cur.execute("SELECT row_key, row_hash FROM load_manifest WHERE table_name = %s", (table,))
+        stored = dict(cur.fetchall())
+        result = {'seen': set(), 'hashes': {}}
+        spec = LOAD_SPECS[table]
+        rows = _changed_rows(table, read_rows(table, data_dir), stored, result)
+        stage, staged_count, _ = stage_table(cur, table, data_dir, rows)
+        changed = {key: value for key, value in result['hashes'].items() if stored.get(key) != value}
+        plans[table] = {
+            'stage': stage,
+            'staged': staged_count,
+            # manifest 가 비어 있으면 (이전 버전으로 적재된 DB) 전체 행을 스테이징한 상태다
+            'full': not stored,
+            'deleted_keys': [key for key in stored if key not in result['seen']],
+            'hashes': changed,
+            'total': len(result['seen']),
+            'seconds': time.perf_counter() - start,
+        }
+
+    stats = {}
+    # 부모 테이블부터 삽입/수정
+    for table in tables:
+        plan = plans[table]
+        start = time.perf_counter()
+        inserted, updated = _apply_changes(cur, table, plan['stage']) if plan['staged'] else (0, 0)
+        plan['seconds'] += time.perf_counter() - start
+        stats[table] = {'inserted': inserted, 'updated': updated, 'deleted': 0}
+
+    # 자식 테이블부터 삭제
+    for table in reversed(tables):
+        plan = plans[table]
+        key_columns = LOAD_SPECS[table]['key']
+        start = time.perf_counter()
+        if plan['full']:
+            cur.execute(f"""
+                DELETE FROM {table} t
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM {plan['stage']} s WHERE {_key_match('s', 't', key_columns)}
+                )
+            """)
+        elif plan['deleted_keys']:
+            stage = _stage_deleted_keys(cur, table, plan['deleted_keys'])
+            cur.execute(f"DELETE FROM {table} t USING {stage} d WHERE {_key_match('t', 'd', key_columns)}")
+        else:
+            continue
+        stats[table]['deleted'] = cur.rowcount
+        plan['seconds'] += time.perf_counter() - start
+
+    for table in tables:
+        plan = plans[table]
+        write_manifest(cur, table, plan['hashes'], plan['deleted_keys'], replace=plan['full'])
+        stat = stats[table]
+        stat['unchanged'] = plan['total'] - stat['inserted'] - stat['updated']
+        stat['seconds'] = plan['seconds']
+        print(f"{table}: 추가 {stat['inserted']:,}, 수정 {stat['updated']:,}, 삭제 {stat['deleted']:,}, "
+              f"변경 없음 {stat['unchanged']:,} ({stat['seconds']:.2f}초)")
+    return stats
@@ -0,0 +1,584 @@
+# server.py
+# 서비스 계층을 JSON HTTP API 로 노출하는 서버 (표준 라이브러리만 사용)
+# main.py 의 대화형 메뉴와 달리 여러 사용자를 동시에 처리하고, 로드 밸런서 뒤에 여러 대를 둘 수 있다
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import gzip
+import json
+import re
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import psycopg2
+
+from database.backend import get_backend
+from database.db_connector import get_pool_metrics
+from database.instrumentation import get_caller_stats
+from database.statements import get_statement_totals
+from database.user_db import create_user
+from services.meal_plan_service import MealPlanService, NUTRIENTS
+from services.nutrition_search_service import METRICS, NutritionSearchService
+from services.pagination import InvalidCursorError
+from services.price_service import PriceService
+from services.recipe_detail_service import RecipeDetailService
+from services.recipe_service import RecipeService
+from services.search_service import SearchService
+from services.shopping_list_service import ShoppingListService
+from services.substitution_service import SubstitutionService
+from services.user_service import UserService
+
+DEFAULT_HOST = os.environ.get('API_HOST', '0.0.0.0')
+DEFAULT_PORT = int(os.environ.get('API_PORT', 8000))
+DEFAULT_WORKERS = int(os.environ.get('API_WORKERS', 1))        # 프로세스 수 (prefork)
+DEFAULT_THREADS = int(os.environ.get('API_THREADS', 16))       # 프로세스당 요청 처리 스레드 수
+GZIP_MIN_SIZE = int(os.environ.get('API_GZIP_MIN_SIZE', 1024))  # 이보다 작은 응답은 압축하지 않는다
+GZIP_LEVEL = int(os.environ.get('API_GZIP_LEVEL', 5))
+KEEPALIVE_TIMEOUT = float(os.environ.get('API_KEEPALIVE_TIMEOUT', 15))  # 유휴 keep-alive 커넥션을 닫기까지(초)
+QUEUE_SIZE = int(os.environ.get('API_QUEUE_SIZE', 64))          # 스레드가 모두 바쁠 때 기다릴 수 있는 커넥션 수
+MAX_BODY_SIZE = 64 * 1024
+
+
+class ApiError(Exception):
+    """HTTP 상태 코드와 함께 돌려줄 오류"""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"JSON 으로 바꿀 수 없는 값: {type(value).__name__}")
+
+
+def _user_to_dict(user):
+    return {'user_id': user.user_id, 'username': user.username, 'allergy': user.allergy}
+
+
+class Request:
+    """라우트 함수에 넘기는 요청 정보 (쿼리 문자열, JSON 본문, 경로 인자)"""
+    def __init__(self, query, body, path_args):
+        self.query = query
+        self.body = body
+        self.path_args = path_args
+
+    def arg(self, name, type=str, default=None, required=False):
+        values = self.query.get(name)
+        if not values or values[0] == '':
+            if required:
+                raise ApiError(HTTPStatus.BAD_REQUEST, f"'{name}' 값이 필요합니다")
+            return default
+        try:
+            return type(values[0])
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"'{name}' 값이 올바르지 않습니다: {values[0]!r}")
+
+    def quarter(self, required=True):
+        quarter = self.arg('quarter', int, required=required)
+        if quarter is not None and not 1 <= quarter <= 4:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "분기는 1-4 사이여야 합니다")
+        return quarter
+
+    def field(self, name, required=True):
+        value = self.body.get(name) if isinstance(self.body, dict) else None
+        if required and (value is None or value == ''):
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"'{name}' 값이 필요합니다")
+        return value
+
+
+def _page_args(req):
+    """page/per_page/cursor/count_mode - cursor 가 있으면 커서 방식으로 조회"""
+    per_page = req.arg('per_page', int, 10)
+    if not 1 <= per_page <= 100:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "per_page 는 1-100 사이여야 합니다")
+    page = req.arg('page', int, 1)
+    if page < 1:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "page 는 1 이상이어야 합니다")
+    kwargs = {'per_page': per_page}
+    count_mode = req.arg('count_mode')
+    if count_mode:
+        kwargs['count_mode'] = count_mode
+    return page, req.arg('cursor'), kwargs
+
+
+def search_budget(req):
+    budget = req.arg('budget', float, required=True)
+    quarter = req.quarter()
+    page, cursor, kwargs = _page_args(req)
+    if cursor:
+        return RecipeService.search_recipes_by_budget_cursor(budget, quarter, cursor, **kwargs)
+    return RecipeService.search_recipes_by_budget(budget, quarter, page, **kwargs)
+
+
+def search_allergy(req):
+    allergy = req.arg('allergy', default='')
+    quarter = req.quarter()
+    page, cursor, kwargs = _page_args(req)
+    if cursor:
+        return RecipeService.search_recipes_by_allergy_cursor(allergy, quarter, cursor, **kwargs)
+    return RecipeService.search_recipes_by_allergy(allergy, quarter, page, **kwargs)
+
+
+def all_recipes(req):
+    quarter = req.quarter()
+    page, cursor, kwargs = _page_args(req)
+    if cursor:
+        return RecipeService.get_all_recipes_cursor(quarter, cursor, **kwargs)
+    return RecipeService.get_all_recipes(quarter, page, **kwargs)
+
+
+def _recipe_ids(req):
+    ids = req.arg('ids', required=True)
+    try:
+        recipe_ids = [int(value) for value in ids.split(',') if value.strip()]
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"'ids' 값이 올바르지 않습니다: {ids!r}")
+    if len(recipe_ids) > 100:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "한 번에 100개까지 조회할 수 있습니다")
+    return recipe_ids
+
+
+def search_text(req):
+    """레시피명/조리 단계 전문 검색 - quarter/budget/allergy 조건을 함께 걸 수 있다"""
+    page, cursor, kwargs = _page_args(req)
+    if cursor:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "전문 검색은 page 로만 넘길 수 있습니다")
+    return SearchService.search_recipes(req.arg('q', required=True), req.quarter(required=False),
+                                        req.arg('budget', float), req.arg('allergy', default=''),
+                                        page, kwargs['per_page'])
+
+
+def search_nutrition(req):
+    """min_<지표>/max_<지표> 범위 조건과 sort/order 정렬 - quarter/budget/allergy 조건을 함께 걸 수 있다"""
+    page, cursor, kwargs = _page_args(req)
+    if cursor:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "영양 검색은 page 로만 넘길 수 있습니다")
+    filters = {}
+    for metric in METRICS:
+        low, high = req.arg(f'min_{metric}', float), req.arg(f'max_{metric}', float)
+        if low is not None or high is not None:
+            filters[metric] = (low, high)
+    return NutritionSearchService.search_by_nutrition(filters, req.arg('sort'), req.arg('order', default='desc'),
+                                                      req.quarter(required=False), req.arg('budget', float),
+                                                      req.arg('allergy', default=''), page, kwargs['per_page'])
+
+
+def recipe_detail(req):
+    recipe_details = RecipeDetailService.get_recipe_details(int(req.path_args[0]))
+    if recipe_details is None:
+        raise ApiError(HTTPStatus.NOT_FOUND, "레시피를 찾을 수 없습니다")
+    return recipe_details
+
+
+def recipe_details_many(req):
+    return RecipeDetailService.get_recipe_details_many(_recipe_ids(req))
+
+
+def _max_swaps(req):
+    max_swaps = req.arg('max_swaps', int, 3)
+    if not 1 <= max_swaps <= 10:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "max_swaps 는 1-10 사이여야 합니다")
+    return max_swaps
+
+
+def recipe_substitutions(req):
+    suggestion = SubstitutionService.suggest_substitutions(int(req.path_args[0]), req.quarter(),
+                                                           req.arg('budget', float), _max_swaps(req))
+    if suggestion is None:
+        raise ApiError(HTTPStatus.NOT_FOUND, "레시피 또는 해당 분기 가격을 찾을 수 없습니다")
+    return suggestion
+
+
+def substitutions_many(req):
+    """검색 결과 한 페이지(ids)의 대체 재료 제안을 한 번에"""
+    recipe_ids = _recipe_ids(req)
+    suggestions = SubstitutionService.suggest_substitutions_many(recipe_ids, req.quarter(),
+                                                                 req.arg('budget', float), _max_swaps(req))
+    return {
+        'recipes': [suggestions[recipe_id] for recipe_id in dict.fromkeys(recipe_ids) if recipe_id in suggestions],
+        'missing': [recipe_id for recipe_id in dict.fromkeys(recipe_ids) if recipe_id not in suggestions],
+    }
+
+
+def ingredient_price(req):
+    return PriceService.get_ingredient_price_by_quarter(req.arg('name', required=True), req.quarter(required=False))
+
+
+def recipe_price(req):
+    return PriceService.get_recipe_price_by_quarter(req.arg('name', required=True), req.quarter(required=False))
+
+
+def ingredient_trend(req):
+    return PriceService.analyze_price_trend(ingredient_name=req.arg('name', required=True))
+
+
+def recipe_trend(req):
+    return PriceService.analyze_price_trend(recipe_name=req.arg('name', required=True))
+
+
+def meal_plan(req):
+    meals = req.arg('meals', int, 7)
+    if not 1 <= meals <= 21:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "meals 는 1-21 사이여야 합니다")
+    time_limit = req.arg('time_limit', float, 1.0)
+    if not 0 < time_limit <= 5:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "time_limit 은 0 초과 5 이하여야 합니다")
+    # weight_<영양소>=값 으로 점수 가중치 지정 (하나도 없으면 기본 가중치)
+    weights = {nutrient: req.arg(f'weight_{nutrient}', float) for nutrient in NUTRIENTS}
+    weights = {nutrient: weight for nutrient, weight in weights.items() if weight is not None} or None
+    kwargs = {}
+    variety_weight = req.arg('variety_weight', float)
+    if variety_weight is not None:
+        if variety_weight < 0:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "variety_weight 는 0 이상이어야 합니다")
+        kwargs['variety_weight'] = variety_weight
+    return MealPlanService.plan_meals(req.arg('budget', float, required=True), req.quarter(), meals,
+                                      max_calories=req.arg('max_calories', float),
+                                      allergy=req.arg('allergy', default=''), weights=weights,
+                                      time_limit=time_limit, **kwargs)
+
+
+def shopping_list(req):
+    """본문: {"recipes": [{"recipe_id": 1, "servings": 2}, ...], "quarter": 1(생략 가능)}"""
+    recipes = req.field('recipes')
+    if not isinstance(recipes, list) or not all(isinstance(item, dict) for item in recipes):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "'recipes' 는 {recipe_id, servings} 목록이어야 합니다")
+    try:
+        items = [(int(item['recipe_id']), item.get('servings', 1)) for item in recipes]
+    except (KeyError, TypeError, ValueError):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "'recipes' 항목에 올바른 recipe_id 가 필요합니다")
+    quarter = req.field('quarter', required=False)
+    if quarter is not None and quarter not in (1, 2, 3, 4):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "분기는 1-4 사이여야 합니다")
+    return ShoppingListService.build_shopping_list(items, quarter)
+
+
+def login(req):
+    user = UserService.login(req.field('username'), req.field('password'))
+    if user is None:
+        raise ApiError(HTTPStatus.UNAUTHORIZED, "잘못된 사용자명 또는 비밀번호입니다")
+    return _user_to_dict(user)
+
+
+def register(req):
+    """409 는 이미 있는 사용자명일 때만 - 잘못된 값은 400, 그 밖의 실패는 500"""
+    username, password = req.field('username'), req.field('password')
+    allergy = req.field('allergy', required=False) or ''
+    if not all(isinstance(value, str) for value in (username, password, allergy)):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "username/password/allergy 는 문자열이어야 합니다")
+    try:
+        user_id = create_user(username, password, allergy)
+    except psycopg2.errors.UniqueViolation:
+        user_id = None   # 같은 사용자명으로 동시에 가입
+    except psycopg2.DataError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "사용자명 또는 비밀번호가 너무 깁니다")
+    if user_id is None:
+        raise ApiError(HTTPStatus.CONFLICT, "이미 존재하는 사용자명입니다")
+    user = UserService.login(username, password)
+    if user is None:
+        raise ApiError(HTTPStatus.INTERNAL_SERVER_ERROR, "사용자를 만들었지만 조회하지 못했습니다")
+    return HTTPStatus.CREATED, _user_to_dict(user)
+
+
+def health(req):
+    return {'status': 'ok', 'pid': os.getpid()}
+
+
+def metrics(req):
+    """이 워커 프로세스의 풀/쿼리/캐시 통계"""
+    result = {
+        'pid': os.getpid(),
+        'detail_cache': RecipeDetailService.cache_stats(),
+        'queries': get_caller_stats(),
+    }
+    if not get_backend():
+        result['pool'] = get_pool_metrics()
+        result['statements'] = get_statement_totals()
+    return result
+
+
+# (메서드, 경로 정규식, 처리 함수) - 위에서부터 처음 맞는 것을 쓴다
+ROUTES = [
+    ('GET', r'/recipes/budget', search_budget),
+    ('GET', r'/recipes/allergy', search_allergy),
+    ('GET', r'/recipes/search', search_text),
+    ('GET', r'/recipes/nutrition', search_nutrition),
+    ('GET', r'/recipes', all_recipes),
+    ('GET', r'/recipes/details', recipe_details_many),
+    ('GET', r'/recipes/(\d+)', recipe_detail),
+    ('GET', r'/recipes/(\d+)/substitutions', recipe_substitutions),
+    ('GET', r'/substitutions', substitutions_many),
+    ('GET', r'/prices/ingredient', ingredient_price),
+    ('GET', r'/prices/recipe', recipe_price),
+    ('GET', r'/trends/ingredient', ingredient_trend),
+    ('GET', r'/trends/recipe', recipe_trend),
+    ('GET', r'/meal-plans', meal_plan),
+    ('POST', r'/shopping-lists', shopping_list),
+    ('POST', r'/login', login),
+    ('POST', r'/users', register),
+    ('GET', r'/health', health),
+    ('GET', r'/metrics', metrics),
+]
+_COMPILED_ROUTES = [(method, re.compile(pattern + r'/?'), func) for method, pattern, func in ROUTES]
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'    # keep-alive (로드 밸런서와 커넥션을 재사용)
+    # 커넥션이 스레드 하나를 차지하므로 다음 요청 없이 이 시간이 지나면 닫는다 (읽기 도중 멈춘 요청도 같다)
+    timeout = KEEPALIVE_TIMEOUT
+    server_version = 'RecipeAPI/1.0'
+    gzip_min_size = GZIP_MIN_SIZE
+    gzip_level = GZIP_LEVEL
+    quiet = False
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def _handle(self, method):
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        try:
+            func, path_args = self._route(method, url.path)
+            req = Request(parse_qs(url.query), self._read_body() if method == 'POST' else {}, path_args)
+            result = func(req)
+            status = HTTPStatus.OK
+            if isinstance(result, tuple):
+                status, result = result
+        except ApiError as e:
+            status, result = e.status, {'error': e.message}
+        except (InvalidCursorError, ValueError) as e:
+            status, result = HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        except Exception as e:
+            print(f"요청 처리 중 오류 발생 ({method} {self.path}): {e}")
+            status, result = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': "서버 오류"}
+        handle_ms = (time.perf_counter() - start) * 1000
+        body = json.dumps(result, ensure_ascii=False, default=_json_default).encode('utf-8')
+        self._send(status, body, handle_ms, start)
+
+    def _route(self, method, path):
+        allowed = False
+        for route_method, pattern, func in _COMPILED_ROUTES:
+            match = pattern.fullmatch(path)
+            if match:
+                if route_method == method:
+                    return func, match.groups()
+                allowed = True
+        if allowed:
+            raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} 는 지원하지 않습니다")
+        raise ApiError(HTTPStatus.NOT_FOUND, f"없는 경로입니다: {path}")
+
+    def _read_body(self):
+        # 본문을 읽지 않고 거절하면 남은 본문이 같은 커넥션의 다음 요청으로 읽히므로 응답 후 커넥션을 닫는다
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            self.close_connection = True
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Content-Length 가 올바르지 않습니다")
+        if length < 0:
+            self.close_connection = True
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Content-Length 가 올바르지 않습니다")
+        if length > MAX_BODY_SIZE:
+            self.close_connection = True
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "요청 본문이 너무 큽니다")
+        raw = self.rfile.read(length) if length else b''
+        if not raw:
+            return {}
+        try:
+            return json.loads(raw)
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "요청 본문이 올바른 JSON 이 아닙니다")
+
+    def _accepts_gzip(self):
+        for part in self.headers.get('Accept-Encoding', '').split(','):
+            coding, _, params = part.strip().partition(';')
+            if coding.strip().lower() in ('gzip', '*'):
+                return params.replace(' ', '') not in ('q=0', 'q=0.0')
+        return False
+
+    def _send(self, status, body, handle_ms, start):
+        compressed = False
+        if len(body) >= self.gzip_min_size and self._accepts_gzip():
+            body = gzip.compress(body, compresslevel=self.gzip_level)
+            compressed = True
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept-Encoding')
+        if compressed:
+            self.send_header('Content-Encoding', 'gzip')
+        # app: 서비스 호출까지, total: 직렬화/압축 포함
+        total_ms = (time.perf_counter() - start) * 1000
+        self.send_header('Server-Timing', f'app;dur={handle_ms:.2f}, total;dur={total_ms:.2f}')
+        self.send_header('X-Response-Time', f'{total_ms:.2f}ms')
+        self.send_header('X-Worker-Pid', str(os.getpid()))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+_BUSY_BODY = json.dumps({'error': "서버가 바쁩니다. 잠시 후 다시 시도하세요"}, ensure_ascii=False).encode('utf-8')
+_BUSY_RESPONSE = (b'HTTP/1.1 503 Service Unavailable\r\n'
+                  b'Content-Type: application/json; charset=utf-8\r\n'
+                  b'Content-Length: ' + str(len(_BUSY_BODY)).encode() + b'\r\n'
+                  b'Retry-After: 1\r\n'
+                  b'Connection: close\r\n\r\n' + _BUSY_BODY)
+
+
+class PooledHTTPServer(HTTPServer):
+    """요청마다 스레드를 만들지 않고 고정 크기 스레드 풀에서 처리하는 서버
+    스레드 수를 DB 커넥션 풀 크기(DB_POOL_MAX_SIZE)에 맞추면 커넥션 대기 없이 처리된다
+    처리 중이거나 기다리는 커넥션이 threads + queue_size 개를 넘으면 새 커넥션은 바로 503 으로 거절한다"""
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, server_address, handler_class, threads=DEFAULT_THREADS, bind_and_activate=True,
+                 queue_size=QUEUE_SIZE):
+        super().__init__(server_address, handler_class, bind_and_activate)
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='api')
+        self._slots = threading.BoundedSemaphore(threads + queue_size)
+        self.rejected = 0
+
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            self._reject(request)
+            return
+        try:
+            self._executor.submit(self._process, request, client_address)
+        except RuntimeError:
+            self._slots.release()   # 종료 중
+            self.shutdown_request(request)
+
+    def _reject(self, request):
+        """요청을 읽지 않고 503 을 보내고 닫는다 - 받는 스레드를 오래 붙잡지 않도록 짧은 타임아웃으로"""
+        try:
+            request.settimeout(1)
+            request.sendall(_BUSY_RESPONSE)
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(request)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=False)
+
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT, threads=DEFAULT_THREADS, sock=None,
+                gzip_min_size=GZIP_MIN_SIZE, gzip_level=GZIP_LEVEL, quiet=False,
+                keepalive_timeout=KEEPALIVE_TIMEOUT, queue_size=QUEUE_SIZE):
+    """서버 객체 생성 - sock 을 주면 (prefork 부모가 연) 그 소켓에서 받는다"""
+    handler = type('ConfiguredApiHandler', (ApiHandler,), {
+        'gzip_min_size': gzip_min_size, 'gzip_level': gzip_level, 'quiet': quiet, 'timeout': keepalive_timeout})
+    server = PooledHTTPServer((host, port), handler, threads, bind_and_activate=sock is None, queue_size=queue_size)
+    if sock is not None:
+        server.socket.close()
+        server.socket = sock
+        server.server_address = sock.getsockname()
+    return server
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS, threads=DEFAULT_THREADS, **options):
+    """workers 개 프로세스가 같은 소켓에서 요청을 나눠 받는다 (1 이면 현재 프로세스에서 실행)
+    DB 커넥션 풀은 프로세스마다 따로 만들어진다 (database/db_connector.get_pool)"""
+    get_backend()
+    if workers <= 1 or not hasattr(os, 'fork'):
+        server = make_server(host, port, threads, **options)
+        print(f"API 서버 시작: http://{host}:{server.server_address[1]} (스레드 {threads}개)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return
+
+    sock = socket.create_server((host, port), backlog=PooledHTTPServer.request_queue_size, reuse_port=False)
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, lambda *_: os._exit(0))
+            server = make_server(host, port, threads, sock=sock, **options)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                os._exit(0)
+        children.append(pid)
+    print(f"API 서버 시작: http://{host}:{sock.getsockname()[1]} (프로세스 {workers}개 × 스레드 {threads}개)")
+
+    signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        while children:
+            pid, _ = os.waitpid(-1, 0)
+            if pid in children:
+                children.remove(pid)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        sock.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="레시피 서비스 JSON HTTP API 서버")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="워커 프로세스 수")
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS, help="프로세스당 요청 처리 스레드 수")
+    parser.add_argument('--gzip-min-size', type=int, default=GZIP_MIN_SIZE, help="압축할 최소 응답 크기 (바이트)")
+    parser.add_argument('--gzip-level', type=int, default=GZIP_LEVEL, choices=range(1, 10))
+    parser.add_argument('--quiet', action='store_true', help="요청 로그를 남기지 않는다")
+    parser.add_argument('--keepalive-timeout', type=float, default=KEEPALIVE_TIMEOUT,
+                        help="유휴 keep-alive 커넥션을 닫기까지 기다리는 시간 (초)")
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE,
+                        help="스레드가 모두 바쁠 때 기다릴 수 있는 커넥션 수 (넘으면 503)")
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.workers, args.threads,
+          gzip_min_size=args.gzip_min_size, gzip_level=args.gzip_level, quiet=args.quiet,
+          keepalive_timeout=args.keepalive_timeout, queue_size=args.queue_size)
@@ -0,0 +1,159 @@
+# services/allergen_index.py
+import os
+import threading
+
+import numpy as np
+
+from database.backend import get_backend
+from database.db_connector import get_connection
+from database.events import check_data_versions, on_data_reload, touches
+from services.cache import LRUCache
+
+# 알레르기 단어 조합별 제외 레시피 캐시 크기 (조합은 사용자가 보내는 값이라 개수를 제한한다)
+ALLERGY_CACHE_SIZE = int(os.environ.get('ALLERGY_CACHE_SIZE', 256))
+
+
+class AllergenIndex:
+    """재료 -> 레시피 역색인 - 알레르기 재료의 레시피 목록을 합쳐 제외할 레시피를 구한다"""
+    SOURCE_TABLES = ('Recipe', 'IngredientName', 'RecipeIngredient_info')
+
+    def __init__(self, loader=None):
+        self._loader = loader or self._load
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    @staticmethod
+    def _load():
+        backend = get_backend()
+        if backend:
+            return backend.allergen_source()
+        return AllergenIndex._load_from_db()
+
+    @staticmethod
+    def _load_from_db():
+        """(재료 목록, 레시피 ID 목록, (레시피 ID, 재료 ID) 목록) 조회"""
+        conn = None
+        cur = None
+        try:
+            conn = get_connection()
+            cur = conn.cursor()
+            cur.execute("SELECT ingredientID, name FROM IngredientName")
+            ingredients = cur.fetchall()
+            cur.execute("SELECT recipeID FROM Recipe")
+            recipe_ids = [row[0] for row in cur.fetchall()]
+            cur.execute("SELECT recipeID, ingredientID FROM RecipeIngredient_info")
+            pairs = cur.fetchall()
+            return ingredients, recipe_ids, pairs
+        finally:
+            if cur:
+                cur.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def build(ingredients, recipe_ids, pairs):
+        """재료 위치별 레시피 위치 목록(postings)과 레시피 위치별 재료 ID 목록을 CSR 배열로 만든다
+        레시피/재료는 ID 순으로 정렬해 위치를 정하고, 목록에 없는 ID 를 가리키는 행은 버린다"""
+        ingredients = sorted(ingredients, key=lambda row: row[0])
+        ingredient_ids = np.array([ingredient_id for ingredient_id, _ in ingredients], dtype=np.int64)
+        names = [(name or '').lower() for _, name in ingredients]
+        recipe_ids = np.unique(np.array(recipe_ids, dtype=np.int64))
+
+        pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+        recipe_pos = np.searchsorted(recipe_ids, pairs[:, 0])
+        ingredient_pos = np.searchsorted(ingredient_ids, pairs[:, 1])
+        known = (recipe_pos < len(recipe_ids)) & (ingredient_pos < len(ingredient_ids))
+        known[known] = ((recipe_ids[recipe_pos[known]] == pairs[known, 0])
+                        & (ingredient_ids[ingredient_pos[known]] == pairs[known, 1]))
+        recipe_pos, ingredient_pos = recipe_pos[known], ingredient_pos[known]
+        # (레시피, 재료) 중복 행은 한 번만
+        keys = np.unique(recipe_pos * max(len(ingredient_ids), 1) + ingredient_pos)
+        recipe_pos, ingredient_pos = np.divmod(keys, max(len(ingredient_ids), 1))
+
+        # keys 가 (레시피, 재료) 순이라 레시피별 재료는 이미 정렬되어 있다
+        recipe_offsets = np.concatenate(([0], np.cumsum(np.bincount(recipe_pos, minlength=len(recipe_ids)))))
+        order = np.argsort(ingredient_pos, kind='stable')
+        posting_offsets = np.concatenate(([0], np.cumsum(np.bincount(ingredient_pos, minlength=len(ingredient_ids)))))
+        return {
+            'names': names,
+            'ingredient_ids': ingredient_ids,
+            'recipe_ids': recipe_ids,
+            'recipe_offsets': recipe_offsets,
+            'recipe_ingredients': ingredient_ids[ingredient_pos],
+            'posting_offsets': posting_offsets,
+            'postings': recipe_pos[order],
+            # 알레르기 단어 조합 -> 제외할 레시피 위치 (정렬된 배열), 스냅샷과 함께 버려진다
+            'excluded': LRUCache(maxsize=ALLERGY_CACHE_SIZE),
+        }
+
+    def _get_snapshot(self):
+        check_data_versions()
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self.build(*self._loader())
+                snapshot = self._snapshot
+        return snapshot
+
+    def invalidate(self, tables=None):
+        """원본 테이블이 재적재되면 다음 조회 때 다시 만든다"""
+        if touches(tables, self.SOURCE_TABLES):
+            with self._lock:
+                self._snapshot = None
+
+    def excluded_positions(self, allergies):
+        """(스냅샷, 알레르기 재료를 쓰는 레시피 위치 배열) - 이름에 단어를 포함하는 재료의 postings 합집합"""
+        snapshot = self._get_snapshot()
+        key = frozenset(a.strip().lower() for a in allergies if a.strip())
+        cache = snapshot['excluded']
+        positions = cache.get(key)
+        if positions is None:
+            offsets = snapshot['posting_offsets']
+            postings = snapshot['postings']
+            matched = [postings[offsets[pos]:offsets[pos + 1]]
+                       for pos, name in enumerate(snapshot['names']) if key and any(term in name for term in key)]
+            positions = np.unique(np.concatenate(matched)) if matched else np.empty(0, dtype=np.int64)
+            cache.set(key, positions)
+        return snapshot, positions
+
+    def contains_allergens(self, recipe_ids, allergies):
+        """recipe_ids 각각이 알레르기 재료를 쓰는지 (bool 배열)"""
+        snapshot, positions = self.excluded_positions(allergies)
+        return np.isin(np.asarray(recipe_ids, dtype=np.int64), snapshot['recipe_ids'][positions])
+
+    def excluded_recipe_ids(self, allergies):
+        """알레르기 재료를 하나라도 쓰는 레시피 ID 목록"""
+        return self.split(allergies)[0]
+
+    def split(self, allergies):
+        """(제외할 레시피 ID 목록, 남는 레시피 수) - 같은 스냅샷 기준"""
+        snapshot, positions = self.excluded_positions(allergies)
+        return snapshot['recipe_ids'][positions].tolist(), len(snapshot['recipe_ids']) - len(positions)
+
+    def safe_recipe_ids(self, allergies):
+        """알레르기 재료를 쓰지 않는 레시피 ID 목록"""
+        snapshot, positions = self.excluded_positions(allergies)
+        return np.delete(snapshot['recipe_ids'], positions).tolist()
+
+    def recipe_ingredients(self, recipe_ids):
+        """recipe_ids 각각의 재료 ID 목록 (정렬됨, 없는 레시피는 빈 목록)"""
+        snapshot = self._get_snapshot()
+        known_ids = snapshot['recipe_ids']
+        offsets = snapshot['recipe_offsets']
+        ingredients = snapshot['recipe_ingredients']
+        result = []
+        for recipe_id in recipe_ids:
+            pos = int(np.searchsorted(known_ids, recipe_id))
+            if pos < len(known_ids) and known_ids[pos] == recipe_id:
+                result.append(ingredients[offsets[pos]:offsets[pos + 1]].tolist())
+            else:
+                result.append([])
+        return result
+
+    def recipe_count(self):
+        return len(self._get_snapshot()['recipe_ids'])
+
+
+allergen_index = AllergenIndex()
+on_data_reload(allergen_index.invalidate)
@@ -0,0 +1,232 @@
+# services/async_service.py
+# RecipeService / PriceService / RecipeDetailService 의 asyncio 버전 - 같은 쿼리와 같은 결과 딕셔너리를 돌려준다
+# 한 이벤트 루프에서 여러 세션의 쿼리를 동시에 처리하고, 한 화면에 필요한 조회를 asyncio.gather 로 함께 보낸다
+import asyncio
+import copy
+from decimal import Decimal
+
+from psycopg2.extensions import adapt
+
+from database import async_db
+from database.backend import get_backend
+from database.events import check_data_versions
+from services.allergen_index import allergen_index
+from services.pagination import decode_cursor
+from services.price_service import (PriceService, INGREDIENT_TREND_QUERY, RECIPE_TREND_QUERY,
+                                    _ingredient_price_query, _recipe_price_query,
+                                    _to_ingredient_prices, _to_recipe_prices, _to_price_trend)
+from services.recipe_detail_service import (RecipeDetailService, RECIPE_DETAILS_QUERY,
+                                            _detail_cache, _rows_to_details)
+from services.recipe_service import (RecipeService, DEFAULT_COUNT_MODE, EMPTY_RESULT,
+                                     BUDGET_MATCH_QUERY, ALL_MATCH_QUERY,
+                                     _check_count_mode, _count_column, _count_query, _page_total, _build_page,
+                                     _budget_page_query, _allergy_page_query, _all_page_query, _split_allergies)
+
+
+def _mogrify(query, params):
+    """cur.mogrify 대신 - 개수 추정에 넘기는 조건 쿼리의 인자는 숫자뿐이라 커넥션 없이 채울 수 있다"""
+    return (query % tuple(adapt(param).getquoted().decode() for param in params)).encode()
+
+
+def _to_numeric(value):
+    """float 인자 -> psycopg2 가 보내는 값(repr)과 같은 Decimal
+    asyncpg 는 float 를 NUMERIC 과 비교할 때 Decimal(float) 의 정확한 이진 값으로 보내 경계(예: 3000.1 원 예산과
+    3000.10 원 비용)에서 동기 서비스와 결과가 달라진다"""
+    return Decimal(str(value)) if isinstance(value, float) else value
+
+
+async def _total_count(rows, count_mode, position, seek, match_query, match_params):
+    total = _page_total(rows, count_mode, position, seek)
+    if total is None:
+        total = await async_db.fetchval(_count_query(match_query), match_params)
+    return total
+
+
+class AsyncRecipeService:
+    @staticmethod
+    async def search_recipes_by_budget(budget, quarter, page=1, per_page=10, count_mode=DEFAULT_COUNT_MODE):
+        """예산 기반 레시피 검색 (페이지 번호)"""
+        return await AsyncRecipeService._search_by_budget(budget, quarter, per_page, count_mode,
+                                                          offset=(page - 1) * per_page)
+
+    @staticmethod
+    async def search_recipes_by_budget_cursor(budget, quarter, cursor=None, per_page=10,
+                                              count_mode=DEFAULT_COUNT_MODE):
+        """예산 기반 레시피 검색 (커서)"""
+        seek = decode_cursor(cursor, 'budget') if cursor else None
+        return await AsyncRecipeService._search_by_budget(budget, quarter, per_page, count_mode, seek=seek)
+
+    @staticmethod
+    async def _search_by_budget(budget, quarter, per_page, count_mode, offset=0, seek=None):
+        _check_count_mode(count_mode)
+        if get_backend():
+            return RecipeService._search_by_budget(budget, quarter, per_page, count_mode, offset, seek)
+        try:
+            budget = _to_numeric(budget)
+            match_params = [quarter, budget]
+            count_column, count_params = _count_column(_mogrify, count_mode, BUDGET_MATCH_QUERY, match_params)
+            query, params = _budget_page_query(count_column, count_params, budget, quarter, per_page, offset, seek)
+            rows = await async_db.fetch(query, params)
+
+            position = seek[2] if seek else offset
+            total_count = await _total_count(rows, count_mode, position, seek, BUDGET_MATCH_QUERY, match_params)
+            return _build_page('budget', rows, per_page, position, total_count, 2, count_mode)
+
+        except Exception as e:
+            print(f"레시피 검색 중 오류 발생: {e}")
+            return dict(EMPTY_RESULT)
+
+    @staticmethod
+    async def search_recipes_by_allergy(allergy, quarter, page=1, per_page=10, count_mode=DEFAULT_COUNT_MODE):
+        """알레르기 재료를 제외한 레시피 검색 (페이지 번호)"""
+        return await AsyncRecipeService._search_by_allergy(allergy, quarter, per_page, count_mode,
+                                                           offset=(page - 1) * per_page)
+
+    @staticmethod
+    async def search_recipes_by_allergy_cursor(allergy, quarter, cursor=None, per_page=10,
+                                               count_mode=DEFAULT_COUNT_MODE):
+        """알레르기 재료를 제외한 레시피 검색 (커서)"""
+        seek = decode_cursor(cursor, 'allergy') if cursor else None
+        return await AsyncRecipeService._search_by_allergy(allergy, quarter, per_page, count_mode, seek=seek)
+
+    @staticmethod
+    async def _search_by_allergy(allergy, quarter, per_page, count_mode, offset=0, seek=None):
+        _check_count_mode(count_mode)
+        if get_backend():
+            return RecipeService._search_by_allergy(allergy, quarter, per_page, count_mode, offset, seek)
+        try:
+            # 인덱스가 아직 없으면 처음 한 번 DB 에서 만든다 - 루프를 막지 않도록 스레드에서
+            excluded_ids, total_count = await asyncio.to_thread(allergen_index.split, _split_allergies(allergy))
+            query, params = _allergy_page_query(quarter, excluded_ids, per_page, offset, seek)
+            rows = await async_db.fetch(query, params)
+
+            position = seek[2] if seek else offset
+            return _build_page('allergy', rows, per_page, position, total_count, 1, 'exact')
+
+        except Exception as e:
+            return dict(EMPTY_RESULT)
+
+    @staticmethod
+    async def get_all_recipes(quarter, page=1, per_page=10, count_mode=DEFAULT_COUNT_MODE):
+        """모든 레시피 조회 (페이지 번호)"""
+        return await AsyncRecipeService._get_all(quarter, per_page, count_mode, offset=(page - 1) * per_page)
+
+    @staticmethod
+    async def get_all_recipes_cursor(quarter, cursor=None, per_page=10, count_mode=DEFAULT_COUNT_MODE):
+        """모든 레시피 조회 (커서)"""
+        seek = decode_cursor(cursor, 'all') if cursor else None
+        return await AsyncRecipeService._get_all(quarter, per_page, count_mode, seek=seek)
+
+    @staticmethod
+    async def _get_all(quarter, per_page, count_mode, offset=0, seek=None):
+        _check_count_mode(count_mode)
+        if get_backend():
+            return RecipeService._get_all(quarter, per_page, count_mode, offset, seek)
+        try:
+            count_column, count_params = _count_column(_mogrify, count_mode, ALL_MATCH_QUERY, [])
+            query, params = _all_page_query(count_column, count_params, quarter, per_page, offset, seek)
+            rows = await async_db.fetch(query, params)
+
+            position = seek[2] if seek else offset
+            total_count = await _total_count(rows, count_mode, position, seek, ALL_MATCH_QUERY, [])
+            return _build_page('all', rows, per_page, position, total_count, 4, count_mode)
+
+        except Exception as e:
+            print(f"레시피 검색 중 오류 발생: {e}")
+            return dict(EMPTY_RESULT)
+
+
+class AsyncPriceService:
+    @staticmethod
+    async def get_ingredient_price_by_quarter(ingredient_name, quarter=None):
+        """특정 재료의 분기별 가격 조회"""
+        if get_backend():
+            return PriceService.get_ingredient_price_by_quarter(ingredient_name, quarter)
+        query, params = _ingredient_price_query(ingredient_name, quarter)
+        return _to_ingredient_prices(await async_db.fetch(query, params))
+
+    @staticmethod
+    async def get_recipe_price_by_quarter(recipe_name, quarter=None):
+        """레시피의 분기별 총 가격 조회"""
+        if get_backend():
+            return PriceService.get_recipe_price_by_quarter(recipe_name, quarter)
+        query, params = _recipe_price_query(recipe_name, quarter)
+        return _to_recipe_prices(await async_db.fetch(query, params))
+
+    @staticmethod
+    async def analyze_price_trend(ingredient_name=None, recipe_name=None):
+        """가격 추이 분석"""
+        if get_backend():
+            return PriceService.analyze_price_trend(ingredient_name, recipe_name)
+        if ingredient_name:
+            return _to_price_trend(await async_db.fetch(INGREDIENT_TREND_QUERY, (ingredient_name,)))
+        if recipe_name:
+            return _to_price_trend(await async_db.fetch(RECIPE_TREND_QUERY, (recipe_name,)))
+        return []
+
+    @staticmethod
+    async def get_all_recipe_costs(quarter=None):
+        """모든 레시피의 분기별 총 가격 일괄 조회 - 행렬을 처음 만들 때 DB 를 읽으므로 스레드에서 실행"""
+        return await asyncio.to_thread(PriceService.get_all_recipe_costs, quarter)
+
+    @staticmethod
+    async def get_all_price_changes():
+        """모든 레시피의 분기별 가격 변동률 일괄 조회"""
+        return await asyncio.to_thread(PriceService.get_all_price_changes)
+
+
+class AsyncRecipeDetailService:
+    @staticmethod
+    async def get_recipe_details(recipe_id):
+        """레시피 상세 정보 조회 (동기 서비스와 같은 캐시를 쓴다)"""
+        await asyncio.to_thread(check_data_versions)
+        cached = _detail_cache.get(recipe_id)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        recipe_details = (await AsyncRecipeDetailService._fetch_recipe_details_many([recipe_id])).get(recipe_id)
+        if recipe_details is not None:
+            _detail_cache.set(recipe_id, copy.deepcopy(recipe_details))
+        return recipe_details
+
+    @staticmethod
+    async def get_recipe_details_many(recipe_ids):
+        """여러 레시피 상세 정보를 한 번에 조회 - 캐시에 없는 것만 한 쿼리로 가져온다"""
+        await asyncio.to_thread(check_data_versions)
+        found = {}
+        to_fetch = []
+        for recipe_id in recipe_ids:
+            if recipe_id in found or recipe_id in to_fetch:
+                continue
+            cached = _detail_cache.get(recipe_id)
+            if cached is not None:
+                found[recipe_id] = cached
+            else:
+                to_fetch.append(recipe_id)
+
+        if to_fetch:
+            fetched = await AsyncRecipeDetailService._fetch_recipe_details_many(to_fetch)
+            for recipe_id, recipe_details in fetched.items():
+                _detail_cache.set(recipe_id, copy.deepcopy(recipe_details))
+            found.update(fetched)
+
+        return {
+            'recipes': [copy.deepcopy(found[recipe_id]) for recipe_id in recipe_ids if recipe_id in found],
+            'missing': [recipe_id for recipe_id in dict.fromkeys(recipe_ids) if recipe_id not in found]
+        }
+
+    @staticmethod
+    async def _fetch_recipe_details_many(recipe_ids):
+        """레시피 상세 정보 DB 조회 -> {recipe_id: 상세 정보}"""
+        if get_backend():
+            return RecipeDetailService._fetch_recipe_details_many(recipe_ids)
+        return _rows_to_details(await async_db.fetch(RECIPE_DETAILS_QUERY, (list(recipe_ids),)))
+
+    @staticmethod
+    async def get_recipe_overview(recipe_id, recipe_name, quarter=None):
+        """레시피 화면 한 번에 필요한 상세 정보/분기별 가격/가격 추이를 동시에 조회"""
+        details, prices, trend = await asyncio.gather(
+            AsyncRecipeDetailService.get_recipe_details(recipe_id),
+            AsyncPriceService.get_recipe_price_by_quarter(recipe_name, quarter),
+            AsyncPriceService.analyze_price_trend(recipe_name=recipe_name),
+        )
+        return {'details': details, 'prices': prices, 'trend': trend}
@@ -0,0 +1,292 @@
+# services/meal_plan_service.py
+# 예산/칼로리/알레르기 조건 안에서 영양 점수와 다양성이 가장 높은 N 끼 식단을 고른다
+# 분기별 레시피 비용(price_matrix)과 recipe_nutrition 을 메모리에 두고 분기 한정(branch-and-bound)으로 푼다
+import threading
+import time
+from bisect import insort
+
+import numpy as np
+
+from database.backend import get_backend
+from database.db_connector import get_connection
+from database.events import check_data_versions, on_data_reload, touches
+from services.allergen_index import allergen_index
+from services.price_matrix import price_matrix
+
+NUTRIENTS = ('calories', 'carbohydrate', 'protein', 'fat')
+DEFAULT_WEIGHTS = {'protein': 1.0}     # 끼니 점수 = 영양소 × 가중치 합 (기본: 단백질 g)
+DEFAULT_VARIETY_WEIGHT = 2.0           # 이미 고른 끼니와 겹치는 재료 하나당 감점
+DEFAULT_TIME_LIMIT = 1.0               # 초 - 넘으면 지금까지 찾은 가장 좋은 식단을 돌려준다
+MAX_CANDIDATES = 400                   # 탐색할 후보 레시피 수 상한 (큰 카탈로그에서 응답 시간을 지키기 위해)
+_CHECK_EVERY = 1024                    # 이만큼 노드를 볼 때마다 시간 확인
+
+
+class _TimeUp(Exception):
+    pass
+
+
+class NutritionTable:
+    """레시피별 영양 정보 (recipe_nutrition) - 데이터 재적재 때 다시 읽는다"""
+    SOURCE_TABLES = ('recipe_nutrition',)
+
+    def __init__(self, loader=None):
+        self._loader = loader or self._load
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._aligned = None   # (price_matrix 의 recipe_ids 배열, 그 순서로 정렬한 영양 행렬)
+
+    @staticmethod
+    def _load():
+        backend = get_backend()
+        if backend:
+            return backend.nutrition_source()
+        conn = None
+        cur = None
+        try:
+            conn = get_connection()
+            cur = conn.cursor()
+            cur.execute("SELECT recipe_id, calories, carbohydrate, protein, fat FROM recipe_nutrition")
+            return cur.fetchall()
+        finally:
+            if cur:
+                cur.close()
+            if conn:
+                conn.close()
+
+    def _get_snapshot(self):
+        check_data_versions()
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = {row[0]: tuple(float(v) if v is not None else np.nan for v in row[1:])
+                                      for row in self._loader()}
+                snapshot = self._snapshot
+        return snapshot
+
+    def aligned(self, recipe_ids):
+        """recipe_ids 순서의 (레시피 수 × 4) 영양 행렬, 정보가 없으면 NaN"""
+        check_data_versions()
+        cached = self._aligned
+        if cached is not None and cached[0] is recipe_ids:
+            return cached[1]
+        snapshot = self._get_snapshot()
+        missing = (np.nan,) * len(NUTRIENTS)
+        values = np.array([snapshot.get(recipe_id, missing) for recipe_id in recipe_ids.tolist()],
+                          dtype=np.float64).reshape(len(recipe_ids), len(NUTRIENTS))
+        self._aligned = (recipe_ids, values)
+        return values
+
+    def invalidate(self, tables=None):
+        if touches(tables, self.SOURCE_TABLES):
+            with self._lock:
+                self._snapshot = None
+                self._aligned = None
+
+
+nutrition_table = NutritionTable()
+on_data_reload(nutrition_table.invalidate)
+
+
+def _smallest_sums(values, limit):
+    """각 위치 i 에 대해 values[i:] 중 가장 작은 m 개의 합 (m = 0..limit) - 남은 끼니를 채울 수 있는지 판단"""
+    n = len(values)
+    sums = [None] * (n + 1)
+    smallest = []
+    sums[n] = [0]
+    for i in range(n - 1, -1, -1):
+        insort(smallest, values[i])
+        del smallest[limit:]
+        prefix = [0]
+        for value in smallest:
+            prefix.append(prefix[-1] + value)
+        sums[i] = prefix
+    return sums
+
+
+def solve(scores, costs, calories, bits, meals, budget, max_calories=None,
+          variety_weight=DEFAULT_VARIETY_WEIGHT, time_limit=DEFAULT_TIME_LIMIT):
+    """점수 내림차순으로 정렬된 후보에서 meals 개를 고른다 -> (고른 위치 목록, 목적값, 완료 여부, 탐색 노드 수)
+    costs/budget 은 정수(0.01 원), 목적값 = 점수 합 - variety_weight × 겹친 재료 수
+    상한: 남은 끼니를 (겹침 감점 없이) 점수가 가장 높은 후보로 채운 값, 하한: 비용/칼로리가 가장 작은 후보로 채워도 넘치면 가지치기
+    time_limit 안에 끝나지 않으면 그때까지 찾은 가장 좋은 해를 돌려준다
+    상한이 겹침 감점을 0 으로 보므로 variety_weight 는 0 이상이어야 한다 (음수면 겹칠수록 점수가 올라 상한이 틀린다)"""
+    if variety_weight < 0:
+        raise ValueError("variety_weight 는 0 이상이어야 합니다")
+    n = len(scores)
+    deadline = time.perf_counter() + time_limit if time_limit else None
+    score_prefix = [0.0]
+    for score in scores:
+        score_prefix.append(score_prefix[-1] + score)
+    min_costs = _smallest_sums(costs, meals)
+    min_calories = _smallest_sums(calories, meals) if max_calories is not None else None
+    best = {'value': float('-inf'), 'picks': None}
+    nodes = 0
+
+    def fits(j, cost, cal, need):
+        """j 를 고르고도 남은 need-1 끼를 채울 수 있는지"""
+        if cost + costs[j] + min_costs[j + 1][need - 1] > budget:
+            return False
+        if min_calories is not None and cal + calories[j] + min_calories[j + 1][need - 1] > max_calories:
+            return False
+        return True
+
+    def search(start, picks, cost, cal, used, value):
+        nonlocal nodes
+        nodes += 1
+        if deadline and nodes % _CHECK_EVERY == 0 and time.perf_counter() > deadline:
+            raise _TimeUp
+        need = meals - len(picks)
+        if need == 0:
+            if value > best['value']:
+                best['value'] = value
+                best['picks'] = list(picks)
+            return
+        for j in range(start, n - need + 1):
+            # 점수 내림차순이므로 여기서부터 need 개의 점수 합이 최선의 상한 - 더 뒤는 더 나쁘다
+            if value + score_prefix[j + need] - score_prefix[j] <= best['value']:
+                return
+            if len(min_costs[j]) <= need or cost + min_costs[j][need] > budget:
+                return
+            if not fits(j, cost, cal, need):
+                continue
+            gain = scores[j] - variety_weight * (bits[j] & used).bit_count()
+            picks.append(j)
+            search(j + 1, picks, cost + costs[j], cal + calories[j], used | bits[j], value + gain)
+            picks.pop()
+
+    # 탐욕 해로 시작 (겹침 감점을 뺀 이득이 가장 큰 후보부터) - 시간이 거의 없어도 실행 가능한 식단을 돌려줄 수 있다
+    picks, cost, cal, used, value = [], 0, 0.0, 0, 0.0
+    start = 0
+    while len(picks) < meals:
+        need = meals - len(picks)
+        choice = None
+        for j in range(start, n - need + 1):
+            if choice is not None and scores[j] <= choice[1]:
+                break
+            if fits(j, cost, cal, need):
+                gain = scores[j] - variety_weight * (bits[j] & used).bit_count()
+                if choice is None or gain > choice[1]:
+                    choice = (j, gain)
+        if choice is None:
+            break
+        j, gain = choice
+        picks.append(j)
+        cost += costs[j]
+        cal += calories[j]
+        value += gain
+        used |= bits[j]
+        start = j + 1
+    if len(picks) == meals:
+        best['value'], best['picks'] = value, picks
+
+    complete = True
+    try:
+        search(0, [], 0, 0.0, 0, 0.0)
+    except _TimeUp:
+        complete = False
+    return best['picks'], best['value'], complete, nodes
+
+
+class MealPlanService:
+    @staticmethod
+    def plan_meals(budget, quarter, meals=7, max_calories=None, allergy='', weights=None,
+                   variety_weight=DEFAULT_VARIETY_WEIGHT, time_limit=DEFAULT_TIME_LIMIT,
+                   max_candidates=MAX_CANDIDATES):
+        """예산(원) 안에서 meals 끼 식단 계획
+        max_calories: 전체 칼로리 상한 (kcal), allergy: 쉼표로 구분한 알레르기 재료
+        weights: 영양소별 점수 가중치 (예: {'protein': 1.0, 'fat': -0.5}), variety_weight: 겹치는 재료 하나당 감점"""
+        if meals < 1:
+            raise ValueError("meals 는 1 이상이어야 합니다")
+        if variety_weight < 0:
+            raise ValueError("variety_weight 는 0 이상이어야 합니다")
+        weights = DEFAULT_WEIGHTS if weights is None else weights
+        unknown = set(weights) - set(NUTRIENTS)
+        if unknown:
+            raise ValueError(f"알 수 없는 영양소입니다: {', '.join(sorted(unknown))}")
+        start = time.perf_counter()
+
+        matrix = price_matrix.cost_matrix()
+        if quarter not in matrix['quarters']:
+            return MealPlanService._result(quarter, [], None, False, 0, 0, start, feasible=False)
+        col = matrix['quarters'].index(quarter)
+        recipe_ids = matrix['recipe_ids']
+        nutrition = nutrition_table.aligned(recipe_ids)
+
+        # 후보: 이 분기 가격이 있고, 혼자서도 예산/칼로리를 넘지 않고, 알레르기 재료가 없는 레시피
+        costs = np.rint(matrix['costs'][:, col] * 100).astype(np.int64)
+        budget_units = int(np.floor(budget * 100 + 1e-9))
+        calories = nutrition[:, 0]
+        mask = matrix['covered'][:, col] & (costs <= budget_units)
+        if max_calories is not None:
+            mask &= ~np.isnan(calories) & (calories <= max_calories)
+        allergies = [a.strip() for a in (allergy or '').split(',') if a.strip()]
+        if allergies:
+            mask &= ~allergen_index.contains_allergens(recipe_ids, allergies)
+
+        scores = np.zeros(len(recipe_ids))
+        for column, nutrient in enumerate(NUTRIENTS):
+            if weights.get(nutrient):
+                scores += weights[nutrient] * np.nan_to_num(nutrition[:, column])
+        candidates = np.flatnonzero(mask)
+        total_candidates = len(candidates)
+
+        # 후보가 많으면 점수 상위와 비용 대비 점수 상위만 탐색한다
+        truncated = total_candidates > max_candidates
+        if truncated:
+            half = max_candidates // 2
+            by_score = candidates[np.argsort(-scores[candidates], kind='stable')[:half]]
+            efficiency = scores[candidates] / np.maximum(costs[candidates], 1)
+            by_efficiency = candidates[np.argsort(-efficiency, kind='stable')[:max_candidates - half]]
+            candidates = np.union1d(by_score, by_efficiency)
+
+        # 점수 내림차순 (같으면 싼 것, 그다음 ID 순)
+        order = np.lexsort((recipe_ids[candidates], costs[candidates], -scores[candidates]))
+        candidates = candidates[order]
+        picks, value, complete, nodes = solve(
+            scores[candidates].tolist(), costs[candidates].tolist(),
+            np.nan_to_num(calories[candidates]).tolist(),
+            MealPlanService._ingredient_bits(recipe_ids[candidates].tolist()),
+            meals, budget_units, max_calories, variety_weight, time_limit)
+
+        chosen = [int(candidates[pick]) for pick in picks] if picks else []
+        plan = [{
+            'recipe_id': int(recipe_ids[row]),
+            'recipe_name': matrix['recipe_names'][row],
+            'total_price': float(matrix['costs'][row, col]),
+            'nutrition': {nutrient: (None if np.isnan(nutrition[row, column]) else float(nutrition[row, column]))
+                          for column, nutrient in enumerate(NUTRIENTS)},
+        } for row in chosen]
+        return MealPlanService._result(quarter, plan, value if picks else None, complete and not truncated,
+                                       nodes, total_candidates, start, feasible=bool(picks),
+                                       searched=len(candidates))
+
+    @staticmethod
+    def _ingredient_bits(recipe_ids):
+        """후보 레시피별 재료 비트셋 - 비트 위치는 후보들이 쓰는 재료에만 매긴다 (겹친 재료 수 계산용)"""
+        bit_positions = {}
+        bits = []
+        for ingredient_ids in allergen_index.recipe_ingredients(recipe_ids):
+            value = 0
+            for ingredient_id in ingredient_ids:
+                value |= 1 << bit_positions.setdefault(ingredient_id, len(bit_positions))
+            bits.append(value)
+        return bits
+
+    @staticmethod
+    def _result(quarter, plan, score, optimal, nodes, candidates, start, feasible, searched=0):
+        return {
+            'quarter': quarter,
+            'meals': plan,
+            'feasible': feasible,
+            'total_price': round(sum(meal['total_price'] for meal in plan), 2),
+            'total_nutrition': {nutrient: round(sum(meal['nutrition'][nutrient] or 0 for meal in plan), 2)
+                                for nutrient in NUTRIENTS},
+            'score': score,
+            # 후보를 줄이지 않았고 시간 안에 탐색을 끝냈으면 최적해
+            'optimal': optimal,
+            'nodes': nodes,
+            'candidates': candidates,
+            'searched_candidates': searched,
+            'elapsed_seconds': time.perf_counter() - start,
+        }
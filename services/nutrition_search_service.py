@@ -0,0 +1,174 @@
+# services/nutrition_search_service.py
+# 영양 정보(recipe_nutrition) 범위/비율 조건 검색 - 예산/알레르기 조건과 함께 걸고 아무 지표로나 정렬한다
+# 지표마다 값 배열과 정렬 순서를 메모리에 두고(정렬된 열 저장소), 범위 조건은 이분 탐색으로 구간만 읽는다
+import threading
+
+import numpy as np
+
+from database.events import on_data_reload, touches
+from services.allergen_index import allergen_index
+from services.meal_plan_service import NUTRIENTS, nutrition_table
+from services.price_matrix import price_matrix
+
+# 지표 이름 -> 분기 가격이 필요한지
+#   영양소 4개, price (분기 비용, 원), <영양소>_per_100won (비용 100원당 양), <영양소>_per_100kcal (100 kcal 당 양)
+METRICS = dict([(nutrient, False) for nutrient in NUTRIENTS] + [('price', True)] +
+               [(f'{nutrient}_per_100won', True) for nutrient in NUTRIENTS] +
+               [(f'{nutrient}_per_100kcal', False) for nutrient in NUTRIENTS if nutrient != 'calories'])
+
+EMPTY_NUTRITION_RESULT = {'recipes': [], 'total_count': 0, 'current_page': 1, 'has_more': False}
+
+
+def _ratio(numerators, denominators):
+    """numerators / denominators × 100 - 분모가 0 이하이거나 값이 없으면 NaN"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominators > 0, numerators / denominators * 100, np.nan)
+
+
+class NutritionIndex:
+    """지표별 (값 배열, 값이 있는 위치의 오름차순 정렬 순서, 정렬된 값) - price_matrix 의 레시피 순서 기준
+    지표 열은 처음 쓰일 때 만들고, 비용/영양 행렬이 다시 만들어지면 모두 버린다"""
+
+    SOURCE_TABLES = price_matrix.SOURCE_TABLES + nutrition_table.SOURCE_TABLES
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._base = None      # (비용 행렬, 영양 행렬) - 이 배열들로 만든 열만 _columns 에 둔다
+        self._columns = {}
+
+    def _metric_values(self, metric, col, matrix, nutrition):
+        if metric in NUTRIENTS:
+            return nutrition[:, NUTRIENTS.index(metric)]
+        costs = np.where(matrix['covered'][:, col], matrix['costs'][:, col], np.nan) if col is not None else None
+        if metric == 'price':
+            return costs
+        nutrient, per = metric.rsplit('_per_', 1)
+        values = nutrition[:, NUTRIENTS.index(nutrient)]
+        return _ratio(values, costs if per == '100won' else nutrition[:, NUTRIENTS.index('calories')])
+
+    def column(self, metric, matrix, col=None):
+        """지표 열 (values, order, sorted_values) - 분기 가격이 필요한 지표는 col(분기 위치)별로 따로 만든다"""
+        nutrition = nutrition_table.aligned(matrix['recipe_ids'])
+        key = (metric, col if METRICS[metric] else None)
+        with self._lock:
+            if self._base is None or self._base[0] is not matrix['costs'] or self._base[1] is not nutrition:
+                self._base = (matrix['costs'], nutrition)
+                self._columns = {}
+            cached = self._columns.get(key)
+        if cached is not None:
+            return cached
+
+        values = self._metric_values(metric, key[1], matrix, nutrition)
+        present = np.flatnonzero(~np.isnan(values))
+        # 값이 같으면 위치(= 레시피 ID) 순
+        order = present[np.argsort(values[present], kind='stable')]
+        built = (values, order, values[order])
+        with self._lock:
+            if self._base is not None and self._base[0] is matrix['costs'] and self._base[1] is nutrition:
+                self._columns.setdefault(key, built)
+        return built
+
+    def invalidate(self, tables=None):
+        """열은 비용/영양 행렬 배열에 묶여 있어 저절로 다시 만들어진다 - 원본이 바뀌면 이전 열의 메모리만 먼저 비운다"""
+        if not touches(tables, self.SOURCE_TABLES):
+            return
+        with self._lock:
+            self._base = None
+            self._columns = {}
+
+
+nutrition_index = NutritionIndex()
+on_data_reload(nutrition_index.invalidate)
+
+
+class NutritionSearchService:
+    @staticmethod
+    def search_by_nutrition(filters=None, sort=None, order='desc', quarter=None, budget=None, allergy='',
+                            page=1, per_page=10):
+        """영양 지표 범위 조건을 모두 만족하는 레시피 (sort 지표순, 없으면 레시피 ID 순)
+        filters: {지표: (최솟값, 최댓값)} - 한쪽은 None 으로 열어 둘 수 있고, 값이 없는 레시피는 빠진다
+        지표: 영양소(calories, carbohydrate, protein, fat), price, <영양소>_per_100won, <영양소>_per_100kcal
+        price/_per_100won 지표와 budget 은 quarter 가 필요하다, allergy: 쉼표로 구분한 알레르기 재료"""
+        filters = dict(filters or {})
+        unknown = sorted(set(filters) - set(METRICS) | ({sort} - set(METRICS) if sort else set()))
+        if unknown:
+            raise ValueError(f"알 수 없는 지표입니다: {', '.join(unknown)}")
+        if order not in ('asc', 'desc'):
+            raise ValueError("order 는 asc 또는 desc 여야 합니다")
+        if budget is not None:
+            low, high = filters.get('price', (None, None))
+            filters['price'] = (low, budget if high is None else min(high, budget))
+        used = list(dict.fromkeys(list(filters) + ([sort] if sort else [])))
+        if quarter is None and any(METRICS[metric] for metric in used):
+            raise ValueError("가격/비용 대비 지표나 예산으로 거르려면 분기가 필요합니다")
+
+        matrix = price_matrix.cost_matrix()
+        col = None
+        if quarter is not None:
+            if quarter not in matrix['quarters']:
+                return dict(EMPTY_NUTRITION_RESULT)
+            col = matrix['quarters'].index(quarter)
+        columns = {metric: nutrition_index.column(metric, matrix, col) for metric in used}
+
+        # 조건마다 정렬된 값에서 [최솟값, 최댓값] 구간을 이분 탐색 - 가장 좁은 구간의 위치만 후보로 읽는다
+        ranges = []
+        for metric, (low, high) in filters.items():
+            _, metric_order, sorted_values = columns[metric]
+            start = np.searchsorted(sorted_values, low, 'left') if low is not None else 0
+            end = np.searchsorted(sorted_values, high, 'right') if high is not None else len(sorted_values)
+            ranges.append((max(end - start, 0), metric, metric_order[start:max(end, start)]))
+        if ranges:
+            ranges.sort(key=lambda item: item[0])
+            candidates = np.sort(ranges[0][2])
+            # 나머지 조건은 후보 위치의 값만 비교
+            for _, metric, _ in ranges[1:]:
+                values = columns[metric][0][candidates]
+                low, high = filters[metric]
+                keep = ~np.isnan(values)
+                if low is not None:
+                    keep &= values >= low
+                if high is not None:
+                    keep &= values <= high
+                candidates = candidates[keep]
+        elif sort:
+            candidates = np.sort(columns[sort][1])
+        else:
+            candidates = np.arange(len(matrix['recipe_ids']))
+        if sort and ranges:
+            candidates = candidates[~np.isnan(columns[sort][0][candidates])]
+
+        recipe_ids = matrix['recipe_ids']
+        allergies = [a.strip() for a in (allergy or '').split(',') if a.strip()]
+        if allergies and len(candidates):
+            candidates = candidates[~allergen_index.contains_allergens(recipe_ids[candidates], allergies)]
+
+        # 정렬 지표순 (같으면 ID 순) - recipe_ids 는 정렬되어 있어 위치 순 = ID 순, 정렬 지표가 없으면 ID 순
+        if sort:
+            sort_values = columns[sort][0][candidates]
+            candidates = candidates[np.argsort(-sort_values if order == 'desc' else sort_values, kind='stable')]
+
+        nutrition = nutrition_table.aligned(recipe_ids)
+        offset = (page - 1) * per_page
+        recipes = []
+        for position in candidates[offset:offset + per_page].tolist():
+            recipe = {
+                'recipe_id': int(recipe_ids[position]),
+                'recipe_name': matrix['recipe_names'][position],
+                'nutrition': {nutrient: None if np.isnan(nutrition[position, pos]) else float(nutrition[position, pos])
+                              for pos, nutrient in enumerate(NUTRIENTS)},
+            }
+            if col is not None:
+                recipe['total_price'] = (float(matrix['costs'][position, col])
+                                         if matrix['covered'][position, col] else None)
+            # 조건/정렬에 쓴 비율 지표 값
+            ratios = {metric: round(float(columns[metric][0][position]), 4)
+                      for metric in used if metric not in NUTRIENTS and metric != 'price'}
+            if ratios:
+                recipe['metrics'] = ratios
+            recipes.append(recipe)
+        return {
+            'recipes': recipes,
+            'total_count': len(candidates),
+            'current_page': page,
+            'has_more': offset + per_page < len(candidates),
+        }
@@ -0,0 +1,34 @@
+# services/pagination.py
+import base64
+import json
+from decimal import Decimal, InvalidOperation
+
+
+class InvalidCursorError(ValueError):
+    """잘못되었거나 다른 검색에서 발급된 커서"""
+
+
+def encode_cursor(kind, sort_value, recipe_id, position):
+    """마지막 행의 (정렬 값, recipeID) 와 지금까지 반환한 행 수를 불투명 토큰으로 변환"""
+    if isinstance(sort_value, Decimal):
+        sort_value = str(sort_value)
+    payload = {'k': kind, 'v': sort_value, 'id': recipe_id, 'n': position}
+    raw = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, kind):
+    """토큰 -> (정렬 값, recipeID, 지금까지 반환한 행 수)"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        if payload['k'] != kind:
+            raise InvalidCursorError(f"'{payload['k']}' 검색의 커서입니다")
+        sort_value = payload['v']
+        if kind != 'allergy':
+            sort_value = Decimal(sort_value)
+        return sort_value, int(payload['id']), int(payload['n'])
+    except InvalidCursorError:
+        raise
+    except (ValueError, KeyError, TypeError, InvalidOperation, UnicodeError) as e:
+        raise InvalidCursorError(f"잘못된 커서입니다: {token!r}") from e
@@ -0,0 +1,192 @@
+# services/price_matrix.py
+import threading
+
+import numpy as np
+
+from database.backend import get_backend
+from database.db_connector import get_connection
+from database.events import check_data_versions, on_data_reload, touches
+
+
+def _to_units(value):
+    """DECIMAL(10, 2) 값 -> 0.01 단위 정수 (행렬 곱을 정수로 해서 SQL 과 같은 값을 얻는다)"""
+    return int(round(value * 100))
+
+
+def _read_only(array):
+    array.setflags(write=False)
+    return array
+
+
+class PriceMatrix:
+    """레시피×재료 사용량 희소 행렬과 재료×분기 가격 행렬 - 모든 레시피의 분기별 비용을 한 번의 곱으로 계산"""
+    SOURCE_TABLES = ('Recipe', 'IngredientName', 'IngredientPrice', 'RecipeIngredient_info')
+
+    def __init__(self, loader=None):
+        self._loader = loader or self._load
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    @staticmethod
+    def _load():
+        backend = get_backend()
+        if backend:
+            return backend.price_source()
+        return PriceMatrix._load_from_db()
+
+    @staticmethod
+    def _load_from_db():
+        """(레시피 목록, 레시피별 재료 사용량, 재료 가격, 재료 이름) 조회"""
+        conn = None
+        cur = None
+        try:
+            conn = get_connection()
+            cur = conn.cursor()
+            cur.execute("SELECT recipeID, recipeName FROM Recipe ORDER BY recipeID")
+            recipes = cur.fetchall()
+            cur.execute("SELECT recipeID, ingredientID, amount FROM RecipeIngredient_info")
+            amounts = cur.fetchall()
+            cur.execute("SELECT ingredientID, quarter, price FROM IngredientPrice")
+            prices = cur.fetchall()
+            cur.execute("SELECT ingredientID, name FROM IngredientName")
+            ingredients = cur.fetchall()
+            return recipes, amounts, prices, ingredients
+        finally:
+            if cur:
+                cur.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def build(recipes, amounts, prices, ingredients=()):
+        """원본 행 -> 비용 행렬 (값은 0.0001 단위 정수, 가격이 없는 분기는 covered=False)
+        장보기 목록용으로 레시피×재료 사용량(CSR)과 재료×분기 가격도 함께 둔다"""
+        recipe_ids = np.array([recipe_id for recipe_id, _ in recipes], dtype=np.int64)
+        recipe_names = [name for _, name in recipes]
+        recipe_pos = {recipe_id: pos for pos, recipe_id in enumerate(recipe_ids.tolist())}
+
+        quarters = sorted({quarter for _, quarter, _ in prices})
+        quarter_pos = {quarter: pos for pos, quarter in enumerate(quarters)}
+        ingredient_pos = {}
+        for ingredient_id, _, _ in prices:
+            ingredient_pos.setdefault(ingredient_id, len(ingredient_pos))
+        # 가격이 한 번도 없는 재료는 가격 행렬 뒤쪽에 붙인다 (priced=False 라 비용/covered 에는 영향이 없다)
+        for recipe_id, ingredient_id, _ in amounts:
+            if recipe_id in recipe_pos:
+                ingredient_pos.setdefault(ingredient_id, len(ingredient_pos))
+        names = dict(ingredients)
+        ingredient_ids = np.array(list(ingredient_pos), dtype=np.int64)
+        ingredient_names = [names.get(ingredient_id) for ingredient_id in ingredient_pos]
+
+        # 재료×분기 가격 행렬 (0.01 단위) 과 가격 존재 여부
+        price_units = np.zeros((len(ingredient_pos), len(quarters)), dtype=np.int64)
+        priced = np.zeros((len(ingredient_pos), len(quarters)), dtype=bool)
+        for ingredient_id, quarter, price in prices:
+            row, col = ingredient_pos[ingredient_id], quarter_pos[quarter]
+            price_units[row, col] = _to_units(price)
+            priced[row, col] = True
+
+        # 레시피×재료 사용량 희소 행렬 (COO, 레시피 순 정렬)
+        entries = sorted((recipe_pos[recipe_id], ingredient_pos[ingredient_id], _to_units(amount))
+                         for recipe_id, ingredient_id, amount in amounts
+                         if recipe_id in recipe_pos)
+        costs = np.zeros((len(recipe_ids), len(quarters)), dtype=np.int64)
+        covered = np.zeros((len(recipe_ids), len(quarters)), dtype=bool)
+        rows, cols, values = (np.zeros(0, dtype=np.int64) for _ in range(3))
+        if entries:
+            rows, cols, values = (np.array(column, dtype=np.int64) for column in zip(*entries))
+            # 행(레시피)별 구간 시작 위치 - reduceat 으로 구간 합을 한 번에 구한다
+            starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            costs[rows[starts]] = np.add.reduceat(values[:, None] * price_units[cols], starts, axis=0)
+            covered[rows[starts]] = np.logical_or.reduceat(priced[cols], starts, axis=0)
+        # CSR 행 포인터 - 레시피 i 의 재료는 cols[indptr[i]:indptr[i + 1]]
+        indptr = np.searchsorted(rows, np.arange(len(recipe_ids) + 1))
+
+        return {
+            'recipe_ids': recipe_ids,
+            'recipe_names': recipe_names,
+            'quarters': quarters,
+            'costs': costs,
+            # recipe_cost 처럼 0.01 원에서 반올림한 비용 - 조회마다 다시 계산하지 않도록 미리 만든다 (읽기 전용)
+            'rounded': _read_only(np.sign(costs) * ((np.abs(costs) + 50) // 100) / 100),
+            'covered': covered,
+            'ingredient_ids': ingredient_ids,
+            'ingredient_names': ingredient_names,
+            'price_units': price_units,
+            'priced': priced,
+            'usage': (indptr, cols, values),
+        }
+
+    def _get_snapshot(self):
+        check_data_versions()
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self.build(*self._loader())
+                snapshot = self._snapshot
+        return snapshot
+
+    def invalidate(self, tables=None):
+        """원본 테이블이 재적재되면 다음 조회 때 다시 만든다"""
+        if touches(tables, self.SOURCE_TABLES):
+            with self._lock:
+                self._snapshot = None
+
+    def cost_matrix(self):
+        """분기별 비용 행렬 - costs 는 recipe_cost 처럼 0.01 원에서 반올림한 값, covered 는 가격 존재 여부"""
+        snapshot = self._get_snapshot()
+        return {
+            'recipe_ids': snapshot['recipe_ids'],
+            'recipe_names': snapshot['recipe_names'],
+            'quarters': snapshot['quarters'],
+            'costs': snapshot['rounded'],
+            'covered': snapshot['covered'],
+        }
+
+    def usage_matrix(self):
+        """레시피×재료 사용량(CSR, 0.01 g 단위)과 재료×분기 가격(0.01 원 단위) - 여러 레시피의 재료를 합칠 때 쓴다"""
+        snapshot = self._get_snapshot()
+        indptr, cols, values = snapshot['usage']
+        return {
+            'recipe_ids': snapshot['recipe_ids'],
+            'recipe_names': snapshot['recipe_names'],
+            'quarters': snapshot['quarters'],
+            'ingredient_ids': snapshot['ingredient_ids'],
+            'ingredient_names': snapshot['ingredient_names'],
+            'indptr': indptr,
+            'cols': cols,
+            'amounts': values,
+            'prices': snapshot['price_units'],
+            'priced': snapshot['priced'],
+        }
+
+    def change_matrix(self):
+        """분기별 반올림 전 비용(totals)과 직전 분기 대비 변동률(changes, %) 행렬
+        가격이 있는 분기끼리만 비교하고 첫 분기는 0 - analyze_price_trend 의 LAG 계산과 같다
+        직전 분기 비용이 0 이면 변동률을 정할 수 없어 NaN (inf 가 JSON 으로 나가지 않도록)"""
+        snapshot = self._get_snapshot()
+        covered = snapshot['covered']
+        totals = snapshot['costs'] / 10000
+        changes = np.full(totals.shape, np.nan)
+        previous = np.full(len(totals), np.nan)
+        for col in range(totals.shape[1]):
+            current = totals[:, col]
+            has_previous = covered[:, col] & ~np.isnan(previous) & (previous != 0)
+            undefined = covered[:, col] & (previous == 0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = (current - previous) / previous * 100
+            changes[:, col] = np.where(has_previous, ratio, np.where(covered[:, col] & ~undefined, 0.0, np.nan))
+            previous = np.where(covered[:, col], current, previous)
+        return {
+            'recipe_ids': snapshot['recipe_ids'],
+            'recipe_names': snapshot['recipe_names'],
+            'quarters': snapshot['quarters'],
+            'totals': totals,
+            'changes': changes,
+            'covered': covered,
+        }
+
+
+price_matrix = PriceMatrix()
+on_data_reload(price_matrix.invalidate)
@@ -1,36 +1,131 @@
 # services/price_service.py
+import math
+
+from database import statements
+from database.backend import get_backend
 from database.db_connector import get_connection
+from services.price_matrix import price_matrix
+
+# 재료명으로 분기별 가격 조회 (분기 조건은 뒤에 붙인다)
+INGREDIENT_PRICE_QUERY = """
+    SELECT ip.quarter, ip.price, in_name.name
+    FROM IngredientPrice ip
+    JOIN IngredientName in_name ON ip.ingredientID = in_name.ingredientID
+    WHERE in_name.name = %s
+"""
+
+# 분기별 비용은 recipe_cost 에 미리 계산되어 있다
+RECIPE_PRICE_QUERY = """
+    SELECT 
+        rc.quarter,
+        r.recipeName,
+        rc.total_cost,
+        rc.ingredients_detail
+    FROM Recipe r
+    JOIN recipe_cost rc ON r.recipeID = rc.recipeID
+    WHERE r.recipeName = %s
+"""
+
+INGREDIENT_TREND_QUERY = """
+    SELECT 
+        in_name.name,
+        ip.quarter,
+        ip.price,
+        CASE 
+            WHEN LAG(ip.price) OVER (ORDER BY ip.quarter) IS NULL THEN 0
+            ELSE ((ip.price - LAG(ip.price) OVER (ORDER BY ip.quarter)) / NULLIF(LAG(ip.price) OVER (ORDER BY ip.quarter), 0) * 100)
+        END as price_change_percent
+    FROM IngredientPrice ip
+    JOIN IngredientName in_name ON ip.ingredientID = in_name.ingredientID
+    WHERE in_name.name = %s
+    ORDER BY ip.quarter
+"""
+
+RECIPE_TREND_QUERY = """
+    WITH recipe_prices AS (
+        SELECT 
+            r.recipeName,
+            ip.quarter,
+            SUM(ri.amount * ip.price) as total_price
+        FROM Recipe r
+        JOIN RecipeIngredient_info ri ON r.recipeID = ri.recipeID
+        JOIN IngredientPrice ip ON ri.ingredientID = ip.ingredientID
+        WHERE r.recipeName = %s
+        GROUP BY r.recipeName, ip.quarter
+    )
+    SELECT 
+        recipeName,
+        quarter,
+        total_price,
+        CASE 
+            WHEN LAG(total_price) OVER (ORDER BY quarter) IS NULL THEN 0
+            ELSE ((total_price - LAG(total_price) OVER (ORDER BY quarter)) / NULLIF(LAG(total_price) OVER (ORDER BY quarter), 0) * 100)
+        END as price_change_percent
+    FROM recipe_prices
+    ORDER BY quarter
+"""
+
+def _ingredient_price_query(ingredient_name, quarter=None):
+    """-> (쿼리, 인자)"""
+    query = INGREDIENT_PRICE_QUERY
+    params = [ingredient_name]
+    if quarter:
+        query += " AND ip.quarter = %s"
+        params.append(quarter)
+    return query + " ORDER BY ip.quarter", params
+
+def _recipe_price_query(recipe_name, quarter=None):
+    """-> (쿼리, 인자)"""
+    query = RECIPE_PRICE_QUERY
+    params = [recipe_name]
+    if quarter:
+        query += " AND rc.quarter = %s"
+        params.append(quarter)
+    return query + " ORDER BY rc.quarter", params
+
+def _to_ingredient_prices(rows):
+    return [{
+        'quarter': row[0],
+        'price': float(row[1]),
+        'ingredient_name': row[2]
+    } for row in rows]
+
+def _to_recipe_prices(rows):
+    return [{
+        'quarter': row[0],
+        'recipe_name': row[1],
+        'total_price': float(row[2]),
+        'ingredients_detail': row[3]
+    } for row in rows]
+
+def _to_price_trend(rows):
+    return [{
+        'name': row[0],
+        'quarter': row[1],
+        'price': float(row[2]),
+        # 직전 분기 가격이 0 이면 변동률을 정할 수 없어 NULL -> None
+        'price_change_percent': float(row[3]) if row[3] is not None else None
+    } for row in rows]
+
 
 class PriceService:
     @staticmethod
     def get_ingredient_price_by_quarter(ingredient_name, quarter=None):
         """특정 재료의 분기별 가격 조회"""
+        backend = get_backend()
+        if backend:
+            return _to_ingredient_prices(backend.ingredient_prices(ingredient_name, quarter))
+        conn = None
+        cur = None
         try:
             conn = get_connection()
             cur = conn.cursor()
             
-            query = """
-                SELECT ip.quarter, ip.price, in_name.name
-                FROM IngredientPrice ip
-                JOIN IngredientName in_name ON ip.ingredientID = in_name.ingredientID
-                WHERE in_name.name = %s
-            """
-            params = [ingredient_name]
-            
-            if quarter:
-                query += " AND ip.quarter = %s"
-                params.append(quarter)
-                
-            query += " ORDER BY ip.quarter"
-            
-            cur.execute(query, params)
+            query, params = _ingredient_price_query(ingredient_name, quarter)
+            statements.execute(cur, query, params)
             results = cur.fetchall()
             
-            return [{
-                'quarter': row[0],
-                'price': float(row[1]),
-                'ingredient_name': row[2]
-            } for row in results]
+            return _to_ingredient_prices(results)
             
         finally:
             if cur:
@@ -41,50 +136,20 @@ class PriceService:
     @staticmethod
     def get_recipe_price_by_quarter(recipe_name, quarter=None):
         """레시피의 분기별 총 가격 조회"""
+        backend = get_backend()
+        if backend:
+            return _to_recipe_prices(backend.recipe_prices(recipe_name, quarter))
+        conn = None
+        cur = None
         try:
             conn = get_connection()
             cur = conn.cursor()
             
-            query = """
-                SELECT 
-                    ip.quarter,
-                    r.recipeName,
-                    CAST(SUM(ri.amount * ip.price) AS DECIMAL(10,2)) as total_cost,
-                    string_agg(
-                        concat(
-                            in_name.name, ' (',
-                            CAST(ri.amount AS VARCHAR), 'g × ', 
-                            CAST(ip.price AS VARCHAR), '원/g = ',
-                            CAST(ri.amount * ip.price AS VARCHAR), '원)'
-                        ),
-                        E'\n   '
-                    ) as ingredients_detail
-                FROM Recipe r
-                JOIN RecipeIngredient_info ri ON r.recipeID = ri.recipeID
-                JOIN IngredientPrice ip ON ri.ingredientID = ip.ingredientID
-                JOIN IngredientName in_name ON ri.ingredientID = in_name.ingredientID
-                WHERE r.recipeName = %s
-            """
-            params = [recipe_name]
-            
-            if quarter:
-                query += " AND ip.quarter = %s"
-                params.append(quarter)
-                
-            query += """
-                GROUP BY ip.quarter, r.recipeName
-                ORDER BY ip.quarter
-            """
-            
-            cur.execute(query, params)
+            query, params = _recipe_price_query(recipe_name, quarter)
+            statements.execute(cur, query, params)
             results = cur.fetchall()
             
-            return [{
-                'quarter': row[0],
-                'recipe_name': row[1],
-                'total_price': float(row[2]),
-                'ingredients_detail': row[3]
-            } for row in results]
+            return _to_recipe_prices(results)
             
         finally:
             if cur:
@@ -94,65 +159,62 @@ class PriceService:
 
     @staticmethod
     def analyze_price_trend(ingredient_name=None, recipe_name=None):
-        """가격 추이 분석"""
+        """가격 추이 분석 - 첫 분기 변동률은 0, 직전 분기 가격이 0 이라 정할 수 없는 변동률은 None
+        이름을 하나도 주지 않으면 빈 목록"""
+        if not ingredient_name and not recipe_name:
+            return []
+        backend = get_backend()
+        if backend:
+            if ingredient_name:
+                return _to_price_trend(backend.ingredient_trend(ingredient_name))
+            return _to_price_trend(backend.recipe_trend(recipe_name))
+        conn = None
+        cur = None
         try:
             conn = get_connection()
             cur = conn.cursor()
             
             if ingredient_name:
-                query = """
-                    SELECT 
-                        in_name.name,
-                        ip.quarter,
-                        ip.price,
-                        CASE 
-                            WHEN LAG(ip.price) OVER (ORDER BY ip.quarter) IS NULL THEN 0
-                            ELSE ((ip.price - LAG(ip.price) OVER (ORDER BY ip.quarter)) / LAG(ip.price) OVER (ORDER BY ip.quarter) * 100)
-                        END as price_change_percent
-                    FROM IngredientPrice ip
-                    JOIN IngredientName in_name ON ip.ingredientID = in_name.ingredientID
-                    WHERE in_name.name = %s
-                    ORDER BY ip.quarter
-                """
-                cur.execute(query, (ingredient_name,))
+                statements.execute(cur, INGREDIENT_TREND_QUERY, (ingredient_name,))
                 
-            elif recipe_name:
-                query = """
-                    WITH recipe_prices AS (
-                        SELECT 
-                            r.recipeName,
-                            ip.quarter,
-                            SUM(ri.amount * ip.price) as total_price
-                        FROM Recipe r
-                        JOIN RecipeIngredient_info ri ON r.recipeID = ri.recipeID
-                        JOIN IngredientPrice ip ON ri.ingredientID = ip.ingredientID
-                        WHERE r.recipeName = %s
-                        GROUP BY r.recipeName, ip.quarter
-                    )
-                    SELECT 
-                        recipeName,
-                        quarter,
-                        total_price,
-                        CASE 
-                            WHEN LAG(total_price) OVER (ORDER BY quarter) IS NULL THEN 0
-                            ELSE ((total_price - LAG(total_price) OVER (ORDER BY quarter)) / LAG(total_price) OVER (ORDER BY quarter) * 100)
-                        END as price_change_percent
-                    FROM recipe_prices
-                    ORDER BY quarter
-                """
-                cur.execute(query, (recipe_name,))
+            else:
+                statements.execute(cur, RECIPE_TREND_QUERY, (recipe_name,))
                 
             results = cur.fetchall()
             
-            return [{
-                'name': row[0],
-                'quarter': row[1],
-                'price': float(row[2]),
-                'price_change_percent': float(row[3]) if row[3] is not None else 0
-            } for row in results]
+            return _to_price_trend(results)
             
         finally:
             if cur:
                 cur.close()
             if conn:
-                conn.close()
\ No newline at end of file
+                conn.close()
+
+    @staticmethod
+    def get_all_recipe_costs(quarter=None):
+        """모든 레시피의 분기별 총 가격 일괄 조회 (리포트용) - 레시피 ID, 분기 순"""
+        matrix = price_matrix.cost_matrix()
+        quarters = matrix['quarters']
+        cols = [col for col, q in enumerate(quarters) if not quarter or q == quarter]
+        names = matrix['recipe_names']
+        return [{
+            'recipe_id': int(matrix['recipe_ids'][row]),
+            'recipe_name': names[row],
+            'quarter': quarters[cols[col]],
+            'total_price': float(matrix['costs'][row, cols[col]])
+        } for row, col in zip(*matrix['covered'][:, cols].nonzero())]
+
+    @staticmethod
+    def get_all_price_changes():
+        """모든 레시피의 분기별 가격 변동률 일괄 조회 (리포트용) - 레시피 ID, 분기 순"""
+        matrix = price_matrix.change_matrix()
+        quarters = matrix['quarters']
+        names = matrix['recipe_names']
+        return [{
+            'recipe_id': int(matrix['recipe_ids'][row]),
+            'name': names[row],
+            'quarter': quarters[col],
+            'price': float(matrix['totals'][row, col]),
+            # 직전 분기 비용이 0 이라 변동률을 정할 수 없으면 None
+            'price_change_percent': None if math.isnan(matrix['changes'][row, col]) else float(matrix['changes'][row, col])
+        } for row, col in zip(*matrix['covered'].nonzero())]
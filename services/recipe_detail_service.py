@@ -1,66 +1,142 @@
+import copy
+import os
+
+from database import statements
+from database.backend import get_backend
 from database.db_connector import get_connection
+from database.events import check_data_versions, on_data_reload, touches
+from services.cache import LRUCache
+
+# 레시피 본문/재료/영양 정보는 데이터 적재 때만 바뀌므로 recipe_id 별로 캐시한다
+# 다른 프로세스의 재적재는 조회 전 data_version 확인으로 알아채고, TTL 은 그 확인이 실패할 때의 안전장치
+DETAIL_CACHE_SIZE = int(os.environ.get('RECIPE_DETAIL_CACHE_SIZE', 1024))
+DETAIL_CACHE_TTL = float(os.environ.get('RECIPE_DETAIL_CACHE_TTL', 600))
+DETAIL_SOURCE_TABLES = ('Recipe', 'cooking_step', 'RecipeIngredient_info', 'IngredientName', 'recipe_nutrition')
+
+_detail_cache = LRUCache(maxsize=DETAIL_CACHE_SIZE, ttl=DETAIL_CACHE_TTL)
+
+# 상세 조회 쿼리 (scripts/init_db.py 의 인덱스 확인에서도 쓴다)
+# 조리 단계는 (recipe_id, step_no) 기본 키 순서대로, 재료명은 레시피별 서브쿼리로 모아 GROUP BY 없이 레시피당 한 행
+RECIPE_DETAILS_QUERY = """
+    SELECT 
+        r.recipeid,
+        r.recipename,
+        ARRAY(
+            SELECT cs.text FROM cooking_step cs
+            WHERE cs.recipe_id = r.recipeid
+            ORDER BY cs.step_no
+        ) as cooking_steps,
+        (
+            SELECT string_agg(DISTINCT in_name.name, ', ')
+            FROM recipeingredient_info ri
+            JOIN ingredientname in_name ON ri.ingredientid = in_name.ingredientid
+            WHERE ri.recipeid = r.recipeid
+        ) as ingredients,
+        rn.calories,
+        rn.carbohydrate,
+        rn.protein,
+        rn.fat
+    FROM recipe r
+    LEFT JOIN recipe_nutrition rn ON r.recipeid = rn.recipe_id
+    WHERE r.recipeid = ANY(%s)
+"""
+
+def _rows_to_details(rows):
+    """상세 조회 행 -> {recipe_id: 상세 정보} (레시피당 첫 행만 사용)"""
+    details = {}
+    for result in rows:
+        if result[0] in details:
+            continue
+        # 결과를 딕셔너리로 변환 (빈 조리 단계는 제외)
+        details[result[0]] = {
+            'recipe_id': result[0],
+            'recipe_name': result[1],
+            'cooking_steps': [step for step in (result[2] or ()) if step],
+            'ingredients': result[3] if result[3] else "재료 정보 없음",
+            'nutrition': {
+                'calories': result[4],
+                'carbohydrate': result[5],
+                'protein': result[6],
+                'fat': result[7]
+            }
+        }
+    return details
 
 class RecipeDetailService:
     @staticmethod
     def get_recipe_details(recipe_id):
-        """레시피 상세 정보 조회"""
+        """레시피 상세 정보 조회 (캐시 우선)"""
+        check_data_versions()
+        cached = _detail_cache.get(recipe_id)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        recipe_details = RecipeDetailService._fetch_recipe_details(recipe_id)
+        if recipe_details is not None:
+            _detail_cache.set(recipe_id, copy.deepcopy(recipe_details))
+        return recipe_details
+
+    @staticmethod
+    def invalidate_cache(recipe_id=None):
+        """상세 정보 캐시 무효화 - recipe_id 가 없으면 전체"""
+        if recipe_id is None:
+            _detail_cache.invalidate()
+        else:
+            _detail_cache.invalidate(recipe_id)
+
+    @staticmethod
+    def cache_stats():
+        """캐시 적중/미스 통계"""
+        return _detail_cache.stats()
+
+    @staticmethod
+    def get_recipe_details_many(recipe_ids):
+        """여러 레시피 상세 정보를 한 번에 조회 - 캐시에 없는 것만 한 쿼리로 가져온다"""
+        check_data_versions()
+        found = {}
+        to_fetch = []
+        for recipe_id in recipe_ids:
+            if recipe_id in found or recipe_id in to_fetch:
+                continue
+            cached = _detail_cache.get(recipe_id)
+            if cached is not None:
+                found[recipe_id] = cached
+            else:
+                to_fetch.append(recipe_id)
+
+        if to_fetch:
+            fetched = RecipeDetailService._fetch_recipe_details_many(to_fetch)
+            for recipe_id, recipe_details in fetched.items():
+                _detail_cache.set(recipe_id, copy.deepcopy(recipe_details))
+            found.update(fetched)
+
+        # 요청한 순서대로 반환, 없는 ID 는 따로 알려준다
+        return {
+            'recipes': [copy.deepcopy(found[recipe_id]) for recipe_id in recipe_ids if recipe_id in found],
+            'missing': [recipe_id for recipe_id in dict.fromkeys(recipe_ids) if recipe_id not in found]
+        }
+
+    @staticmethod
+    def _fetch_recipe_details(recipe_id):
+        """레시피 상세 정보 DB 조회"""
+        return RecipeDetailService._fetch_recipe_details_many([recipe_id]).get(recipe_id)
+
+    @staticmethod
+    def _fetch_recipe_details_many(recipe_ids):
+        """레시피 상세 정보 DB 조회 -> {recipe_id: 상세 정보}"""
+        backend = get_backend()
+        if backend:
+            return _rows_to_details(backend.recipe_details(recipe_ids))
+        conn = None
+        cur = None
         try:
             conn = get_connection()
             cur = conn.cursor()
             
-            # recipe_detail_service.py 수정
-            query = """
-                SELECT 
-                    r.recipeid,
-                    r.recipename,
-                    COALESCE(NULLIF(cm.manual01, ''), NULL) as manual01,
-                    COALESCE(NULLIF(cm.manual02, ''), NULL) as manual02,
-                    COALESCE(NULLIF(cm.manual03, ''), NULL) as manual03,
-                    COALESCE(NULLIF(cm.manual04, ''), NULL) as manual04,
-                    COALESCE(NULLIF(cm.manual05, ''), NULL) as manual05,
-                    COALESCE(NULLIF(cm.manual06, ''), NULL) as manual06,
-                    string_agg(DISTINCT in_name.name, ', ') as ingredients,
-                    rn.calories,
-                    rn.carbohydrate,
-                    rn.protein,
-                    rn.fat
-                FROM recipe r
-                LEFT JOIN cooking_method cm ON r.recipeid = cm.recipe_id
-                LEFT JOIN recipeingredient_info ri ON r.recipeid = ri.recipeid
-                LEFT JOIN ingredientname in_name ON ri.ingredientid = in_name.ingredientid
-                LEFT JOIN recipe_nutrition rn ON r.recipeid = rn.recipe_id
-                WHERE r.recipeid = %s
-                GROUP BY r.recipeid, r.recipename, cm.manual01, cm.manual02, 
-                        cm.manual03, cm.manual04, cm.manual05, cm.manual06,
-                        rn.calories, rn.carbohydrate, rn.protein, rn.fat
-            """
+            query = RECIPE_DETAILS_QUERY
             
-            cur.execute(query, (recipe_id,))
-            result = cur.fetchone()
+            statements.execute(cur, query, (list(recipe_ids),))
             
-            if not result:
-                return None
-                
-            # 결과를 딕셔너리로 변환
-            recipe_details = {
-                'recipe_id': result[0],
-                'recipe_name': result[1],
-                'cooking_steps': [],
-                'ingredients': result[8] if result[8] else "재료 정보 없음",
-                'nutrition': {
-                    'calories': result[9],
-                    'carbohydrate': result[10],
-                    'protein': result[11],
-                    'fat': result[12]
-                }
-            }
-            
-            # 조리 단계 추가 (빈 단계는 제외)
-            for i in range(2, 8):  # MANUAL01 ~ MANUAL06
-                if result[i]:
-                    recipe_details['cooking_steps'].append(result[i])
-            
-            return recipe_details
+            return _rows_to_details(cur.fetchall())
             
         finally:
             if cur:
@@ -68,6 +144,12 @@ class RecipeDetailService:
             if conn:
                 conn.close()
 
+def _invalidate_on_reload(tables):
+    if touches(tables, DETAIL_SOURCE_TABLES):
+        RecipeDetailService.invalidate_cache()
+
+on_data_reload(_invalidate_on_reload)
+
 def display_recipe_detail(recipe_details):
     """레시피 상세 정보 출력"""
     if not recipe_details:
@@ -1,79 +1,216 @@
 # recipe_service.py
+import os
+
+from database.backend import get_backend
+from database import statements
 from database.db_connector import get_connection
+from services.pagination import encode_cursor, decode_cursor
+from services.allergen_index import allergen_index
 
-class RecipeService:
-    @staticmethod
-    def search_recipes_by_budget(budget, quarter, page=1, per_page=10):
-        """예산 기반 레시피 검색"""
-        try:
-            conn = get_connection()
-            cur = conn.cursor()
-            
-            query = """
+# 총 개수 계산 방식: 'exact' 는 윈도 함수로 정확히, 'estimate' 는 플래너 추정치 (대용량 카탈로그용)
+COUNT_MODES = ('exact', 'estimate')
+DEFAULT_COUNT_MODE = os.environ.get('RECIPE_COUNT_MODE', 'exact')
+
+EMPTY_RESULT = {'recipes': [], 'total_count': 0, 'current_page': 1, 'has_more': False, 'next_cursor': None}
+
+def _row_to_recipe(row):
+    return {
+        'recipe_id': row[0],
+        'recipe_name': row[1],
+        'total_price': float(row[2]) if row[2] else 0,
+        'ingredients_detail': row[3] if row[3] else '재료 정보 없음'
+    }
+
+def _check_count_mode(count_mode):
+    if count_mode not in COUNT_MODES:
+        raise ValueError(f"count_mode 는 {COUNT_MODES} 중 하나여야 합니다: {count_mode!r}")
+
+def _count_column(mogrify, count_mode, match_query, match_params):
+    """페이지 쿼리에 붙일 총 개수 컬럼 - 별도 COUNT 쿼리 왕복 없이 한 번에 받는다
+    mogrify: 인자를 채운 쿼리 문자열을 돌려주는 함수 (cur.mogrify 등)"""
+    if count_mode == 'exact':
+        # LIMIT 이전에 계산되므로 (커서 이후) 조건에 맞는 전체 행 수가 된다
+        return "COUNT(*) OVER ()", []
+    # EXPLAIN 추정치 - 일치하는 행을 전부 읽지 않아 LIMIT 에서 바로 멈출 수 있다
+    return "(SELECT count_estimate(%s))", [mogrify(match_query, match_params).decode()]
+
+def _page_total(rows, count_mode, position, seek):
+    """페이지 행의 마지막 컬럼에서 총 개수를 꺼낸다 -> 따로 세야 하면 None"""
+    if rows:
+        total = rows[0][-1]
+        if count_mode == 'exact' and seek:
+            # 커서 이후 행 수 + 이미 반환한 행 수
+            total += position
+        return total
+    if seek or position == 0:
+        return position
+    # 마지막 페이지를 넘어선 OFFSET 요청만 개수를 따로 센다 (estimate 모드도 OFFSET 을 개수로 쓰면 안 된다)
+    return None
+
+def _count_query(match_query):
+    return f"SELECT COUNT(*) FROM ({match_query}) matched"
+
+def _total_count(cur, rows, count_mode, position, seek, match_query, match_params):
+    total = _page_total(rows, count_mode, position, seek)
+    if total is None:
+        cur.execute(_count_query(match_query), match_params)
+        total = cur.fetchone()[0]
+    return total
+
+# 예산 검색 조건 (개수 추정/초과 OFFSET 개수 세기에 쓴다)
+BUDGET_MATCH_QUERY = """
+                SELECT 1
+                FROM recipe_cost
+                WHERE quarter = %s
+                AND total_cost <= %s
+            """
+ALL_MATCH_QUERY = "SELECT 1 FROM Recipe"
+
+def _budget_page_query(count_column, count_params, budget, quarter, per_page, offset, seek):
+    """예산 검색 페이지 쿼리 -> (쿼리, 인자)
+    분기별 비용은 recipe_cost 에 미리 계산되어 있다
+    (quarter, total_cost, recipeID) 인덱스를 역방향으로 읽으며 커서 위치부터 시작한다"""
+    params = count_params + [quarter, budget]
+    seek_clause = ""
+    if seek:
+        seek_clause = "AND (rc.total_cost, rc.recipeID) < (%s, %s)"
+        params += [seek[0], seek[1]]
+        offset = 0
+    query = f"""
                 SELECT 
                     r.recipeID,
                     r.recipeName,
-                    CAST(SUM(ri.amount * ip.price) AS DECIMAL(10,2)) as total_cost,
-                    string_agg(
-                        concat(
-                            in_name.name, ' (', 
-                            ri.amount, 'g × ', 
-                            ip.price, '원/g = ', 
-                            CAST(ri.amount * ip.price AS DECIMAL(10,2)), '원)'
-                        ),
-                        E'\n   '
-                    ) as ingredients_detail
+                    rc.total_cost,
+                    rc.ingredients_detail,
+                    {count_column} as total_count
+                FROM recipe_cost rc
+                JOIN Recipe r ON r.recipeID = rc.recipeID
+                WHERE rc.quarter = %s
+                AND rc.total_cost <= %s
+                {seek_clause}
+                ORDER BY rc.total_cost DESC, rc.recipeID DESC
+                LIMIT %s OFFSET %s;
+            """
+    return query, params + [per_page + 1, offset]
+
+def _allergy_page_query(quarter, excluded_ids, per_page, offset, seek):
+    """알레르기 검색 페이지 쿼리 (제외할 레시피 ID 는 인덱스에서 구한 값) -> (쿼리, 인자)"""
+    params = [quarter, excluded_ids]
+    seek_clause = ""
+    if seek:
+        seek_clause = "AND (r.recipeName, r.recipeID) > (%s, %s)"
+        params += [seek[0], seek[1]]
+        offset = 0
+    query = f"""
+                SELECT
+                    r.recipeID,
+                    r.recipeName,
+                    COALESCE(rc.total_cost, 0) as total_cost,
+                    rc.ingredients_detail
                 FROM Recipe r
-                LEFT JOIN RecipeIngredient_info ri ON r.recipeID = ri.recipeID
-                LEFT JOIN IngredientPrice ip ON ri.ingredientID = ip.ingredientID
-                LEFT JOIN IngredientName in_name ON ri.ingredientID = in_name.ingredientID
-                WHERE ip.quarter = %s
-                GROUP BY r.recipeID, r.recipeName
-                HAVING CAST(SUM(ri.amount * ip.price) AS DECIMAL(10,2)) <= %s
-                ORDER BY total_cost DESC
+                LEFT JOIN recipe_cost rc ON r.recipeID = rc.recipeID
+                    AND rc.quarter = %s
+                WHERE r.recipeID <> ALL(%s::INT[])
+                {seek_clause}
+                ORDER BY r.recipeName, r.recipeID
                 LIMIT %s OFFSET %s;
             """
-            
-            offset = (page - 1) * per_page
-            cur.execute(query, (quarter, budget, per_page, offset))
-            
-            recipes = []
-            for row in cur.fetchall():
-                recipes.append({
-                    'recipe_id': row[0],
-                    'recipe_name': row[1],
-                    'total_price': float(row[2]) if row[2] else 0,
-                    'ingredients_detail': row[3] if row[3] else '재료 정보 없음'
-                })
-
-            count_query = """
-                SELECT COUNT(*)
-                FROM (
-                    SELECT r.recipeID
-                    FROM Recipe r
-                    LEFT JOIN RecipeIngredient_info ri ON r.recipeID = ri.recipeID
-                    LEFT JOIN IngredientPrice ip ON ri.ingredientID = ip.ingredientID
-                    WHERE ip.quarter = %s
-                    GROUP BY r.recipeID
-                    HAVING CAST(SUM(ri.amount * ip.price) AS DECIMAL(10,2)) <= %s
-                ) as filtered_recipes
+    return query, params + [per_page + 1, offset]
+
+def _all_page_query(count_column, count_params, quarter, per_page, offset, seek):
+    """전체 레시피 페이지 쿼리 -> (쿼리, 인자)
+    가격 정보가 없는 레시피는 0원으로 보고 맨 뒤에 둔다"""
+    params = count_params + [quarter]
+    seek_clause = ""
+    if seek:
+        seek_clause = "WHERE (COALESCE(rc.total_cost, 0), r.recipeID) < (%s, %s)"
+        params += [seek[0], seek[1]]
+        offset = 0
+    query = f"""
+                SELECT 
+                    r.recipeID,
+                    r.recipeName,
+                    rc.total_cost,
+                    rc.ingredients_detail,
+                    COALESCE(rc.total_cost, 0) as sort_cost,
+                    {count_column} as total_count
+                FROM Recipe r
+                LEFT JOIN recipe_cost rc ON r.recipeID = rc.recipeID
+                    AND rc.quarter = %s
+                {seek_clause}
+                ORDER BY sort_cost DESC, r.recipeID DESC
+                LIMIT %s OFFSET %s;
             """
+    return query, params + [per_page + 1, offset]
+
+def _split_allergies(allergy):
+    return [a.strip() for a in allergy.split(',') if a.strip()]
+
+def _build_page(kind, rows, per_page, position, total_count, sort_index, count_mode):
+    """per_page + 1 행을 받아 결과 딕셔너리와 다음 커서를 만든다"""
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    next_position = position + len(rows)
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(kind, last[sort_index], last[0], next_position)
+    if count_mode == 'estimate' and rows:
+        # 추정치가 실제로 본 행 수보다 작게 나오지 않도록 보정 (빈 페이지의 개수는 추정치가 아니다)
+        total_count = max(total_count, next_position + (1 if has_more else 0))
+    return {
+        'recipes': [_row_to_recipe(row) for row in rows],
+        'total_count': total_count,
+        'current_page': position // per_page + 1,
+        'has_more': has_more,
+        'next_cursor': next_cursor,
+        'count_mode': count_mode
+    }
+
+class RecipeService:
+    @staticmethod
+    def search_recipes_by_budget(budget, quarter, page=1, per_page=10, count_mode=DEFAULT_COUNT_MODE):
+        """예산 기반 레시피 검색 (페이지 번호)"""
+        return RecipeService._search_by_budget(budget, quarter, per_page, count_mode,
+                                               offset=(page - 1) * per_page)
+
+    @staticmethod
+    def search_recipes_by_budget_cursor(budget, quarter, cursor=None, per_page=10, count_mode=DEFAULT_COUNT_MODE):
+        """예산 기반 레시피 검색 (커서) - 이전 결과의 next_cursor 를 넘기면 다음 페이지"""
+        seek = decode_cursor(cursor, 'budget') if cursor else None
+        return RecipeService._search_by_budget(budget, quarter, per_page, count_mode, seek=seek)
+
+    @staticmethod
+    def _search_by_budget(budget, quarter, per_page, count_mode, offset=0, seek=None):
+        _check_count_mode(count_mode)
+        conn = None
+        cur = None
+        try:
+            backend = get_backend()
+            if backend:
+                # 메모리 엔진은 개수도 바로 정확히 구한다
+                rows, total_count = backend.budget_rows(budget, quarter, per_page + 1, offset, seek)
+                position = seek[2] if seek else offset
+                return _build_page('budget', rows, per_page, position, total_count, 2, 'exact')
+
+            conn = get_connection()
+            cur = conn.cursor()
             
-            cur.execute(count_query, (quarter, budget))
-            total_count = cur.fetchone()[0]
-            
-            has_more = total_count > (page * per_page)
-            
-            return {
-                'recipes': recipes,
-                'total_count': total_count,
-                'current_page': page,
-                'has_more': has_more
-            }
+            match_query = BUDGET_MATCH_QUERY
+            match_params = [quarter, budget]
+            count_column, count_params = _count_column(cur.mogrify, count_mode, match_query, match_params)
+
+            query, params = _budget_page_query(count_column, count_params, budget, quarter, per_page, offset, seek)
+            statements.execute(cur, query, params)
+            rows = cur.fetchall()
+
+            position = seek[2] if seek else offset
+            total_count = _total_count(cur, rows, count_mode, position, seek, match_query, match_params)
+            return _build_page('budget', rows, per_page, position, total_count, 2, count_mode)
             
         except Exception as e:
             print(f"레시피 검색 중 오류 발생: {e}")
-            return {'recipes': [], 'total_count': 0, 'current_page': 1, 'has_more': False}
+            return dict(EMPTY_RESULT)
         
         finally:
             if cur:
@@ -82,85 +219,47 @@ class RecipeService:
                 conn.close()
 
     @staticmethod
-    def search_recipes_by_allergy(allergy, quarter, page=1, per_page=10):
+    def search_recipes_by_allergy(allergy, quarter, page=1, per_page=10, count_mode=DEFAULT_COUNT_MODE):
+        """알레르기 재료를 제외한 레시피 검색 (페이지 번호)"""
+        return RecipeService._search_by_allergy(allergy, quarter, per_page, count_mode,
+                                                offset=(page - 1) * per_page)
+
+    @staticmethod
+    def search_recipes_by_allergy_cursor(allergy, quarter, cursor=None, per_page=10, count_mode=DEFAULT_COUNT_MODE):
+        """알레르기 재료를 제외한 레시피 검색 (커서)"""
+        seek = decode_cursor(cursor, 'allergy') if cursor else None
+        return RecipeService._search_by_allergy(allergy, quarter, per_page, count_mode, seek=seek)
+
+    @staticmethod
+    def _search_by_allergy(allergy, quarter, per_page, count_mode, offset=0, seek=None):
+        # 개수는 항상 인덱스에서 정확히 구하므로 count_mode 는 검증만 한다
+        _check_count_mode(count_mode)
         conn = None
         cur = None
         try:
+            # 알레르기 재료를 쓰는 레시피는 메모리 비트셋 인덱스에서 바로 구한다
+            # 총 개수도 인덱스에서 정확히 나오므로 개수 컬럼이 필요 없다
+            allergies = _split_allergies(allergy)
+            excluded_ids, total_count = allergen_index.split(allergies)
+
+            backend = get_backend()
+            if backend:
+                rows = backend.allergy_rows(quarter, excluded_ids, per_page + 1, offset, seek)
+                position = seek[2] if seek else offset
+                return _build_page('allergy', rows, per_page, position, total_count, 1, 'exact')
+            
             conn = get_connection()
             cur = conn.cursor()
             
-            allergies = [a.strip() for a in allergy.split(',') if a.strip()]
-            
-            query = """
-                SELECT DISTINCT
-                    r.recipeID,
-                    r.recipeName,
-                    CAST(SUM(ri.amount * COALESCE(ip.price, 0)) AS DECIMAL(10,2)) as total_cost,
-                    string_agg(
-                        concat(
-                            in_name.name, ' (', 
-                            ri.amount, 'g × ', 
-                            COALESCE(ip.price, 0), '원/g = ', 
-                            CAST(ri.amount * COALESCE(ip.price, 0) AS DECIMAL(10,2)), '��)'
-                        ),
-                        E'\n   '
-                    ) as ingredients_detail
-                FROM Recipe r
-                LEFT JOIN RecipeIngredient_info ri ON r.recipeID = ri.recipeID
-                LEFT JOIN IngredientName in_name ON ri.ingredientID = in_name.ingredientID
-                LEFT JOIN IngredientPrice ip ON ri.ingredientID = ip.ingredientID 
-                    AND ip.quarter = %s
-                WHERE NOT EXISTS (
-                    SELECT 1
-                    FROM RecipeIngredient_info ri2
-                    JOIN IngredientName ing ON ri2.ingredientID = ing.ingredientID
-                    WHERE ri2.recipeID = r.recipeID
-                    AND LOWER(ing.name) SIMILAR TO LOWER(%s)
-                )
-                GROUP BY r.recipeID, r.recipeName
-                ORDER BY r.recipeName
-                LIMIT %s OFFSET %s;
-            """
-            
-            offset = (page - 1) * per_page
-            allergy_pattern = '%%(' + '|'.join(allergies) + ')%%'
-            
-            cur.execute(query, (quarter, allergy_pattern, per_page, offset))
-            
-            recipes = []
-            for row in cur.fetchall():
-                recipes.append({
-                    'recipe_id': row[0],
-                    'recipe_name': row[1],
-                    'total_price': float(row[2]) if row[2] else 0,
-                    'ingredients_detail': row[3] if row[3] else '재료 정보 없음'
-                })
-
-            count_query = """
-                SELECT COUNT(DISTINCT r.recipeID)
-                FROM Recipe r
-                WHERE NOT EXISTS (
-                    SELECT 1
-                    FROM RecipeIngredient_info ri2
-                    JOIN IngredientName ing ON ri2.ingredientID = ing.ingredientID
-                    WHERE ri2.recipeID = r.recipeID
-                    AND LOWER(ing.name) SIMILAR TO LOWER(%s)
-                )
-            """
-            cur.execute(count_query, (allergy_pattern,))
-            total_count = cur.fetchone()[0]
-            
-            has_more = total_count > (page * per_page)
-            
-            return {
-                'recipes': recipes,
-                'total_count': total_count,
-                'current_page': page,
-                'has_more': has_more
-            }
+            query, params = _allergy_page_query(quarter, excluded_ids, per_page, offset, seek)
+            statements.execute(cur, query, params)
+            rows = cur.fetchall()
+
+            position = seek[2] if seek else offset
+            return _build_page('allergy', rows, per_page, position, total_count, 1, 'exact')
 
         except Exception as e:
-            return {'recipes': [], 'total_count': 0, 'current_page': 1, 'has_more': False}
+            return dict(EMPTY_RESULT)
 
         finally:
             if cur:
@@ -169,65 +268,45 @@ class RecipeService:
                 conn.close()
 
     @staticmethod
-    def get_all_recipes(quarter, page=1, per_page=10):
-        """모든 레시피 조회"""
+    def get_all_recipes(quarter, page=1, per_page=10, count_mode=DEFAULT_COUNT_MODE):
+        """모든 레시피 조회 (페이지 번호)"""
+        return RecipeService._get_all(quarter, per_page, count_mode, offset=(page - 1) * per_page)
+
+    @staticmethod
+    def get_all_recipes_cursor(quarter, cursor=None, per_page=10, count_mode=DEFAULT_COUNT_MODE):
+        """모든 레시피 조회 (커서)"""
+        seek = decode_cursor(cursor, 'all') if cursor else None
+        return RecipeService._get_all(quarter, per_page, count_mode, seek=seek)
+
+    @staticmethod
+    def _get_all(quarter, per_page, count_mode, offset=0, seek=None):
+        _check_count_mode(count_mode)
+        conn = None
+        cur = None
         try:
+            backend = get_backend()
+            if backend:
+                rows, total_count = backend.all_rows(quarter, per_page + 1, offset, seek)
+                position = seek[2] if seek else offset
+                return _build_page('all', rows, per_page, position, total_count, 4, 'exact')
+
             conn = get_connection()
             cur = conn.cursor()
             
-            query = """
-                SELECT 
-                    r.recipeID,
-                    r.recipeName,
-                    CAST(SUM(ri.amount * ip.price) AS DECIMAL(10,2)) as total_cost,
-                    string_agg(
-                        concat(
-                            in_name.name, ' (', 
-                            ri.amount, 'g × ', 
-                            ip.price, '원/g = ', 
-                            CAST(ri.amount * ip.price AS DECIMAL(10,2)), '원)'
-                        ),
-                        E'\n   '
-                    ) as ingredients_detail
-                FROM Recipe r
-                LEFT JOIN RecipeIngredient_info ri ON r.recipeID = ri.recipeID
-                LEFT JOIN IngredientPrice ip ON ri.ingredientID = ip.ingredientID 
-                    AND ip.quarter = %s
-                LEFT JOIN IngredientName in_name ON ri.ingredientID = in_name.ingredientID
-                GROUP BY r.recipeID, r.recipeName
-                ORDER BY total_cost DESC
-                LIMIT %s OFFSET %s;
-            """
-            
-            offset = (page - 1) * per_page
-            cur.execute(query, (quarter, per_page, offset))
-            
-            recipes = []
-            for row in cur.fetchall():
-                recipes.append({
-                    'recipe_id': row[0],
-                    'recipe_name': row[1],
-                    'total_price': float(row[2]) if row[2] else 0,
-                    'ingredients_detail': row[3] if row[3] else '재료 정보 없음'
-                })
-
-            # 전체 레시피 수 조회
-            count_query = "SELECT COUNT(*) FROM Recipe"
-            cur.execute(count_query)
-            total_count = cur.fetchone()[0]
-            
-            has_more = total_count > (page * per_page)
-            
-            return {
-                'recipes': recipes,
-                'total_count': total_count,
-                'current_page': page,
-                'has_more': has_more
-            }
+            match_query = ALL_MATCH_QUERY
+            count_column, count_params = _count_column(cur.mogrify, count_mode, match_query, [])
+
+            query, params = _all_page_query(count_column, count_params, quarter, per_page, offset, seek)
+            statements.execute(cur, query, params)
+            rows = cur.fetchall()
+
+            position = seek[2] if seek else offset
+            total_count = _total_count(cur, rows, count_mode, position, seek, match_query, [])
+            return _build_page('all', rows, per_page, position, total_count, 4, count_mode)
             
         except Exception as e:
             print(f"레시피 검색 중 오류 발생: {e}")
-            return {'recipes': [], 'total_count': 0, 'current_page': 1, 'has_more': False}
+            return dict(EMPTY_RESULT)
         
         finally:
             if cur:
@@ -0,0 +1,114 @@
+# services/search_service.py
+# 레시피명/조리 단계 전문 검색 - text_index 의 n-gram 역색인으로 후보를 찾고 예산/알레르기 조건을 함께 건다
+import numpy as np
+
+from services.allergen_index import allergen_index
+from services.price_matrix import price_matrix
+from services.text_index import query_terms, text_index
+
+SNIPPET_RADIUS = 30     # 조리 단계 하이라이트에서 일치 위치 앞뒤로 보여 줄 글자 수
+MAX_SNIPPETS = 3        # 레시피당 조리 단계 하이라이트 수
+
+EMPTY_SEARCH_RESULT = {'recipes': [], 'total_count': 0, 'current_page': 1, 'has_more': False}
+
+
+def _match_spans(text, terms):
+    """text 안에서 단어들이 나오는 [시작, 끝) 구간 (겹치면 합친다)"""
+    lowered = text.lower()
+    spans = []
+    for term in terms:
+        start = lowered.find(term)
+        while start != -1:
+            spans.append([start, start + len(term)])
+            start = lowered.find(term, start + len(term))
+    spans.sort()
+    merged = []
+    for span in spans:
+        if merged and span[0] <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], span[1])
+        else:
+            merged.append(span)
+    return merged
+
+
+def _highlights(name, steps, terms):
+    """레시피명 전체와 일치한 조리 단계 앞뒤 일부를 일치 구간과 함께"""
+    highlights = []
+    spans = _match_spans(name, terms)
+    if spans:
+        highlights.append({'field': 'name', 'text': name, 'spans': spans})
+    snippets = 0
+    for step_no, step in enumerate(steps, 1):
+        if snippets >= MAX_SNIPPETS:
+            break
+        spans = _match_spans(step, terms)
+        if not spans:
+            continue
+        snippets += 1
+        start = max(spans[0][0] - SNIPPET_RADIUS, 0)
+        end = min(spans[0][1] + SNIPPET_RADIUS, len(step))
+        highlights.append({
+            'field': 'step',
+            'step': step_no,
+            'text': step[start:end],
+            'spans': [[s - start, e - start] for s, e in spans if s >= start and e <= end],
+        })
+    return highlights
+
+
+class SearchService:
+    @staticmethod
+    def search_recipes(query, quarter=None, budget=None, allergy='', page=1, per_page=10):
+        """검색어의 모든 단어를 레시피명 또는 조리 단계에 포함하는 레시피 (BM25 점수순)
+        quarter 를 주면 그 분기 비용을 함께 돌려주고, budget 을 주면 그 분기 비용이 예산 이하인 것만
+        allergy: 쉼표로 구분한 알레르기 재료 - 그 재료를 쓰는 레시피는 뺀다"""
+        if budget is not None and quarter is None:
+            raise ValueError("예산으로 거르려면 분기가 필요합니다")
+        terms = query_terms(query)
+        if not terms:
+            return dict(EMPTY_SEARCH_RESULT)
+
+        snapshot, docs, scores = text_index.search(terms)
+        recipe_ids = snapshot['recipe_ids'][docs]
+
+        allergies = [a.strip() for a in (allergy or '').split(',') if a.strip()]
+        if allergies and len(docs):
+            excluded = np.array(allergen_index.excluded_recipe_ids(allergies), dtype=np.int64)
+            keep = ~np.isin(recipe_ids, excluded)
+            docs, scores, recipe_ids = docs[keep], scores[keep], recipe_ids[keep]
+
+        prices = None
+        if quarter is not None:
+            matrix = price_matrix.cost_matrix()
+            prices = np.full(len(docs), np.nan)
+            if quarter in matrix['quarters'] and len(docs):
+                col = matrix['quarters'].index(quarter)
+                rows = np.minimum(np.searchsorted(matrix['recipe_ids'], recipe_ids), len(matrix['recipe_ids']) - 1)
+                known = (matrix['recipe_ids'][rows] == recipe_ids) & matrix['covered'][rows, col]
+                prices[known] = matrix['costs'][rows[known], col]
+            if budget is not None:
+                keep = prices <= budget   # 가격이 없는 레시피(NaN)는 빠진다
+                docs, scores, recipe_ids, prices = docs[keep], scores[keep], recipe_ids[keep], prices[keep]
+
+        # 점수 내림차순, 같으면 ID 순
+        order = np.lexsort((recipe_ids, -scores))
+        offset = (page - 1) * per_page
+        page_rows = order[offset:offset + per_page]
+        recipes = []
+        for row in page_rows.tolist():
+            doc = int(docs[row])
+            recipe = {
+                'recipe_id': int(recipe_ids[row]),
+                'recipe_name': snapshot['names'][doc],
+                'score': round(float(scores[row]), 4),
+                'highlights': _highlights(snapshot['names'][doc], snapshot['steps'][doc], terms),
+            }
+            if prices is not None:
+                recipe['total_price'] = None if np.isnan(prices[row]) else float(prices[row])
+            recipes.append(recipe)
+        return {
+            'recipes': recipes,
+            'total_count': len(order),
+            'current_page': page,
+            'has_more': offset + per_page < len(order),
+        }
@@ -0,0 +1,106 @@
+# services/shopping_list_service.py
+# 여러 레시피(인분 배수 포함)의 재료를 재료별로 합쳐 장보기 목록을 만들고, 분기별 총 비용과 가장 싼 분기를 계산한다
+# 레시피×재료 사용량 행렬(price_matrix)에서 고른 레시피의 행만 모아 한 번에 합치므로 레시피 수백 개도 쿼리 없이 처리한다
+import math
+
+import numpy as np
+
+from services.price_matrix import price_matrix
+
+MAX_RECIPES = 1000   # 한 번에 합칠 수 있는 레시피 수
+MAX_SERVINGS = 10000   # 레시피 하나의 (합친) 인분 배수 상한 - 사용량×가격이 float 범위를 넘지 않도록
+
+
+def _normalize_items(recipes):
+    """{레시피 ID: 인분 배수} / [(레시피 ID, 인분 배수)] / [레시피 ID] -> [(레시피 ID, 배수)] (같은 레시피는 배수를 더한다)"""
+    pairs = recipes.items() if isinstance(recipes, dict) else recipes
+    merged = {}
+    for item in pairs:
+        recipe_id, servings = (item, 1) if isinstance(item, int) else item
+        try:
+            servings = float(servings)
+        except (TypeError, ValueError):
+            raise ValueError(f"인분 배수가 올바르지 않습니다: {recipe_id} -> {servings!r}")
+        # NaN 은 비교에서, inf (JSON 의 1e999) 는 isfinite 에서 걸러진다 - 응답에 Infinity 가 들어가지 않도록
+        if not servings > 0 or not math.isfinite(servings):
+            raise ValueError(f"인분 배수는 0보다 큰 유한한 수여야 합니다: {recipe_id} -> {servings}")
+        total = merged.get(int(recipe_id), 0.0) + servings
+        if total > MAX_SERVINGS:
+            raise ValueError(f"인분 배수는 레시피마다 {MAX_SERVINGS} 이하여야 합니다: {recipe_id} -> {total}")
+        merged[int(recipe_id)] = total
+    if len(merged) > MAX_RECIPES:
+        raise ValueError(f"한 번에 {MAX_RECIPES}개 레시피까지 합칠 수 있습니다")
+    return list(merged.items())
+
+
+class ShoppingListService:
+    @staticmethod
+    def build_shopping_list(recipes, quarter=None):
+        """레시피 목록 -> 재료별 합산 장보기 목록과 분기별(quarter 를 주면 그 분기만) 비용
+        recipes: {레시피 ID: 인분 배수} 또는 (레시피 ID, 인분 배수) 목록, 배수를 생략하면 1"""
+        items = _normalize_items(recipes)
+        matrix = price_matrix.usage_matrix()
+        recipe_ids = matrix['recipe_ids']
+        quarters = matrix['quarters']
+        if quarter is not None:
+            quarters = [quarter] if quarter in quarters else []
+        columns = [matrix['quarters'].index(q) for q in quarters]
+
+        # 레시피 ID -> 행 위치 (recipe_ids 는 정렬되어 있다)
+        requested = np.array([recipe_id for recipe_id, _ in items], dtype=np.int64)
+        servings = np.array([multiplier for _, multiplier in items], dtype=np.float64)
+        positions = np.searchsorted(recipe_ids, requested)
+        found = positions < len(recipe_ids)
+        found[found] = recipe_ids[positions[found]] == requested[found]
+        missing = requested[~found].tolist()
+        positions, servings = positions[found], servings[found]
+
+        # 고른 행들의 CSR 구간을 한 번에 모은다
+        indptr = matrix['indptr']
+        lengths = indptr[positions + 1] - indptr[positions]
+        offsets = np.repeat(indptr[positions] - np.cumsum(lengths) + lengths, lengths)
+        entries = offsets + np.arange(int(lengths.sum()))
+        weights = np.repeat(servings, lengths)
+
+        # 재료별 합산 (0.01 g 단위 × 배수)
+        ingredients, inverse = np.unique(matrix['cols'][entries], return_inverse=True)
+        amount_units = np.bincount(inverse, weights=matrix['amounts'][entries] * weights,
+                                   minlength=len(ingredients))
+        # 재료×분기 비용 (원) - 가격이 없는 분기는 비용 0, priced=False
+        prices = matrix['prices'][ingredients][:, columns]
+        priced = matrix['priced'][ingredients][:, columns]
+        costs = amount_units[:, None] * prices / 10000
+
+        shopping_list = [{
+            'ingredient_id': int(matrix['ingredient_ids'][ingredient]),
+            'name': matrix['ingredient_names'][ingredient],
+            'amount': round(float(amount_units[row]) / 100, 2),
+            'prices': [{
+                'quarter': q,
+                'unit_price': float(prices[row, col]) / 100,
+                'cost': round(float(costs[row, col]), 2),
+            } for col, q in enumerate(quarters) if priced[row, col]],
+        } for row, ingredient in enumerate(ingredients.tolist())]
+        shopping_list.sort(key=lambda item: (item['name'] or '', item['ingredient_id']))
+
+        quarter_totals = [{
+            'quarter': q,
+            'total_price': round(float(costs[:, col].sum()), 2),
+            'missing_ingredients': sorted(matrix['ingredient_names'][ingredient] or ''
+                                          for ingredient in ingredients[~priced[:, col]].tolist()),
+        } for col, q in enumerate(quarters)]
+
+        # 가격이 빠진 재료가 가장 적은 분기 중 가장 싼 분기
+        cheapest = min(quarter_totals, key=lambda total: (len(total['missing_ingredients']), total['total_price']),
+                       default=None) if len(ingredients) else None
+        return {
+            'recipes': [{
+                'recipe_id': int(recipe_ids[position]),
+                'recipe_name': matrix['recipe_names'][position],
+                'servings': float(multiplier),
+            } for position, multiplier in zip(positions.tolist(), servings.tolist())],
+            'missing_recipes': missing,
+            'ingredients': shopping_list,
+            'quarters': quarter_totals,
+            'cheapest_quarter': cheapest['quarter'] if cheapest else None,
+        }
@@ -0,0 +1,198 @@
+# services/substitution_service.py
+# 레시피의 비싼 재료를 같은 대체 그룹(IngredientSubstitute)의 더 싼 재료로 바꾸는 제안과 바꾼 뒤의 총 비용
+# 그룹 안의 분기별 가격 순위를 미리 만들어 두고, 여러 레시피(검색 결과 한 페이지)의 제안을 한 번에 계산한다
+import threading
+
+import numpy as np
+
+from database.backend import get_backend
+from database.db_connector import get_connection
+from database.events import check_data_versions, on_data_reload, touches
+from services.price_matrix import price_matrix
+
+DEFAULT_MAX_SWAPS = 3      # 레시피당 바꿔 볼 재료 수 (비싼 재료부터)
+ALTERNATIVES = 3           # 재료마다 보여 줄 대체 후보 수 (싼 순)
+
+
+def _round_units(units):
+    """0.0001 원 단위 정수 -> 원 (recipe_cost 처럼 0.01 원에서 반올림)"""
+    return float(np.sign(units) * ((abs(int(units)) + 50) // 100) / 100)
+
+
+class SubstituteIndex:
+    """대체 그룹별·분기별 재료 가격 순위 - 가격 행렬(price_matrix)의 재료 위치 기준"""
+    SOURCE_TABLES = ('IngredientSubstitute',)
+
+    def __init__(self, loader=None):
+        self._loader = loader or self._load
+        self._lock = threading.Lock()
+        self._groups = None
+        self._ranking = None   # (가격 행렬 배열, 순위) - 가격 행렬이 다시 만들어지면 순위도 다시 만든다
+
+    @staticmethod
+    def _load():
+        backend = get_backend()
+        if backend:
+            return backend.substitute_source()
+        conn = None
+        cur = None
+        try:
+            conn = get_connection()
+            cur = conn.cursor()
+            cur.execute("SELECT ingredientID, group_name FROM IngredientSubstitute")
+            return cur.fetchall()
+        finally:
+            if cur:
+                cur.close()
+            if conn:
+                conn.close()
+
+    def _get_groups(self):
+        check_data_versions()
+        groups = self._groups
+        if groups is None:
+            with self._lock:
+                if self._groups is None:
+                    self._groups = dict(self._loader())
+                groups = self._groups
+        return groups
+
+    @staticmethod
+    def build(groups, matrix):
+        """재료별 그룹 번호와 분기별 {그룹 번호: 가격 오름차순 재료 위치 배열}, 그룹 최저가"""
+        group_ids = {}
+        group_of = np.full(len(matrix['ingredient_ids']), -1, dtype=np.int64)
+        for pos, ingredient_id in enumerate(matrix['ingredient_ids'].tolist()):
+            group = groups.get(ingredient_id)
+            if group is not None:
+                group_of[pos] = group_ids.setdefault(group, len(group_ids))
+
+        ranked = []
+        cheapest = np.full((len(group_ids), len(matrix['quarters'])), np.iinfo(np.int64).max, dtype=np.int64)
+        for col in range(len(matrix['quarters'])):
+            members = np.flatnonzero((group_of >= 0) & matrix['priced'][:, col])
+            prices = matrix['prices'][members, col]
+            # 그룹, 가격, 재료 ID 순 정렬 -> 그룹마다 연속 구간
+            order = members[np.lexsort((matrix['ingredient_ids'][members], prices, group_of[members]))]
+            starts = np.flatnonzero(np.r_[True, group_of[order][1:] != group_of[order][:-1]]) if len(order) else order
+            bounds = np.r_[starts, len(order)]
+            ranked.append({int(group_of[order[start]]): order[start:end] for start, end in zip(bounds[:-1], bounds[1:])})
+            for group, run in ranked[-1].items():
+                cheapest[group, col] = matrix['prices'][run[0], col]
+        return {'group_of': group_of, 'ranked': ranked, 'cheapest': cheapest}
+
+    def ranking(self, matrix):
+        check_data_versions()
+        cached = self._ranking
+        if cached is not None and cached[0] is matrix['prices']:
+            return cached[1]
+        ranking = self.build(self._get_groups(), matrix)
+        self._ranking = (matrix['prices'], ranking)
+        return ranking
+
+    def invalidate(self, tables=None):
+        if touches(tables, self.SOURCE_TABLES):
+            with self._lock:
+                self._groups = None
+                self._ranking = None
+
+
+substitute_index = SubstituteIndex()
+on_data_reload(substitute_index.invalidate)
+
+
+class SubstitutionService:
+    @staticmethod
+    def suggest_substitutions(recipe_id, quarter, budget=None, max_swaps=DEFAULT_MAX_SWAPS):
+        """레시피 하나의 대체 재료 제안 (없는 레시피/분기면 None)"""
+        return SubstitutionService.suggest_substitutions_many([recipe_id], quarter, budget, max_swaps).get(recipe_id)
+
+    @staticmethod
+    def suggest_substitutions_many(recipe_ids, quarter, budget=None, max_swaps=DEFAULT_MAX_SWAPS):
+        """여러 레시피의 대체 재료 제안 -> {recipe_id: 제안}
+        비싼 재료부터 같은 그룹에서 가장 싼 재료(레시피에 이미 있는 재료 제외)로 바꾼다
+        budget 을 주면 총 비용이 예산 안에 들어오는 순간 멈추고, 아니면 max_swaps 개까지 바꾼다"""
+        matrix = price_matrix.usage_matrix()
+        if quarter not in matrix['quarters']:
+            return {}
+        col = matrix['quarters'].index(quarter)
+        ranking = substitute_index.ranking(matrix)
+        group_of, ranked, cheapest = ranking['group_of'], ranking['ranked'][col], ranking['cheapest'][:, col]
+        all_prices, priced = matrix['prices'][:, col], matrix['priced'][:, col]
+        names = matrix['ingredient_names']
+
+        # 요청한 레시피의 재료 구간을 한 번에 모은다
+        recipe_ids = list(dict.fromkeys(recipe_ids))
+        requested = np.array(recipe_ids, dtype=np.int64)
+        positions = np.searchsorted(matrix['recipe_ids'], requested)
+        found = positions < len(matrix['recipe_ids'])
+        found[found] = matrix['recipe_ids'][positions[found]] == requested[found]
+        positions = positions[found]
+        indptr = matrix['indptr']
+        lengths = indptr[positions + 1] - indptr[positions]
+        offsets = np.repeat(indptr[positions] - np.cumsum(lengths) + lengths, lengths)
+        entries = offsets + np.arange(int(lengths.sum()))
+        cols, amounts = matrix['cols'][entries], matrix['amounts'][entries]
+
+        # 재료별 비용과 더 싼 대체 재료가 그룹에 있는지 (0.0001 원 단위 정수)
+        prices = all_prices[cols]
+        costs = np.where(priced[cols], amounts * prices, 0)
+        groups = group_of[cols]
+        swappable = priced[cols] & (groups >= 0)
+        swappable[swappable] = cheapest[groups[swappable]] < prices[swappable]
+
+        suggestions = {}
+        bounds = np.r_[0, np.cumsum(lengths)]
+        for row, position in enumerate(positions.tolist()):
+            start, end = bounds[row], bounds[row + 1]
+            if not priced[cols[start:end]].any():
+                continue   # 이 분기 가격이 하나도 없는 레시피
+            total = int(costs[start:end].sum())
+            # 레시피에 있는 재료와 이미 고른 대체 재료는 후보에서 뺀다 (같은 재료가 두 번 들어가지 않도록)
+            in_recipe = set(cols[start:end].tolist())
+            new_total = total
+            swaps = []
+            # 비싼 재료부터 (같으면 재료 ID 순)
+            for entry in sorted(np.flatnonzero(swappable[start:end]).tolist(),
+                                key=lambda i: (-costs[start + i], matrix['ingredient_ids'][cols[start + i]])):
+                if len(swaps) >= max_swaps or (budget is not None and _round_units(new_total) <= budget):
+                    break
+                entry += start
+                ingredient, amount, price = int(cols[entry]), int(amounts[entry]), int(prices[entry])
+                candidates = [candidate for candidate in ranked[int(groups[entry])].tolist()
+                              if all_prices[candidate] < price and candidate not in in_recipe][:ALTERNATIVES]
+                if not candidates:
+                    continue
+                substitutes = [{
+                    'ingredient_id': int(matrix['ingredient_ids'][candidate]),
+                    'name': names[candidate],
+                    'unit_price': float(all_prices[candidate]) / 100,
+                    'cost': _round_units(amount * int(all_prices[candidate])),
+                    'savings': _round_units(amount * (price - int(all_prices[candidate]))),
+                } for candidate in candidates]
+                new_total -= amount * (price - int(all_prices[candidates[0]]))
+                in_recipe.add(candidates[0])
+                swaps.append({
+                    'ingredient_id': int(matrix['ingredient_ids'][ingredient]),
+                    'name': names[ingredient],
+                    'amount': amount / 100,
+                    'unit_price': price / 100,
+                    'cost': _round_units(int(costs[entry])),
+                    'substitute': substitutes[0],
+                    'alternatives': substitutes[1:],
+                })
+
+            recipe_id = int(matrix['recipe_ids'][position])
+            suggestion = {
+                'recipe_id': recipe_id,
+                'recipe_name': matrix['recipe_names'][position],
+                'quarter': quarter,
+                'total_price': _round_units(total),
+                'new_total_price': _round_units(new_total),
+                'savings': _round_units(total - new_total),
+                'swaps': swaps,
+            }
+            if budget is not None:
+                suggestion['within_budget'] = suggestion['new_total_price'] <= budget
+            suggestions[recipe_id] = suggestion
+        return suggestions
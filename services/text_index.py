@@ -0,0 +1,206 @@
+# services/text_index.py
+# 레시피명/조리 단계 전문 검색용 역색인 - 한국어는 띄어쓰기/조사가 일정하지 않아 단어 대신 글자 1-gram/2-gram 을 색인한다
+import re
+import threading
+
+import numpy as np
+
+from database.backend import get_backend
+from database.db_connector import get_connection
+from database.events import check_data_versions, on_data_reload, touches
+
+NAME_WEIGHT = 3        # 레시피명에 나온 n-gram 은 조리 단계보다 이만큼 더 센다
+BM25_K1 = 1.2
+BM25_B = 0.75
+_SEPARATORS = re.compile(r'[^\w]+')
+_WORD_CHAR = re.compile(r'\w')
+
+
+def normalize(text):
+    """소문자로 바꾸고 글자/숫자가 아닌 것은 공백 하나로"""
+    return _SEPARATORS.sub(' ', (text or '').lower()).strip()
+
+
+def query_terms(query):
+    """검색어 -> 정규화한 단어 목록 (중복 제거, 순서 유지)"""
+    return list(dict.fromkeys(normalize(query).split()))
+
+
+def _counted(keys):
+    """정렬된 키 배열 -> (고유 키, 개수)"""
+    if not len(keys):
+        return keys, np.zeros(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return keys[starts], np.diff(np.r_[starts, len(keys)])
+
+
+class TextIndex:
+    """n-gram -> (레시피 위치, 가중 빈도) 역색인 (CSR) 과 검증/하이라이트용 텍스트"""
+    SOURCE_TABLES = ('Recipe', 'cooking_step')
+
+    def __init__(self, loader=None):
+        self._loader = loader or self._load
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    @staticmethod
+    def _load():
+        backend = get_backend()
+        if backend:
+            return backend.search_source()
+        conn = None
+        cur = None
+        try:
+            conn = get_connection()
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT r.recipeID, r.recipeName,
+                       ARRAY(SELECT cs.text FROM cooking_step cs WHERE cs.recipe_id = r.recipeID ORDER BY cs.step_no)
+                FROM Recipe r
+                ORDER BY r.recipeID
+            """)
+            return cur.fetchall()
+        finally:
+            if cur:
+                cur.close()
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def build(rows):
+        """(레시피 ID, 이름, 조리 단계 목록) -> 역색인
+        모든 필드를 한 문자열로 이어 코드 포인트 배열로 바꾼 뒤, n-gram 추출과 (n-gram, 레시피) 집계를 numpy 정렬로 한다"""
+        rows = sorted(rows, key=lambda row: row[0])
+        recipe_ids = np.array([row[0] for row in rows], dtype=np.int64)
+        names = [row[1] or '' for row in rows]
+        steps = [tuple(step for step in (row[2] or ()) if step and step.strip()) for row in rows]
+
+        # 필드(이름, 단계)마다 소문자로 바꿔 \n 으로 잇는다 - \n 은 구분자라 n-gram 이 필드/레시피 경계를 넘지 않는다
+        texts = ['\n'.join([name.lower()] + [step.lower() for step in doc_steps])
+                 for name, doc_steps in zip(names, steps)]
+        name_lengths = np.array([len(name.lower()) for name in names], dtype=np.int64)
+        doc_lengths_chars = np.array([len(text) + 1 for text in texts], dtype=np.int64)
+        joined = '\n'.join(texts) + '\n' if texts else ''
+        codes = np.frombuffer(joined.encode('utf-32-le'), dtype=np.uint32)
+
+        # 글자 -> 촘촘한 번호 (n-gram 키를 작게 유지), 단어 글자가 아니면 구분자
+        chars = np.unique(codes)
+        dense = np.searchsorted(chars, codes).astype(np.int64)
+        is_word = np.array([bool(_WORD_CHAR.match(chr(code))) for code in chars.tolist()], dtype=bool)[dense]
+        docs = np.repeat(np.arange(len(texts), dtype=np.int64), doc_lengths_chars)
+        doc_starts = np.r_[0, np.cumsum(doc_lengths_chars)[:-1]]
+        in_name = (np.arange(len(codes)) - np.repeat(doc_starts, doc_lengths_chars)) < np.repeat(name_lengths,
+                                                                                                 doc_lengths_chars)
+        pair = is_word[:-1] & is_word[1:]
+
+        # n-gram 번호: 1-gram = a × (글자 수 + 1), 2-gram = a × (글자 수 + 1) + b + 1
+        base = len(chars) + 1
+        gram_keys = np.concatenate([dense[is_word] * base, dense[:-1][pair] * base + dense[1:][pair] + 1])
+        gram_docs = np.concatenate([docs[is_word], docs[:-1][pair]])
+        gram_in_name = np.concatenate([in_name[is_word], in_name[:-1][pair]])
+
+        # (n-gram, 레시피) 별 빈도 - 레시피명 n-gram 은 NAME_WEIGHT 배
+        n_docs = max(len(texts), 1)
+        keys, counts = _counted(np.sort(gram_keys * n_docs + gram_docs))
+        name_keys, name_counts = _counted(np.sort((gram_keys * n_docs + gram_docs)[gram_in_name]))
+        frequencies = counts.astype(np.float32)
+        frequencies[np.searchsorted(keys, name_keys)] += (NAME_WEIGHT - 1) * name_counts
+
+        grams, gram_starts = np.unique(keys // n_docs, return_index=True)
+        indptr = np.r_[gram_starts, len(keys)]
+        postings = (keys % n_docs).astype(np.int32)
+        doc_lengths = (np.bincount(gram_docs, minlength=len(texts)) +
+                       (NAME_WEIGHT - 1) * np.bincount(gram_docs[gram_in_name], minlength=len(texts)))
+        return {
+            'recipe_ids': recipe_ids,
+            'names': names,
+            'steps': steps,
+            'texts': texts,
+            'chars': chars,
+            'gram_base': base,
+            'grams': grams,
+            'indptr': indptr,
+            'postings': postings,
+            'frequencies': frequencies,
+            'doc_lengths': doc_lengths,
+            'avg_length': float(doc_lengths.mean()) if len(doc_lengths) else 0.0,
+        }
+
+    def _get_snapshot(self):
+        check_data_versions()
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self.build(self._loader())
+                snapshot = self._snapshot
+        return snapshot
+
+    def invalidate(self, tables=None):
+        if touches(tables, self.SOURCE_TABLES):
+            with self._lock:
+                self._snapshot = None
+
+    @staticmethod
+    def _term_grams(snapshot, term):
+        """단어 -> n-gram 번호 목록 (한 글자 단어는 1-gram, 그 외에는 2-gram), 색인에 없는 글자가 있으면 None"""
+        chars = snapshot['chars']
+        codes = np.array([ord(char) for char in term], dtype=np.uint32)
+        dense = np.searchsorted(chars, codes)
+        if (dense >= len(chars)).any() or (chars[np.minimum(dense, len(chars) - 1)] != codes).any():
+            return None
+        base = snapshot['gram_base']
+        if len(dense) == 1:
+            return [int(dense[0]) * base]
+        return [int(a) * base + int(b) + 1 for a, b in zip(dense[:-1], dense[1:])]
+
+    def search(self, terms):
+        """모든 단어를 포함하는 레시피 -> (스냅샷, 레시피 위치 배열, BM25 점수 배열)
+        n-gram 포스팅 교집합으로 후보를 줄이고, 단어가 실제로 이어서 나오는지 텍스트에서 확인한다"""
+        snapshot = self._get_snapshot()
+        empty = (snapshot, np.zeros(0, dtype=np.int32), np.zeros(0))
+        codes = []
+        for term in terms:
+            term_codes = self._term_grams(snapshot, term)
+            if term_codes is None:
+                return empty
+            codes.extend(term_codes)
+        codes = list(dict.fromkeys(codes))
+        if not codes or not len(snapshot['grams']):
+            return empty
+
+        grams = snapshot['grams']
+        positions = np.searchsorted(grams, codes)
+        if (positions >= len(grams)).any() or (grams[np.minimum(positions, len(grams) - 1)] != codes).any():
+            return empty   # 색인에 없는 n-gram 이 있으면 결과 없음
+
+        indptr, postings, frequencies = snapshot['indptr'], snapshot['postings'], snapshot['frequencies']
+        # 포스팅이 짧은 n-gram 부터 교집합
+        spans = sorted(((indptr[pos], indptr[pos + 1]) for pos in positions.tolist()), key=lambda span: span[1] - span[0])
+        candidates = postings[spans[0][0]:spans[0][1]]
+        for start, end in spans[1:]:
+            candidates = np.intersect1d(candidates, postings[start:end], assume_unique=True)
+            if not len(candidates):
+                return empty
+
+        # 2-gram 이 모두 있어도 떨어져 있을 수 있다 - 단어가 그대로 들어 있는지 확인
+        if any(len(term) > 2 for term in terms):
+            texts = snapshot['texts']
+            candidates = candidates[np.fromiter((all(term in texts[doc] for term in terms) for doc in candidates.tolist()),
+                                                dtype=bool, count=len(candidates))]
+
+        # BM25 (n-gram 단위)
+        n_docs = len(snapshot['recipe_ids'])
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * snapshot['doc_lengths'][candidates] / max(snapshot['avg_length'], 1e-9))
+        scores = np.zeros(len(candidates))
+        for start, end in spans:
+            docs = postings[start:end]
+            df = end - start
+            idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            tf = frequencies[start:end][np.searchsorted(docs, candidates)]
+            scores += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return snapshot, candidates, scores
+
+
+text_index = TextIndex()
+on_data_reload(text_index.invalidate)
@@ -0,0 +1,154 @@
+# tests/conftest.py
+# 서비스 동작 테스트 - DB_BACKEND=memory 로 PostgreSQL 없이 data/ CSV 사본을 메모리 엔진에 올려 돌린다
+import csv
+import os
+import shutil
+import sys
+from decimal import Decimal, ROUND_HALF_UP
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['DB_BACKEND'] = 'memory'
+
+from database import events
+from database.backend import get_backend, set_backend
+from database.db_connector import DB_CONFIG, close_pool, get_connection
+from database.events import notify_data_reload
+from database.memory_engine import MemoryEngine
+from scripts.bulk_load import DATA_DIR
+from scripts.init_db import init_cooking_step_table, init_database, sync_database
+
+# PostgreSQL 이 필요한 테스트용 데이터베이스 - 스키마를 지우고 다시 만들므로 운영 DB 이름을 쓰면 안 된다
+TEST_DB_NAME = os.environ.get('TEST_DB_NAME')
+
+
+def read_csv(data_dir, name):
+    """CSV -> 행 딕셔너리 목록"""
+    with open(os.path.join(data_dir, name), encoding='utf-8-sig', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def quarter_costs(data_dir, quarter):
+    """CSV 에서 직접 계산한 분기 비용 {레시피 ID: 0.01 원 반올림 비용} - 가격이 하나도 없는 레시피는 빠진다"""
+    prices = {row['ingredientID']: Decimal(row['price'])
+              for row in read_csv(data_dir, 'IngredientPrice.csv') if int(row['quarter']) == quarter}
+    # (레시피, 재료) 가 기본 키라 CSV 에 중복된 행은 한 번만 센다
+    amounts = {(int(row['recipeID']), row['ingredientID']): Decimal(row['amount'])
+               for row in read_csv(data_dir, 'RecipeIngredientInfo.csv')}
+    costs = {}
+    for (recipe_id, ingredient_id), amount in amounts.items():
+        if ingredient_id in prices:
+            costs[recipe_id] = costs.get(recipe_id, 0) + amount * prices[ingredient_id]
+    return {recipe_id: cost.quantize(Decimal('0.01'), ROUND_HALF_UP) for recipe_id, cost in costs.items()}
+
+
+def write_csv(data_dir, name, rows):
+    """행 딕셔너리 목록으로 CSV 를 다시 쓴다 - 헤더는 원래 파일 것을 쓴다"""
+    path = os.path.join(data_dir, name)
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        header = next(csv.reader(f))
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=header)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def append_csv(data_dir, name, rows):
+    """CSV 끝에 행 추가 - 원본처럼 CRLF 로 쓰고, 마지막 줄바꿈이 없는 파일도 처리한다"""
+    path = os.path.join(data_dir, name)
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'a', encoding='utf-8', newline='') as f:
+        if data and not data.endswith(b'\n'):
+            f.write('\r\n')
+        f.writelines(','.join(str(value) for value in row) + '\r\n' for row in rows)
+
+
+def query_db(query, params=None):
+    """PostgreSQL 조회 -> 행 목록"""
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(query, params)
+        return cur.fetchall()
+    finally:
+        cur.close()
+        conn.rollback()
+        conn.close()
+
+
+def reload_data(data_dir):
+    """고친 CSV 반영 - PostgreSQL 경로는 증분 동기화, 메모리 엔진은 재적재 알림"""
+    if get_backend() is None:
+        return sync_database(data_dir)
+    notify_data_reload()
+
+
+@pytest.fixture(scope='session')
+def engine():
+    """테스트 전체에서 쓰는 메모리 엔진 (재적재 콜백이 쌓이지 않도록 하나만 만든다)"""
+    engine = set_backend(MemoryEngine(DATA_DIR))
+    yield engine
+    set_backend(None)
+
+
+@pytest.fixture
+def data_dir(tmp_path, engine):
+    """data/ 사본을 엔진에 올린다 -> 사본 디렉터리
+    CSV 를 고친 테스트는 적재 스크립트처럼 notify_data_reload 로 다시 읽게 한다"""
+    target = str(tmp_path / 'data')
+    shutil.copytree(DATA_DIR, target)
+    engine.data_dir = target
+    # 엔진을 사본으로 다시 읽고, 이전 테스트의 인덱스/행렬 스냅샷을 버린다
+    notify_data_reload()
+    return target
+
+
+@pytest.fixture
+def data_versions(monkeypatch):
+    """다른 프로세스의 적재 흉내 - 돌려준 {테이블: 버전} 을 바꾸면 다음 확인 때 그 테이블이 재적재된 것으로 보인다"""
+    versions = {}
+    monkeypatch.setattr(events, '_read_versions', lambda: dict(versions))
+    monkeypatch.setattr(events, 'DATA_VERSION_CHECK_INTERVAL', 0)
+    monkeypatch.setattr(events, '_seen_versions', None)
+    monkeypatch.setattr(events, '_checked_at', None)
+    events.check_data_versions()
+    return versions
+
+
+@pytest.fixture
+def postgres(data_dir, monkeypatch):
+    """TEST_DB_NAME 데이터베이스에 data/ 사본을 init_db 로 적재하고 PostgreSQL 경로로 돌린다 -> 사본 디렉터리
+    TEST_DB_NAME 이 없으면 건너뛴다"""
+    if not TEST_DB_NAME:
+        pytest.skip("TEST_DB_NAME 이 없어 PostgreSQL 테스트를 건너뜁니다")
+    engine = get_backend()
+    close_pool()
+    monkeypatch.setitem(DB_CONFIG, 'dbname', TEST_DB_NAME)
+    monkeypatch.setattr(events, '_seen_versions', None)
+    monkeypatch.setattr(events, '_checked_at', None)
+    set_backend(None)
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("DROP SCHEMA public CASCADE; CREATE SCHEMA public;")
+            conn.commit()
+        finally:
+            cur.close()
+            conn.close()
+        init_database(data_dir)
+        init_cooking_step_table(data_dir)
+        yield data_dir
+    finally:
+        close_pool()
+        set_backend(engine)
+        # PostgreSQL 로 만든 인덱스/캐시를 버리고 메모리 엔진으로 다시 만든다
+        notify_data_reload()
+
+
+@pytest.fixture(params=['memory', 'postgres'])
+def catalog(request):
+    """같은 동작 테스트를 메모리 엔진과 PostgreSQL 경로에서 모두 돌린다 -> 사본 디렉터리"""
+    return request.getfixturevalue('data_dir' if request.param == 'memory' else 'postgres')
@@ -0,0 +1,78 @@
+# tests/test_allergen_index.py
+from conftest import append_csv, read_csv
+from database.events import notify_data_reload
+from services.allergen_index import ALLERGY_CACHE_SIZE, AllergenIndex, allergen_index
+from services.recipe_service import RecipeService
+
+
+def _ingredient_id(data_dir, name):
+    return next(int(row['ingredientID']) for row in read_csv(data_dir, 'IngredientName.csv') if row['name'] == name)
+
+
+def _safe_ids(data_dir, allergy):
+    """CSV 에서 직접 구한 알레르기 재료(이름에 단어 포함)를 쓰지 않는 레시피 ID"""
+    allergic = {row['ingredientID'] for row in read_csv(data_dir, 'IngredientName.csv') if allergy in row['name']}
+    excluded = {int(row['recipeID']) for row in read_csv(data_dir, 'RecipeIngredientInfo.csv')
+                if row['ingredientID'] in allergic}
+    return {int(row['recipeID']) for row in read_csv(data_dir, 'Recipe.csv')} - excluded
+
+
+def _search_ids(allergy):
+    result = RecipeService.search_recipes_by_allergy(allergy, 1, per_page=1000)
+    return {recipe['recipe_id'] for recipe in result['recipes']}, result['total_count']
+
+
+def test_excludes_recipes_with_allergen(data_dir):
+    ids, total = _search_ids('새우')
+    assert ids == _safe_ids(data_dir, '새우')
+    assert total == len(ids)
+    assert ids < _safe_ids(data_dir, '없는재료')
+
+
+def test_new_recipe_is_excluded_after_reload(data_dir):
+    before, total = _search_ids('두부')
+    tofu = _ingredient_id(data_dir, '두부')
+    egg = _ingredient_id(data_dir, '달걀')
+    append_csv(data_dir, 'Recipe.csv', [(1001, '두부 샐러드'), (1002, '달걀 샐러드')])
+    append_csv(data_dir, 'RecipeIngredientInfo.csv', [(1001, tofu, 100), (1002, egg, 100)])
+    notify_data_reload(['Recipe', 'RecipeIngredient_info'])
+
+    after, after_total = _search_ids('두부')
+    assert after == before | {1002}
+    assert after_total == total + 1
+    assert allergen_index.contains_allergens([1001, 1002], ['두부']).tolist() == [True, False]
+
+
+def test_new_allergen_ingredient_is_excluded_after_reload(data_dir):
+    before, _ = _search_ids('새우')
+    recipe_id = min(before)
+    append_csv(data_dir, 'IngredientName.csv', [(9001, '훈제새우살')])
+    append_csv(data_dir, 'RecipeIngredientInfo.csv', [(recipe_id, 9001, 10)])
+    notify_data_reload(['IngredientName', 'RecipeIngredient_info'])
+
+    after, total = _search_ids('새우')
+    assert after == before - {recipe_id}
+    assert total == len(after)
+
+
+def _small_index():
+    ingredients = [(2, '두부'), (1, '냉동새우'), (3, '간장')]
+    pairs = [(10, 1), (10, 1), (10, 3), (11, 2), (12, 99), (99, 1), (13, 3)]
+    return AllergenIndex(loader=lambda: (ingredients, [13, 11, 10, 12], pairs))
+
+
+def test_postings_skip_unknown_and_duplicate_rows():
+    index = _small_index()
+    assert index.split(['새우']) == ([10], 3)
+    assert index.split(['새우', '두부']) == ([10, 11], 2)
+    assert index.safe_recipe_ids(['간장']) == [11, 12]
+    assert index.split([' ']) == ([], 4)
+    assert index.contains_allergens([10, 11, 99], ['새우']).tolist() == [True, False, False]
+    assert index.recipe_ingredients([10, 11, 12, 99]) == [[1, 3], [2], [], []]
+
+
+def test_allergy_cache_is_bounded():
+    index = _small_index()
+    for i in range(ALLERGY_CACHE_SIZE + 10):
+        index.split([f'재료{i}'])
+    assert len(index._get_snapshot()['excluded']) == ALLERGY_CACHE_SIZE
@@ -0,0 +1,48 @@
+# tests/test_async_service.py
+import asyncio
+from decimal import Decimal
+
+from database import async_db
+from services import async_service
+from services.async_service import AsyncPriceService, AsyncRecipeDetailService, AsyncRecipeService
+from services.price_service import PriceService
+from services.recipe_detail_service import RecipeDetailService
+from services.recipe_service import RecipeService
+
+
+def test_memory_backend_matches_sync_services(data_dir):
+    async def run():
+        return await asyncio.gather(
+            AsyncRecipeService.search_recipes_by_budget(5000, 2, per_page=5),
+            AsyncRecipeService.search_recipes_by_allergy('새우', 1, page=2, per_page=5),
+            AsyncRecipeService.get_all_recipes(3, per_page=5),
+            AsyncPriceService.analyze_price_trend(ingredient_name='두부'),
+            AsyncRecipeDetailService.get_recipe_details_many([2, 1]),
+            AsyncRecipeDetailService.get_recipe_overview(1, '된장국', 2),
+        )
+
+    budget, allergy, all_recipes, trend, details, overview = asyncio.run(run())
+    assert budget == RecipeService.search_recipes_by_budget(5000, 2, per_page=5)
+    assert allergy == RecipeService.search_recipes_by_allergy('새우', 1, page=2, per_page=5)
+    assert all_recipes == RecipeService.get_all_recipes(3, per_page=5)
+    assert trend == PriceService.analyze_price_trend(ingredient_name='두부')
+    assert details == RecipeDetailService.get_recipe_details_many([2, 1])
+    assert overview['prices'] == PriceService.get_recipe_price_by_quarter('된장국', 2)
+
+
+def test_float_budget_is_bound_as_its_repr(data_dir, monkeypatch):
+    # asyncpg 는 float 를 Decimal(float) 로 보낸다 - 3000.1 은 3000.0999... 이라 3000.10 원 비용이 빠진다
+    bound = []
+
+    async def fetch(query, params=()):
+        bound.append(list(params))
+        return []
+
+    monkeypatch.setattr(async_service, 'get_backend', lambda: None)
+    monkeypatch.setattr(async_db, 'fetch', fetch)
+    asyncio.run(AsyncRecipeService.search_recipes_by_budget(3000.1, 2, count_mode='exact'))
+
+    budgets = [value for params in bound for value in params if isinstance(value, (float, Decimal)) and value > 100]
+    assert budgets and all(value == Decimal('3000.1') and isinstance(value, Decimal) for value in budgets)
+    assert Decimal('3000.10') <= budgets[0]
+    assert Decimal(3000.1) < Decimal('3000.10')
@@ -0,0 +1,77 @@
+# tests/test_backend.py
+# 백엔드 선택과 메모리 엔진 - 같은 서비스 호출이 PostgreSQL 경로와 같은 결과를 내는지 확인한다
+import pytest
+
+from conftest import read_csv
+from database import backend, memory_engine, user_db
+from database.backend import set_backend
+from services.price_service import PriceService
+from services.recipe_detail_service import RecipeDetailService
+from services.recipe_service import RecipeService
+
+
+@pytest.fixture
+def unconfigured(monkeypatch):
+    """다음 get_backend() 가 DB_BACKEND 를 다시 읽게 한다 (테스트가 끝나면 원래 백엔드로 돌아간다)"""
+    monkeypatch.setattr(backend, '_backend', None)
+    monkeypatch.setattr(backend, '_configured', False)
+    created = []
+    monkeypatch.setattr(memory_engine, 'MemoryEngine', lambda data_dir=None: created.append(data_dir) or 'engine')
+    return created
+
+
+def test_unknown_backend_is_rejected(unconfigured, monkeypatch):
+    monkeypatch.setenv('DB_BACKEND', 'sqlite')
+    with pytest.raises(ValueError):
+        backend.get_backend()
+
+
+def test_backend_is_chosen_once_from_environment(unconfigured, monkeypatch):
+    monkeypatch.setenv('DB_BACKEND', 'Memory')
+    monkeypatch.setenv('DB_DATA_DIR', '/srv/catalog')
+    assert backend.get_backend() == 'engine'
+    monkeypatch.setenv('DB_BACKEND', 'postgres')
+    assert backend.get_backend() == 'engine'
+    assert unconfigured == ['/srv/catalog']
+
+
+def test_postgres_backend_is_none(unconfigured, monkeypatch):
+    monkeypatch.setenv('DB_BACKEND', 'postgres')
+    assert backend.get_backend() is None
+    assert unconfigured == []
+
+
+def test_users_are_created_once_and_found_by_credentials(catalog, tmp_path):
+    username = f'tester-{tmp_path.name}'
+    user_id = user_db.create_user(username, 'pw', '새우, 우유')
+    assert user_id is not None
+    assert user_db.create_user(username, 'other', None) is None
+    assert user_db.get_user_by_credentials(username, 'pw') == (user_id, username, 'pw', '새우, 우유')
+    assert user_db.get_user_by_credentials(username, 'wrong') is None
+
+
+def _service_calls(data_dir):
+    recipe_name = read_csv(data_dir, 'Recipe.csv')[3]['recipeName']
+    return {
+        'budget': lambda: RecipeService.search_recipes_by_budget(3000, 2, 2, 7),
+        'budget_cursor': lambda: RecipeService.search_recipes_by_budget_cursor(5000, 1, None, 5),
+        'allergy': lambda: RecipeService.search_recipes_by_allergy('새우, 우유', 3, 1, 10),
+        'all': lambda: RecipeService.get_all_recipes(4, 3, 10),
+        'past_last_page': lambda: RecipeService.get_all_recipes(1, 50, 10),
+        'ingredient_prices': lambda: PriceService.get_ingredient_price_by_quarter('두부'),
+        'recipe_prices': lambda: PriceService.get_recipe_price_by_quarter(recipe_name, 2),
+        'ingredient_trend': lambda: PriceService.analyze_price_trend(ingredient_name='두부'),
+        'recipe_trend': lambda: PriceService.analyze_price_trend(recipe_name=recipe_name),
+        'details': lambda: RecipeDetailService.get_recipe_details_many([5, 1, 99999]),
+    }
+
+
+def test_memory_engine_matches_postgres(postgres, engine):
+    calls = _service_calls(postgres)
+    expected = {name: call() for name, call in calls.items()}
+    set_backend(engine)
+    try:
+        RecipeDetailService.invalidate_cache()
+        assert {name: call() for name, call in calls.items()} == expected
+    finally:
+        set_backend(None)
@@ -0,0 +1,65 @@
+# tests/test_bench_services.py
+# 벤치마크 하네스 - 메모리 백엔드로 작은 카탈로그를 한 번 돌려 결과 형식과 통계 계산을 확인한다
+import pytest
+
+from benchmarks import bench_services
+from database import events
+from database.backend import set_backend
+from database.events import notify_data_reload
+from scripts.bulk_load import DATA_DIR
+
+
+@pytest.fixture
+def restore_backend(engine):
+    """run() 이 바꾼 백엔드와 등록한 재적재 콜백을 테스트가 끝나면 되돌린다"""
+    listeners = list(events._listeners)
+    yield
+    events._listeners[:] = listeners
+    set_backend(engine)
+    notify_data_reload()
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 11))
+    assert bench_services.percentile(values, 50) == 5
+    assert bench_services.percentile(values, 95) == 10
+    assert bench_services.percentile(values, 1) == 1
+    assert bench_services.percentile([], 50) is None
+
+
+def test_measure_counts_errors_outside_setup():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) % 2:
+            raise RuntimeError
+
+    stats = bench_services.measure(lambda: None, flaky, iterations=4, warmup=0)
+    assert stats['calls'] == 4 and stats['errors'] == 2
+    assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms'] <= stats['max_ms']
+
+
+def test_memory_run_measures_every_entry_point(tmp_path, restore_backend):
+    report = bench_services.run([1], iterations=3, warmup=1, backend='memory', seed=7, work_dir=str(tmp_path))
+
+    assert report['meta']['backend'] == 'memory' and report['meta']['scales'] == [1]
+    measured = [result for result in report['results'] if result['entry_point']]
+    names = [name for name, _, _ in bench_services.entry_points(bench_services._sample_inputs(DATA_DIR, 7), None)]
+    assert [result['entry_point'] for result in measured] == names
+    assert all(result['calls'] == 3 and result['errors'] == 0 for result in measured)
+
+    summary = next(result for result in report['results'] if result['entry_point'] is None)
+    assert summary['rows']['Recipe.csv'] > 0 and summary['load_seconds'] is not None
+    # 생성한 카탈로그는 배수별로 지운다
+    assert not (tmp_path / 'x1').exists()
+
+
+def test_compare_counts_slower_entry_points():
+    def report(revision, p50, p95):
+        return {'meta': {'revision': revision},
+                'results': [{'scale': 1, 'entry_point': 'a', 'p50_ms': p50, 'p95_ms': p95},
+                            {'scale': 1, 'entry_point': None}]}
+
+    assert bench_services.compare(report('old', 10.0, 20.0), report('new', 10.5, 19.0)) == 0
+    assert bench_services.compare(report('old', 10.0, 20.0), report('new', 12.0, 30.0)) == 2
@@ -0,0 +1,134 @@
+# tests/test_bulk_load.py
+# CSV 대량 적재 - CSV 읽기/변환/COPY 스트림은 DB 없이, 스테이징 교체는 PostgreSQL 에서 확인한다
+import csv
+import io
+
+import psycopg2
+
+from conftest import append_csv, query_db, read_csv, write_csv
+from database.db_connector import DB_CONFIG, get_connection
+from scripts.bulk_load import CsvCopyStream, LOAD_SPECS, bulk_load, key_positions, read_rows, row_hash, row_key
+from scripts.init_db import init_database
+
+
+def _latest(table, data_dir):
+    """키별로 CSV 에서 마지막에 나온 행 (줄 번호 제외)"""
+    positions = key_positions(table)
+    return {row_key(positions, row): row[:-1] for row in read_rows(table, data_dir)}
+
+
+def test_read_rows_converts_values_and_numbers_lines(data_dir):
+    rows = list(read_rows('Recipe', data_dir))
+    first = read_csv(data_dir, 'Recipe.csv')[0]
+    # BOM 이 붙은 헤더도 찾고, 줄 번호는 헤더 다음 줄(2)부터 센다
+    assert rows[0] == (int(first['recipeID']), first['recipeName'], 2)
+    assert [row[-1] for row in rows] == list(range(2, len(rows) + 2))
+
+    prices = list(read_rows('IngredientPrice', data_dir))
+    assert all(isinstance(row[0], int) and isinstance(row[1], int) and isinstance(row[2], float) for row in prices)
+
+
+def test_read_rows_skips_blank_lines_and_keeps_empty_values_as_null(data_dir):
+    append_csv(data_dir, 'Recipe.csv', [()])
+    append_csv(data_dir, 'Recipe.csv', [(5001, ' ')])
+    rows = list(read_rows('Recipe', data_dir))
+    assert rows[-1][:2] == (5001, None)
+    assert rows[-1][-1] == rows[-2][-1] + 2
+
+
+def test_step_rows_skip_blank_steps_and_follow_column_numbers(tmp_path):
+    path = tmp_path / 'CookingMethod.csv'
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, lineterminator='\r\n')
+        # 컬럼 순서가 아니라 번호 순으로 읽고, 6개를 넘는 단계도 받는다
+        writer.writerow(['recipe_ID', 'MANUAL02', 'MANUAL01', 'MANUAL10', 'MANUAL03', 'note'])
+        writer.writerow(['1', '둘째', '첫째', '열째', '', 'x'])
+        writer.writerow(['2', '', '', ''])
+        writer.writerow([])
+        writer.writerow(['3', '', '하나'])
+
+    rows = list(read_rows('cooking_step', str(tmp_path)))
+    assert rows == [(1, 1, '첫째', 2), (1, 2, '둘째', 2), (1, 3, '열째', 2), (3, 1, '하나', 5)]
+
+
+def test_copy_stream_reads_in_any_chunk_size():
+    rows = [(i, f'이름 "{i}", 쉼표', None) for i in range(23)]
+    expected = io.StringIO()
+    csv.writer(expected, lineterminator='\n').writerows(rows)
+
+    whole = CsvCopyStream(rows, chunk_rows=5)
+    assert whole.read() == expected.getvalue()
+    assert whole.row_count == len(rows)
+
+    stream = CsvCopyStream(rows, chunk_rows=4)
+    parts = []
+    while True:
+        part = stream.read(7)
+        if not part:
+            break
+        assert len(part) <= 7
+        parts.append(part)
+    assert ''.join(parts) == expected.getvalue()
+
+
+def test_row_hash_ignores_line_number():
+    assert row_hash((1, '두부', 2)) == row_hash((1, '두부', 40))
+    assert row_hash((1, '두부', 2)) != row_hash((1, '순두부', 2))
+
+
+def test_loaded_tables_match_csv(postgres):
+    for table, spec in LOAD_SPECS.items():
+        columns = [column for _, column, _ in spec['columns']]
+        stored = query_db(f"SELECT {', '.join(columns)} FROM {table}")
+        expected = _latest(table, postgres)
+        assert len(stored) == len(expected), table
+        positions = key_positions(table)
+        assert {row_key(positions, row) for row in stored} == set(expected), table
+
+
+def test_reload_keeps_last_duplicate_and_drops_removed_rows(postgres):
+    recipes = read_csv(postgres, 'Recipe.csv')
+    removed = recipes.pop()
+    write_csv(postgres, 'Recipe.csv', recipes)
+    # 지운 레시피를 참조하는 행도 CSV 에서 뺀다
+    for name, column in (('RecipeIngredientInfo.csv', 'recipeID'), ('RecipeNutrition.csv', 'recipe_ID')):
+        write_csv(postgres, name, [row for row in read_csv(postgres, name) if row[column] != removed['recipeID']])
+    append_csv(postgres, 'Recipe.csv', [(1, '첫 번째 이름'), (1, '마지막 이름')])
+    init_database(postgres)
+
+    assert query_db("SELECT recipeName FROM Recipe WHERE recipeID = 1") == [('마지막 이름',)]
+    assert query_db("SELECT 1 FROM Recipe WHERE recipeID = %s", (int(removed['recipeID']),)) == []
+    assert query_db("SELECT 1 FROM recipe_cost WHERE recipeID = %s", (int(removed['recipeID']),)) == []
+
+
+def test_reloading_same_data_leaves_rows_untouched(postgres):
+    before = query_db("SELECT recipeID, xmin::text FROM Recipe ORDER BY recipeID")
+    init_database(postgres)
+    assert query_db("SELECT recipeID, xmin::text FROM Recipe ORDER BY recipeID") == before
+
+
+def test_readers_see_old_data_while_load_is_open(postgres):
+    recipes = read_csv(postgres, 'Recipe.csv')
+    old_name = recipes[0]['recipeName']
+    recipes[0]['recipeName'] = '새 이름'
+    write_csv(postgres, 'Recipe.csv', recipes)
+
+    conn = get_connection()
+    cur = conn.cursor()
+    reader = psycopg2.connect(**DB_CONFIG)
+    try:
+        bulk_load(cur, ['Recipe'], postgres)
+        reader_cur = reader.cursor()
+        # 적재 트랜잭션이 열려 있어도 읽기는 잠금을 기다리지 않고 이전 데이터를 본다
+        reader_cur.execute("SET lock_timeout = '1s'")
+        reader_cur.execute("SELECT recipeName FROM Recipe WHERE recipeID = %s", (int(recipes[0]['recipeID']),))
+        assert reader_cur.fetchone() == (old_name,)
+        conn.commit()
+        reader.rollback()
+        reader_cur.execute("SELECT recipeName FROM Recipe WHERE recipeID = %s", (int(recipes[0]['recipeID']),))
+        assert reader_cur.fetchone() == ('새 이름',)
+    finally:
+        conn.rollback()
+        cur.close()
+        conn.close()
+        reader.close()
@@ -0,0 +1,149 @@
+# tests/test_db_connector.py
+# 커넥션 풀 - 실제 DB 대신 상태만 흉내 내는 가짜 커넥션으로 대여/반환/대기/검사 동작을 확인한다
+import threading
+import time
+
+import psycopg2
+import pytest
+from psycopg2 import extensions
+
+from database.db_connector import ConnectionPool, PoolExhaustedError
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+        self.commits = 0
+        self.rollbacks = 0
+
+    def get_transaction_status(self):
+        return self.status
+
+    def commit(self):
+        self.commits += 1
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class FakePool(ConnectionPool):
+    def __init__(self, **kwargs):
+        self.created = []
+        super().__init__(dbname='unused', **kwargs)
+
+    def _connect(self):
+        conn = FakeConnection()
+        self.created.append(conn)
+        self.metrics.incr('connections_created')
+        return conn
+
+
+def test_connections_are_reused():
+    pool = FakePool(min_size=1, max_size=3)
+    for _ in range(5):
+        conn = pool.getconn()
+        raw = conn.raw
+        conn.close()
+    assert pool.created == [raw]
+    stats = pool.stats()
+    assert (stats['size'], stats['idle'], stats['checkouts'], stats['releases']) == (1, 1, 5, 5)
+    with pytest.raises(psycopg2.InterfaceError):
+        conn.cursor()
+
+
+def test_exhausted_pool_times_out_then_wakes_waiters():
+    pool = FakePool(min_size=0, max_size=2, timeout=0.1)
+    held = [pool.getconn(), pool.getconn()]
+    with pytest.raises(PoolExhaustedError):
+        pool.getconn()
+    assert pool.stats()['timeouts'] == 1
+
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.getconn(timeout=5)))
+    waiter.start()
+    time.sleep(0.1)
+    held[0].close()
+    waiter.join(5)
+    assert got and got[0].raw is pool.created[0]
+    assert pool.stats()['exhaustion_count'] == 2
+    assert len(pool.created) == 2
+
+
+def test_threads_never_exceed_max_size():
+    pool = FakePool(min_size=0, max_size=3)
+    in_use = []
+    peak = []
+    lock = threading.Lock()
+
+    def work():
+        for _ in range(20):
+            conn = pool.getconn(timeout=5)
+            with lock:
+                in_use.append(conn)
+                peak.append(len(in_use))
+            time.sleep(0.001)
+            with lock:
+                in_use.remove(conn)
+            conn.close()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(peak) <= 3 and len(pool.created) <= 3
+    assert pool.stats()['in_use'] == 0
+
+
+def test_open_transactions_are_rolled_back_on_return():
+    pool = FakePool(min_size=0, max_size=1)
+    conn = pool.getconn()
+    conn.raw.status = extensions.TRANSACTION_STATUS_INTRANS
+    raw = conn.raw
+    conn.close()
+    assert raw.rollbacks == 1
+    assert pool.getconn().raw is raw
+
+
+def test_context_manager_commits_or_rolls_back():
+    pool = FakePool(min_size=0, max_size=1)
+    with pool.connection() as conn:
+        raw = conn.raw
+    assert raw.commits == 1
+    with pytest.raises(RuntimeError):
+        with pool.connection():
+            raise RuntimeError
+    assert raw.rollbacks == 1
+    assert pool.stats()['in_use'] == 0
+
+
+def test_broken_connections_are_replaced():
+    pool = FakePool(min_size=1, max_size=1)
+    broken = pool.created[0]
+    broken.closed = 1
+    conn = pool.getconn()
+    assert conn.raw is not broken
+    assert pool.stats()['health_check_failures'] == 1
+    conn.discard()
+    assert conn.closed and pool.stats()['size'] == 0
+
+
+def test_idle_connections_are_reaped_down_to_min_size():
+    pool = FakePool(min_size=1, max_size=3, idle_timeout=0.05)
+    conns = [pool.getconn() for _ in range(3)]
+    for conn in conns:
+        conn.close()
+    time.sleep(0.1)
+    pool.getconn().close()
+    assert pool.stats()['size'] == 1
+    assert sum(conn.closed for conn in pool.created) == 2
+
+    pool.closeall()
+    with pytest.raises(psycopg2.InterfaceError):
+        pool.getconn()
@@ -0,0 +1,79 @@
+# tests/test_generate_data.py
+import filecmp
+import os
+
+import pytest
+
+from conftest import read_csv
+from database.events import notify_data_reload
+from scripts.bulk_load import DATA_DIR, read_rows
+from scripts.generate_data import generate
+from services.recipe_detail_service import RecipeDetailService
+
+
+@pytest.fixture
+def generated(tmp_path, engine):
+    """작은 합성 카탈로그를 만들어 메모리 엔진에 올린다 -> 디렉터리"""
+    out_dir = str(tmp_path / 'generated')
+    generate(out_dir, recipes=1500, ingredients=400, seed=5)
+    engine.data_dir = out_dir
+    notify_data_reload()
+    return out_dir
+
+
+def _step_texts(row):
+    columns = sorted((column for column in row if column.startswith('MANUAL')), key=lambda column: int(column[6:]))
+    return [row[column] for column in columns if row[column]]
+
+
+def test_step_header_covers_the_longest_recipe(generated):
+    rows = read_csv(generated, 'CookingMethod.csv')
+    longest = max(len(_step_texts(row)) for row in rows)
+    assert longest > 6
+    assert list(rows[0]) == ['recipe_ID'] + [f'MANUAL{i:02d}' for i in range(1, longest + 1)]
+
+    step_rows = list(read_rows('cooking_step', generated))
+    assert len(step_rows) == sum(len(_step_texts(row)) for row in rows)
+
+
+def test_long_step_lists_are_served_in_order(generated):
+    row = max(read_csv(generated, 'CookingMethod.csv'), key=lambda row: len(_step_texts(row)))
+    details = RecipeDetailService.get_recipe_details(int(row['recipe_ID']))
+    assert details['cooking_steps'] == _step_texts(row)
+    assert [int(step.split('.')[0]) for step in details['cooking_steps']] == list(range(1, len(details['cooking_steps']) + 1))
+
+
+def test_counts_and_ids_follow_requested_size(generated):
+    counts = {name: len(read_csv(generated, name)) for name in os.listdir(generated)}
+    assert counts['Recipe.csv'] == counts['RecipeNutrition.csv'] == counts['CookingMethod.csv'] == 1500
+    assert counts['IngredientName.csv'] == counts['IngredientSubstitute.csv'] == 400
+    assert [int(row['recipeID']) for row in read_csv(generated, 'Recipe.csv')] == list(range(1, 1501))
+
+
+def test_references_point_at_generated_rows(generated):
+    ingredient_ids = {int(row['ingredientID']) for row in read_csv(generated, 'IngredientName.csv')}
+    pairs = [(int(row['recipeID']), int(row['ingredientID'])) for row in read_csv(generated, 'RecipeIngredientInfo.csv')]
+    assert {ingredient_id for _, ingredient_id in pairs} <= ingredient_ids
+    assert len(set(pairs)) == len(pairs)
+    assert {recipe_id for recipe_id, _ in pairs} == set(range(1, 1501))
+
+    prices = read_csv(generated, 'IngredientPrice.csv')
+    assert {int(row['ingredientID']) for row in prices} <= ingredient_ids
+    assert all(1 <= int(row['quarter']) <= 4 and float(row['price']) > 0 for row in prices)
+
+
+def test_same_seed_writes_same_files(tmp_path):
+    first, second, other = (str(tmp_path / name) for name in ('first', 'second', 'other'))
+    counts = generate(first, recipes=200, ingredients=100, seed=9)
+    assert generate(second, recipes=200, ingredients=100, seed=9) == counts
+    names = sorted(os.listdir(first))
+    assert filecmp.cmpfiles(first, second, names, shallow=False)[0] == names
+
+    generate(other, recipes=200, ingredients=100, seed=10)
+    assert not filecmp.cmp(os.path.join(first, 'Recipe.csv'), os.path.join(other, 'Recipe.csv'), shallow=False)
+
+
+def test_scale_multiplies_source_rows(tmp_path):
+    counts = generate(str(tmp_path / 'x2'), scale=2, seed=1)
+    assert counts['Recipe.csv'] == 2 * len(read_csv(DATA_DIR, 'RecipeNutrition.csv'))
+    assert counts['IngredientName.csv'] == 2 * len(read_csv(DATA_DIR, 'IngredientName.csv'))
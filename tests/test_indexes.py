@@ -0,0 +1,56 @@
+# tests/test_indexes.py
+# 서비스 쿼리용 인덱스 - 계획 트리 해석은 DB 없이, 실제 계획의 인덱스 사용은 PostgreSQL 에서 확인한다
+from conftest import query_db
+from database.db_connector import get_connection
+from database.statements import to_server_params
+from scripts.init_db import _plan_indexes, index_checks, init_database, verify_indexes
+
+SERVICE_INDEXES = ['idx_ingredient_price_quarter', 'idx_ingredient_name', 'idx_ingredient_name_lower',
+                   'idx_recipe_ingredient_ingredient', 'idx_recipe_cost_quarter_cost']
+
+
+def _drop_index(name):
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(f"DROP INDEX {name};")
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+
+
+def test_plan_indexes_walks_nested_plans():
+    plan = {'Node Type': 'Nested Loop', 'Plans': [
+        {'Node Type': 'Index Scan', 'Index Name': 'a'},
+        {'Node Type': 'Hash', 'Plans': [{'Node Type': 'Bitmap Index Scan', 'Index Name': 'b'},
+                                        {'Node Type': 'Seq Scan'}]},
+    ]}
+    assert _plan_indexes(plan) == {'a', 'b'}
+    assert _plan_indexes({'Node Type': 'Seq Scan'}) == set()
+
+
+def test_index_checks_bind_every_placeholder():
+    checks = index_checks(trigram=True)
+    assert len(checks) == len(index_checks()) + 1
+    for name, query, params, expected in checks:
+        assert expected, name
+        assert to_server_params(query)[1] == len(params), name
+
+
+def test_service_queries_use_their_indexes(postgres):
+    assert verify_indexes() == []
+
+
+def test_missing_index_is_reported(postgres):
+    _drop_index('idx_ingredient_price_quarter')
+    failures = verify_indexes()
+    assert [failure['query'] for failure in failures] == ['refresh_recipe_cost (분기별 가격)']
+    assert failures[0]['missing'] == ['idx_ingredient_price_quarter']
+
+
+def test_service_indexes_survive_reload(postgres):
+    init_database(postgres)
+    names = {row[0] for row in query_db("SELECT relname FROM pg_class WHERE relkind = 'i' AND relname = ANY(%s)",
+                                        (SERVICE_INDEXES,))}
+    assert names == set(SERVICE_INDEXES)
@@ -0,0 +1,40 @@
+# tests/test_instrumentation.py
+from database.instrumentation import InstrumentedCursor, QueryRecorder, normalize
+from database.user_db import USER_BY_CREDENTIALS_QUERY
+
+
+def test_stats_per_query_and_caller():
+    recorder = QueryRecorder(slow_query_ms=50, enabled=True)
+    for elapsed_ms in (1, 2, 3, 80):
+        recorder.record('RecipeService.search', 'SELECT 1', (1,), elapsed_ms, 10)
+    recorder.record('RecipeService.search', 'SELECT 2', None, 5, 0, failed=True)
+    recorder.record('PriceService.trend', 'SELECT 3', None, 40, 3)
+
+    first = next(item for item in recorder.stats() if item['query'] == 'SELECT 1')
+    assert (first['calls'], first['rows'], first['total_ms'], first['max_ms']) == (4, 40, 86, 80)
+    assert first['p50_ms'] == 2.5 and first['p99_ms'] == 80
+    callers = recorder.by_caller()
+    assert [item['caller'] for item in callers] == ['RecipeService.search', 'PriceService.trend']
+    assert callers[0]['errors'] == 1
+    assert [entry['query'] for entry in recorder.slow_queries()] == ['SELECT 1']
+
+    recorder.reset()
+    assert recorder.stats() == [] and recorder.slow_queries() == []
+
+
+def test_slow_log_keeps_parameter_types_only():
+    recorder = QueryRecorder(slow_query_ms=0, enabled=True)
+    query = normalize(USER_BY_CREDENTIALS_QUERY)
+    recorder.record('user_db.get_user_by_credentials', query, ('alice', 's3cret-password'), 1, 1)
+    recorder.record('RecipeService.search', 'SELECT %(a)s', {'a': 1.5}, 1, 1)
+
+    entries = recorder.slow_queries()
+    assert entries[0]['params'] == ['str', 'str']
+    assert entries[1]['params'] == {'a': 'float'}
+    assert 's3cret' not in repr(entries) and 's3cret' not in recorder.report()
+
+
+def test_users_queries_are_not_explained():
+    # 실행 계획에는 비밀번호 조건이 값 그대로 찍힌다 - 커넥션을 쓰기 전에 건너뛰어야 한다
+    assert InstrumentedCursor._explain(object(), USER_BY_CREDENTIALS_QUERY, ('alice', 'pw')) is None
+    assert InstrumentedCursor._explain(object(), 'UPDATE recipe SET recipename = %s', ('x',)) is None
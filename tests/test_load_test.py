@@ -0,0 +1,87 @@
+# tests/test_load_test.py
+# 기록 재생 부하 테스트 - 합성 기록을 메모리 백엔드에 재생해 집계와 도착률 제어를 확인한다
+import json
+
+import pytest
+
+from benchmarks.load_test import DEFAULT_MIX, read_trace, replay, synthesize
+
+
+def _write(path, lines):
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return str(path)
+
+
+def test_synthesized_trace_starts_with_registration(data_dir, tmp_path):
+    path = str(tmp_path / 'trace.jsonl')
+    assert synthesize(path, count=300, rate=50, data_dir=data_dir, seed=3) == 300
+    entries = read_trace(path)
+
+    assert len(entries) == 300
+    assert entries[0]['op'] == 'UserService.register_user'
+    assert {entry['op'] for entry in entries[1:]} <= set(DEFAULT_MIX)
+    assert [entry['t'] for entry in entries] == sorted(entry['t'] for entry in entries)
+    # 다음 페이지 연산은 같은 인자에 page 만 하나 늘린다
+    for previous, entry in zip(entries, entries[1:]):
+        if entry['args'].get('page', 1) > 1:
+            assert entry['op'] == previous['op']
+            assert entry['args'] == dict(previous['args'], page=previous['args']['page'] + 1)
+
+
+def test_synthesize_is_deterministic_and_rate_zero_sends_at_once(data_dir, tmp_path):
+    first, second = str(tmp_path / 'a.jsonl'), str(tmp_path / 'b.jsonl')
+    synthesize(first, count=50, rate=0, data_dir=data_dir, seed=8)
+    synthesize(second, count=50, rate=0, data_dir=data_dir, seed=8)
+    assert read_trace(first) == read_trace(second)
+    assert {entry['t'] for entry in read_trace(first)} == {0.0}
+
+
+def test_read_trace_skips_comments_and_reports_bad_lines(tmp_path):
+    entry = json.dumps({'t': 0.5, 'op': 'UserService.login', 'args': {'username': 'a', 'password': 'b'}})
+    path = _write(tmp_path / 'trace.jsonl', ['# 주석', '', entry, json.dumps({'op': 'x'}), entry])
+    assert read_trace(path, limit=2) == [
+        {'t': 0.5, 'op': 'UserService.login', 'args': {'username': 'a', 'password': 'b'}},
+        {'t': 0.0, 'op': 'x', 'args': {}},
+    ]
+
+    bad = _write(tmp_path / 'bad.jsonl', [entry, '{"t": 1}'])
+    with pytest.raises(ValueError, match='bad.jsonl:2'):
+        read_trace(bad)
+
+
+def test_replay_reports_every_operation(data_dir, tmp_path):
+    path = str(tmp_path / 'trace.jsonl')
+    synthesize(path, count=200, rate=0, data_dir=data_dir, seed=4)
+    entries = read_trace(path)
+
+    report = replay(entries, concurrency=4, speed=0, warmup=1)
+    assert report['total']['calls'] == 199
+    assert report['total']['errors'] == 0, report['error_samples']
+    ops = {entry['op'] for entry in entries[1:]}
+    assert set(report['operations']) == ops
+    assert sum(stats['calls'] for stats in report['operations'].values()) == 199
+    # 지연 시간은 예정 시각부터 재므로 호출 시간보다 짧을 수 없다
+    for stats in report['operations'].values():
+        assert all(stats[f'service_p{pct}_ms'] <= stats[f'p{pct}_ms'] for pct in (50, 95, 99))
+
+
+def test_replay_counts_failed_calls(data_dir):
+    entries = [{'t': 0.0, 'op': 'RecipeDetailService.get_recipe_details', 'args': {'recipe_id': 1}},
+               {'t': 0.0, 'op': 'RecipeDetailService.get_recipe_details', 'args': {'bogus': 1}}]
+    report = replay(entries, concurrency=2, speed=0)
+    stats = report['operations']['RecipeDetailService.get_recipe_details']
+    assert (stats['calls'], stats['errors'], stats['error_rate']) == (2, 1, 0.5)
+    assert 'TypeError' in report['error_samples']['RecipeDetailService.get_recipe_details']
+
+
+def test_replay_rejects_unknown_operations():
+    with pytest.raises(ValueError, match='Nope.op'):
+        replay([{'t': 0.0, 'op': 'Nope.op', 'args': {}}])
+
+
+def test_fixed_rate_spaces_arrivals(data_dir):
+    entries = [{'t': 0.0, 'op': 'RecipeDetailService.get_recipe_details', 'args': {'recipe_id': 1}}] * 11
+    report = replay(entries, concurrency=2, rate=100)
+    # 11 번째 연산은 시작 후 0.1초에 예정된다
+    assert report['total']['elapsed_seconds'] >= 0.1
+    assert report['total']['calls'] == 11
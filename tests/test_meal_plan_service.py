@@ -0,0 +1,105 @@
+# tests/test_meal_plan_service.py
+import random
+from itertools import combinations
+
+import pytest
+
+from conftest import quarter_costs, read_csv
+from services.allergen_index import allergen_index
+from services.meal_plan_service import MealPlanService, solve
+
+
+def _objective(scores, bits, picks, variety_weight):
+    """점수 합 - variety_weight × 겹친 재료 수 (겹친 수 = 재료 수 합 - 합집합 크기, 고른 순서와 무관)"""
+    union = 0
+    for pick in picks:
+        union |= bits[pick]
+    overlap = sum(bits[pick].bit_count() for pick in picks) - union.bit_count()
+    return sum(scores[pick] for pick in picks) - variety_weight * overlap
+
+
+def _brute_force(scores, costs, calories, bits, meals, budget, max_calories, variety_weight):
+    best = None
+    for picks in combinations(range(len(scores)), meals):
+        if sum(costs[pick] for pick in picks) > budget:
+            continue
+        if max_calories is not None and sum(calories[pick] for pick in picks) > max_calories:
+            continue
+        value = _objective(scores, bits, picks, variety_weight)
+        if best is None or value > best:
+            best = value
+    return best
+
+
+def test_solve_matches_brute_force():
+    rng = random.Random(3)
+    for _ in range(200):
+        n = rng.randint(3, 11)
+        meals = rng.randint(1, min(4, n))
+        scores = sorted((rng.randint(0, 40) for _ in range(n)), reverse=True)
+        costs = [rng.randint(100, 1000) for _ in range(n)]
+        calories = [float(rng.randint(100, 900)) for _ in range(n)]
+        bits = [rng.getrandbits(8) for _ in range(n)]
+        budget = rng.randint(300, 400 * meals)
+        max_calories = rng.choice([None, 500.0 * meals])
+        variety_weight = rng.choice([0.0, 2.0, 10.0])
+
+        picks, value, complete, _ = solve(scores, costs, calories, bits, meals, budget, max_calories,
+                                          variety_weight, time_limit=None)
+        expected = _brute_force(scores, costs, calories, bits, meals, budget, max_calories, variety_weight)
+        assert complete
+        if expected is None:
+            assert picks is None
+            continue
+        assert value == pytest.approx(expected)
+        assert len(set(picks)) == meals
+        assert sum(costs[pick] for pick in picks) <= budget
+        assert _objective(scores, bits, picks, variety_weight) == pytest.approx(value)
+
+
+def test_negative_variety_weight_is_rejected():
+    with pytest.raises(ValueError):
+        solve([1.0], [1], [1.0], [0], 1, 10, variety_weight=-1)
+    with pytest.raises(ValueError):
+        MealPlanService.plan_meals(10000, 2, variety_weight=-1)
+
+
+def test_plan_is_optimal_on_catalog(data_dir):
+    budget, meals, max_calories = 6000, 3, 1500
+    costs = quarter_costs(data_dir, 2)
+    protein = {int(row['recipe_ID']): float(row['protein'] or 0) for row in read_csv(data_dir, 'RecipeNutrition.csv')}
+    calories = {int(row['recipe_ID']): float(row['calories'] or 0) for row in read_csv(data_dir, 'RecipeNutrition.csv')}
+    ingredients = {}
+    for row in read_csv(data_dir, 'RecipeIngredientInfo.csv'):
+        ingredients.setdefault(int(row['recipeID']), set()).add(int(row['ingredientID']))
+    excluded = set(allergen_index.excluded_recipe_ids(['새우']))
+    candidates = sorted(recipe_id for recipe_id, cost in costs.items()
+                        if cost <= budget and calories.get(recipe_id, max_calories + 1) <= max_calories
+                        and recipe_id not in excluded)
+    assert len(candidates) > 20
+
+    def value(picks):
+        sets = [ingredients[recipe_id] for recipe_id in picks]
+        overlap = sum(len(s) for s in sets) - len(set().union(*sets))
+        return sum(protein.get(recipe_id, 0) for recipe_id in picks) - 2.0 * overlap
+
+    expected = max(value(picks) for picks in combinations(candidates, meals)
+                   if sum(costs[recipe_id] for recipe_id in picks) <= budget
+                   and sum(calories[recipe_id] for recipe_id in picks) <= max_calories)
+
+    plan = MealPlanService.plan_meals(budget, 2, meals=meals, max_calories=max_calories, allergy='새우',
+                                      time_limit=None)
+    chosen = [meal['recipe_id'] for meal in plan['meals']]
+    assert plan['feasible'] and plan['optimal']
+    assert plan['score'] == pytest.approx(expected)
+    assert value(chosen) == pytest.approx(expected)
+    assert not set(chosen) & excluded
+    assert plan['total_price'] <= budget
+    assert plan['total_nutrition']['calories'] <= max_calories
+
+
+def test_infeasible_plan(data_dir):
+    plan = MealPlanService.plan_meals(100, 2, meals=3)
+    assert not plan['feasible']
+    assert plan['meals'] == []
+    assert not MealPlanService.plan_meals(10000, 9)['feasible']
@@ -0,0 +1,140 @@
+# tests/test_nutrition_search_service.py
+import random
+
+import pytest
+
+from conftest import quarter_costs, read_csv, write_csv
+from database.events import notify_data_reload
+from services.allergen_index import allergen_index
+from services.meal_plan_service import NUTRIENTS
+from services.nutrition_search_service import METRICS, NutritionSearchService
+
+
+class Catalog:
+    """CSV 에서 직접 계산한 지표 값 (검색 결과 비교용)"""
+
+    def __init__(self, data_dir):
+        self.recipe_ids = sorted(int(row['recipeID']) for row in read_csv(data_dir, 'Recipe.csv'))
+        self.nutrition = {int(row['recipe_ID']): [float(row[nutrient]) if row[nutrient] else None
+                                                  for nutrient in NUTRIENTS]
+                          for row in read_csv(data_dir, 'RecipeNutrition.csv')}
+        self.costs = {quarter: {recipe_id: float(cost) for recipe_id, cost in quarter_costs(data_dir, quarter).items()}
+                      for quarter in (1, 2, 3, 4)}
+
+    def metric(self, recipe_id, metric, quarter):
+        values = self.nutrition.get(recipe_id, [None] * len(NUTRIENTS))
+        if metric in NUTRIENTS:
+            return values[NUTRIENTS.index(metric)]
+        cost = self.costs[quarter].get(recipe_id) if quarter else None
+        if metric == 'price':
+            return cost
+        nutrient, per = metric.rsplit('_per_', 1)
+        value = values[NUTRIENTS.index(nutrient)]
+        denominator = cost if per == '100won' else values[0]
+        if value is None or denominator is None or denominator <= 0:
+            return None
+        return value / denominator * 100
+
+    def search(self, filters, sort=None, order='desc', quarter=None, excluded=()):
+        """조건을 모두 만족하는 레시피 ID (sort 지표순, 같으면 ID 순)"""
+        matched = []
+        for recipe_id in self.recipe_ids:
+            if recipe_id in excluded:
+                continue
+            values = {metric: self.metric(recipe_id, metric, quarter) for metric in list(filters) + [sort] if metric}
+            if any(value is None for value in values.values()):
+                continue
+            if all((low is None or values[metric] >= low - 1e-9) and (high is None or values[metric] <= high + 1e-9)
+                   for metric, (low, high) in filters.items()):
+                matched.append(recipe_id)
+        if sort:
+            sign = -1 if order == 'desc' else 1
+            matched.sort(key=lambda recipe_id: sign * self.metric(recipe_id, sort, quarter))
+        return matched
+
+
+def _ids(result):
+    return [recipe['recipe_id'] for recipe in result['recipes']]
+
+
+def test_nutrient_ranges(data_dir):
+    catalog = Catalog(data_dir)
+    filters = {'protein': (10, 25), 'calories': (None, 400)}
+    result = NutritionSearchService.search_by_nutrition(filters, per_page=1000)
+    expected = catalog.search(filters)
+    assert expected
+    assert _ids(result) == expected
+    assert result['total_count'] == len(expected)
+    for recipe in result['recipes']:
+        assert 10 <= recipe['nutrition']['protein'] <= 25
+        assert recipe['nutrition']['calories'] <= 400
+
+
+def test_ratio_metric_sort(data_dir):
+    catalog = Catalog(data_dir)
+    filters = {'protein_per_100won': (0.5, None)}
+    result = NutritionSearchService.search_by_nutrition(filters, sort='protein_per_100won', quarter=2, per_page=1000)
+    assert _ids(result) == catalog.search(filters, 'protein_per_100won', 'desc', 2)
+    for recipe in result['recipes']:
+        assert recipe['metrics']['protein_per_100won'] == \
+            pytest.approx(catalog.metric(recipe['recipe_id'], 'protein_per_100won', 2), abs=1e-4)
+        assert recipe['total_price'] == catalog.costs[2][recipe['recipe_id']]
+
+    ascending = NutritionSearchService.search_by_nutrition(sort='fat_per_100kcal', order='asc', per_page=1000)
+    assert _ids(ascending) == catalog.search({}, 'fat_per_100kcal', 'asc')
+
+
+def test_budget_and_allergy(data_dir):
+    catalog = Catalog(data_dir)
+    result = NutritionSearchService.search_by_nutrition({'price': (1000, None)}, sort='price', order='asc', quarter=3,
+                                                        budget=4000, allergy='두부', per_page=1000)
+    excluded = set(allergen_index.excluded_recipe_ids(['두부']))
+    assert excluded
+    assert _ids(result) == catalog.search({'price': (1000, 4000)}, 'price', 'asc', 3, excluded)
+
+
+def test_matches_brute_force(data_dir):
+    catalog = Catalog(data_dir)
+    rng = random.Random(7)
+    for _ in range(100):
+        quarter = rng.choice([1, 2, 3, 4])
+        filters = {}
+        for metric in rng.sample(sorted(METRICS), rng.randint(0, 3)):
+            values = sorted(value for value in (catalog.metric(recipe_id, metric, quarter)
+                                                for recipe_id in catalog.recipe_ids) if value is not None)
+            filters[metric] = (rng.choice(values + [None]), rng.choice(values + [None]))
+        sort = rng.choice([None] + sorted(METRICS))
+        order = rng.choice(['asc', 'desc'])
+        result = NutritionSearchService.search_by_nutrition(filters, sort, order, quarter, per_page=1000)
+        expected = catalog.search(filters, sort, order, quarter)
+        assert _ids(result) == expected, (filters, sort, order, quarter)
+
+
+def test_paging(data_dir):
+    full = _ids(NutritionSearchService.search_by_nutrition(sort='protein', per_page=1000))
+    pages = [NutritionSearchService.search_by_nutrition(sort='protein', page=page, per_page=8)
+             for page in range(1, (len(full) + 7) // 8 + 1)]
+    assert [recipe_id for page in pages for recipe_id in _ids(page)] == full
+    assert [page['has_more'] for page in pages] == [True] * (len(pages) - 1) + [False]
+
+
+def test_invalid_requests(data_dir):
+    with pytest.raises(ValueError):
+        NutritionSearchService.search_by_nutrition({'sodium': (0, 1)})
+    with pytest.raises(ValueError):
+        NutritionSearchService.search_by_nutrition(sort='price')
+    with pytest.raises(ValueError):
+        NutritionSearchService.search_by_nutrition(order='up')
+    assert NutritionSearchService.search_by_nutrition(sort='price', quarter=9)['total_count'] == 0
+
+
+def test_nutrition_reload(data_dir):
+    recipe_id = Catalog(data_dir).recipe_ids[0]
+    assert recipe_id not in _ids(NutritionSearchService.search_by_nutrition({'protein': (500, None)}))
+    rows = read_csv(data_dir, 'RecipeNutrition.csv')
+    for row in rows:
+        if int(row['recipe_ID']) == recipe_id:
+            row['protein'] = '600'
+    write_csv(data_dir, 'RecipeNutrition.csv', rows)
+    notify_data_reload(['recipe_nutrition'])
+    assert _ids(NutritionSearchService.search_by_nutrition({'protein': (500, None)})) == [recipe_id]
@@ -0,0 +1,84 @@
+# tests/test_price_service.py
+from decimal import Decimal
+
+import pytest
+
+from conftest import append_csv, quarter_costs, read_csv, write_csv
+from database.events import notify_data_reload
+from services import price_service
+from services.price_service import PriceService
+
+TOFU = 14
+
+
+def _tofu_prices(data_dir):
+    return {int(row['quarter']): Decimal(row['price'])
+            for row in read_csv(data_dir, 'IngredientPrice.csv') if int(row['ingredientID']) == TOFU}
+
+
+def _set_tofu_price(data_dir, quarter, price):
+    rows = read_csv(data_dir, 'IngredientPrice.csv')
+    for row in rows:
+        if int(row['ingredientID']) == TOFU and int(row['quarter']) == quarter:
+            row['price'] = price
+    write_csv(data_dir, 'IngredientPrice.csv', rows)
+    notify_data_reload(['IngredientPrice'])
+
+
+def test_all_recipe_costs_match_csv(data_dir):
+    for quarter in (1, 2, 3, 4):
+        costs = {row['recipe_id']: row['total_price'] for row in PriceService.get_all_recipe_costs(quarter)}
+        assert costs == {recipe_id: float(cost) for recipe_id, cost in quarter_costs(data_dir, quarter).items()}
+    rows = PriceService.get_all_recipe_costs()
+    assert [(row['recipe_id'], row['quarter']) for row in rows] == sorted((row['recipe_id'], row['quarter']) for row in rows)
+
+
+def test_trend_starts_at_zero_and_follows_previous_quarter(data_dir):
+    prices = _tofu_prices(data_dir)
+    trend = PriceService.analyze_price_trend(ingredient_name='두부')
+    assert [row['quarter'] for row in trend] == sorted(prices)
+    assert trend[0]['price_change_percent'] == 0
+    for previous, row in zip(trend, trend[1:]):
+        expected = (prices[row['quarter']] - prices[previous['quarter']]) / prices[previous['quarter']] * 100
+        assert row['price_change_percent'] == pytest.approx(float(expected))
+
+
+def test_matrix_changes_match_recipe_trends(data_dir):
+    changes = {}
+    for row in PriceService.get_all_price_changes():
+        changes.setdefault(row['recipe_id'], []).append(row)
+    for recipe in read_csv(data_dir, 'Recipe.csv')[:20]:
+        trend = PriceService.analyze_price_trend(recipe_name=recipe['recipeName'])
+        matrix = changes.get(int(recipe['recipeID']), [])
+        assert [row['quarter'] for row in matrix] == [row['quarter'] for row in trend]
+        assert [row['price_change_percent'] for row in matrix] == \
+            pytest.approx([row['price_change_percent'] for row in trend])
+
+
+def test_change_after_a_zero_price_is_none(data_dir):
+    # 두부만 쓰는 레시피 - 1분기 두부 가격이 0 이면 2분기 변동률은 정할 수 없다 (inf/nan 대신 None)
+    append_csv(data_dir, 'Recipe.csv', [(1001, '두부만')])
+    append_csv(data_dir, 'RecipeIngredientInfo.csv', [(1001, TOFU, 100)])
+    notify_data_reload(['Recipe', 'RecipeIngredient_info'])
+    _set_tofu_price(data_dir, 1, '0')
+
+    for trend in (PriceService.analyze_price_trend(ingredient_name='두부'),
+                  PriceService.analyze_price_trend(recipe_name='두부만'),
+                  [row for row in PriceService.get_all_price_changes() if row['recipe_id'] == 1001]):
+        assert [row['quarter'] for row in trend[:2]] == [1, 2]
+        assert trend[0]['price'] == 0
+        assert trend[0]['price_change_percent'] == 0
+        assert trend[1]['price_change_percent'] is None
+        assert all(row['price_change_percent'] is not None for row in trend[2:])
+
+
+def test_trend_without_a_name_is_empty(data_dir, monkeypatch):
+    assert PriceService.analyze_price_trend() == []
+
+    def no_connection():
+        raise AssertionError("이름이 없으면 DB 에 묻지 않아야 합니다")
+
+    monkeypatch.setattr(price_service, 'get_backend', lambda: None)
+    monkeypatch.setattr(price_service, 'get_connection', no_connection)
+    assert PriceService.analyze_price_trend() == []
+    assert PriceService.analyze_price_trend(ingredient_name='', recipe_name=None) == []
@@ -0,0 +1,122 @@
+# tests/test_recipe_cost.py
+# recipe_cost (분기별 비용/상세 문자열) - 초기 적재, 트리거 증분 갱신이 전체 재계산/메모리 엔진과 같은지
+from decimal import Decimal
+
+import pytest
+
+from conftest import query_db, quarter_costs, read_csv, reload_data, write_csv
+from database.db_connector import get_connection
+from services.recipe_service import RecipeService
+
+TOFU = 14
+
+
+def _recipe_costs(quarter):
+    """서비스로 읽은 분기 비용 {레시피 ID: (총 비용, 상세 문자열)} - 비용이 없는 레시피는 빠진다"""
+    page = RecipeService.get_all_recipes(quarter, 1, 10000)
+    return {recipe['recipe_id']: (recipe['total_price'], recipe['ingredients_detail'])
+            for recipe in page['recipes'] if recipe['ingredients_detail'] != '재료 정보 없음'}
+
+
+def _stored_costs():
+    return {(recipe_id, quarter): (total, detail)
+            for recipe_id, quarter, total, detail in query_db(
+                "SELECT recipeID, quarter, total_cost, ingredients_detail FROM recipe_cost")}
+
+
+def _execute(*queries):
+    """PostgreSQL 에 직접 쓰고 커밋 (트리거가 recipe_cost 를 갱신한다)"""
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        for query, params in queries:
+            cur.execute(query, params)
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+
+
+def _full_rebuild():
+    """전체 재계산 결과 - 비교가 끝나면 되돌린다"""
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT refresh_recipe_cost(NULL, NULL);")
+        cur.execute("SELECT recipeID, quarter, total_cost, ingredients_detail FROM recipe_cost")
+        return {(recipe_id, quarter): (total, detail) for recipe_id, quarter, total, detail in cur.fetchall()}
+    finally:
+        cur.close()
+        conn.rollback()
+        conn.close()
+
+
+def test_unpriced_ingredient_is_listed_at_zero_in_id_order(catalog):
+    # 1번 레시피 첫 재료의 1분기 가격을 지우면 비용 행은 남고 그 재료는 0원으로 제자리에 남는다
+    items = [row for row in read_csv(catalog, 'RecipeIngredientInfo.csv') if row['recipeID'] == '1']
+    first = min(items, key=lambda row: int(row['ingredientID']))['ingredientID']
+    prices = read_csv(catalog, 'IngredientPrice.csv')
+    write_csv(catalog, 'IngredientPrice.csv',
+              [row for row in prices if not (row['ingredientID'] == first and row['quarter'] == '1')])
+    reload_data(catalog)
+
+    total, detail = _recipe_costs(1)[1]
+    lines = detail.split('\n   ')
+    names = {row['ingredientID']: row['name'] for row in read_csv(catalog, 'IngredientName.csv')}
+    expected_order = [names[row['ingredientID']]
+                      for row in sorted(items, key=lambda row: int(row['ingredientID']))]
+    assert [line.rsplit(' (', 1)[0] for line in lines] == expected_order
+    assert lines[0].endswith('× 0원/g = 0.00원)')
+    assert total == float(quarter_costs(catalog, 1)[1])
+
+
+def test_loaded_costs_match_memory_engine(postgres, engine):
+    stored = _stored_costs()
+    for quarter in (1, 2, 3, 4):
+        rows, _ = engine.all_rows(quarter, 10000)
+        expected = {(recipe_id, quarter): (total, detail)
+                    for recipe_id, _, total, detail, _ in rows if total is not None}
+        assert {key: value for key, value in stored.items() if key[1] == quarter} == expected
+
+
+def test_price_change_refreshes_only_that_quarter(postgres):
+    before = _stored_costs()
+    _execute(("UPDATE IngredientPrice SET price = price + 1 WHERE ingredientID = %s AND quarter = 2", (TOFU,)))
+    after = _stored_costs()
+
+    tofu_recipes = {int(row['recipeID']) for row in read_csv(postgres, 'RecipeIngredientInfo.csv')
+                    if int(row['ingredientID']) == TOFU}
+    changed = {key for key in after if after[key] != before.get(key)}
+    assert changed and {recipe_id for recipe_id, _ in changed} <= tofu_recipes
+    assert {quarter for _, quarter in changed} == {2}
+    assert after == _full_rebuild()
+
+
+@pytest.mark.parametrize('queries', [
+    [("INSERT INTO RecipeIngredient_info (recipeID, ingredientID, amount) VALUES (1, %s, 12.5)", (TOFU,))],
+    [("UPDATE RecipeIngredient_info SET amount = amount * 2 WHERE recipeID = 1", None)],
+    [("DELETE FROM RecipeIngredient_info WHERE recipeID = 2", None)],
+    [("DELETE FROM IngredientPrice WHERE quarter = 3", None)],
+    [("INSERT INTO IngredientPrice (ingredientID, quarter, price) VALUES (%s, 4, 1) "
+      "ON CONFLICT (ingredientID, quarter) DO UPDATE SET price = 1", (TOFU,)),
+     ("UPDATE IngredientName SET name = name || '(국산)' WHERE ingredientID = %s", (TOFU,))],
+])
+def test_incremental_refresh_matches_full_rebuild(postgres, queries):
+    before = _stored_costs()
+    _execute(*queries)
+    after = _stored_costs()
+    assert after != before
+    assert after == _full_rebuild()
+
+
+def test_costs_follow_csv_sync(postgres):
+    rows = read_csv(postgres, 'IngredientPrice.csv')
+    for row in rows:
+        if int(row['ingredientID']) == TOFU:
+            row['price'] = str(Decimal(row['price']) * 3)
+    write_csv(postgres, 'IngredientPrice.csv', rows)
+    reload_data(postgres)
+
+    for quarter in (1, 2, 3, 4):
+        assert {recipe_id: Decimal(str(total)) for recipe_id, (total, _) in _recipe_costs(quarter).items()} == \
+            quarter_costs(postgres, quarter)
@@ -0,0 +1,93 @@
+# tests/test_recipe_detail_service.py
+import asyncio
+
+from conftest import read_csv, write_csv
+from database.events import notify_data_reload
+from services.async_service import AsyncRecipeDetailService
+from services.recipe_detail_service import RecipeDetailService, _rows_to_details
+
+
+def _rename(data_dir, recipe_id, name):
+    rows = read_csv(data_dir, 'Recipe.csv')
+    for row in rows:
+        if int(row['recipeID']) == recipe_id:
+            row['recipeName'] = name
+    write_csv(data_dir, 'Recipe.csv', rows)
+
+
+def test_details_match_csv(data_dir):
+    recipe = next(row for row in read_csv(data_dir, 'Recipe.csv') if row['recipeID'] == '1')
+    nutrition = next(row for row in read_csv(data_dir, 'RecipeNutrition.csv') if row['recipe_ID'] == '1')
+    steps = next(row for row in read_csv(data_dir, 'CookingMethod.csv') if row['recipe_ID'] == '1')
+
+    details = RecipeDetailService.get_recipe_details(1)
+    assert details['recipe_name'] == recipe['recipeName']
+    assert details['cooking_steps'] == [value for key, value in steps.items() if key != 'recipe_ID' and value]
+    assert float(details['nutrition']['protein']) == float(nutrition['protein'])
+    assert RecipeDetailService.get_recipe_details(99999) is None
+
+
+def test_cached_details_are_copies(data_dir):
+    details = RecipeDetailService.get_recipe_details(1)
+    details['cooking_steps'].clear()
+    assert RecipeDetailService.get_recipe_details(1)['cooking_steps']
+    assert RecipeDetailService.cache_stats()['hits'] >= 1
+
+
+def test_batch_keeps_request_order_and_reports_missing(data_dir):
+    RecipeDetailService.get_recipe_details(2)
+    result = RecipeDetailService.get_recipe_details_many([3, 99999, 2, 3, 1])
+    assert [recipe['recipe_id'] for recipe in result['recipes']] == [3, 2, 3, 1]
+    assert result['missing'] == [99999]
+    assert result['recipes'][1] == RecipeDetailService.get_recipe_details(2)
+
+
+def test_batch_fetches_only_uncached_ids_in_one_call(data_dir, monkeypatch):
+    RecipeDetailService.get_recipe_details(2)
+    fetch = RecipeDetailService._fetch_recipe_details_many
+    calls = []
+
+    def counting_fetch(recipe_ids):
+        calls.append(list(recipe_ids))
+        return fetch(recipe_ids)
+
+    monkeypatch.setattr(RecipeDetailService, '_fetch_recipe_details_many', staticmethod(counting_fetch))
+    RecipeDetailService.get_recipe_details_many([1, 2, 3, 1, 99999])
+    assert calls == [[1, 3, 99999]]
+    RecipeDetailService.get_recipe_details_many([3, 1])
+    assert len(calls) == 1
+
+
+def test_batch_matches_single_lookups(catalog):
+    recipe_ids = [int(row['recipeID']) for row in read_csv(catalog, 'Recipe.csv')]
+    batch = RecipeDetailService.get_recipe_details_many(recipe_ids)
+    RecipeDetailService.invalidate_cache()
+    assert batch['recipes'] == [RecipeDetailService.get_recipe_details(recipe_id) for recipe_id in recipe_ids]
+    assert batch['missing'] == []
+
+
+def test_postgres_details_match_memory_engine(postgres, engine):
+    recipe_ids = [int(row['recipeID']) for row in read_csv(postgres, 'Recipe.csv')] + [99999]
+    assert RecipeDetailService._fetch_recipe_details_many(recipe_ids) == \
+        _rows_to_details(engine.recipe_details(recipe_ids))
+
+
+def test_reload_invalidates_cache(data_dir):
+    RecipeDetailService.get_recipe_details(1)
+    _rename(data_dir, 1, '바뀐 이름')
+    notify_data_reload(['Recipe'])
+    assert RecipeDetailService.get_recipe_details(1)['recipe_name'] == '바뀐 이름'
+
+
+def test_reload_in_another_process_is_seen_before_cache(data_dir, data_versions):
+    RecipeDetailService.get_recipe_details(1)
+    RecipeDetailService.get_recipe_details_many([2])
+    _rename(data_dir, 1, '다른 프로세스 이름')
+    _rename(data_dir, 2, '다른 프로세스 이름 2')
+    data_versions['recipe'] = 1
+    assert RecipeDetailService.get_recipe_details(1)['recipe_name'] == '다른 프로세스 이름'
+    assert RecipeDetailService.get_recipe_details_many([2])['recipes'][0]['recipe_name'] == '다른 프로세스 이름 2'
+
+    _rename(data_dir, 1, '비동기 이름')
+    data_versions['recipe'] = 2
+    assert asyncio.run(AsyncRecipeDetailService.get_recipe_details(1))['recipe_name'] == '비동기 이름'
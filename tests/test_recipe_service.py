@@ -0,0 +1,104 @@
+# tests/test_recipe_service.py
+import pytest
+
+from conftest import quarter_costs
+from services.pagination import InvalidCursorError
+from services.recipe_service import RecipeService, _build_page, _page_total
+
+
+def _walk(fetch, per_page):
+    """커서를 따라 마지막 페이지까지 읽는다 -> 페이지 목록"""
+    pages = [fetch(None, per_page)]
+    while pages[-1]['next_cursor']:
+        pages.append(fetch(pages[-1]['next_cursor'], per_page))
+    return pages
+
+
+def _ids(pages):
+    return [recipe['recipe_id'] for page in pages for recipe in page['recipes']]
+
+
+SEARCHES = {
+    'budget': (lambda cursor, per_page: RecipeService.search_recipes_by_budget_cursor(3000, 2, cursor, per_page),
+               lambda page, per_page: RecipeService.search_recipes_by_budget(3000, 2, page, per_page)),
+    'allergy': (lambda cursor, per_page: RecipeService.search_recipes_by_allergy_cursor('새우, 우유', 2, cursor, per_page),
+                lambda page, per_page: RecipeService.search_recipes_by_allergy('새우, 우유', 2, page, per_page)),
+    'all': (lambda cursor, per_page: RecipeService.get_all_recipes_cursor(2, cursor, per_page),
+            lambda page, per_page: RecipeService.get_all_recipes(2, page, per_page)),
+}
+
+
+@pytest.mark.parametrize('kind', sorted(SEARCHES))
+def test_cursor_pages_match_offset_pages(data_dir, kind):
+    by_cursor, by_page = SEARCHES[kind]
+    pages = _walk(by_cursor, 7)
+    offset_pages = [by_page(page, 7) for page in range(1, len(pages) + 1)]
+
+    assert _ids(pages) == _ids(offset_pages)
+    assert len(set(_ids(pages))) == len(_ids(pages))
+    assert [page['current_page'] for page in pages] == list(range(1, len(pages) + 1))
+    assert all(page['has_more'] for page in pages[:-1])
+    assert not pages[-1]['has_more']
+
+
+def test_budget_cursor_order(data_dir):
+    pages = _walk(SEARCHES['budget'][0], 5)
+    keys = [(recipe['total_price'], recipe['recipe_id']) for page in pages for recipe in page['recipes']]
+    assert keys
+    assert keys == sorted(keys, reverse=True)
+    assert all(price <= 3000 for price, _ in keys)
+
+
+def test_allergy_cursor_order(data_dir):
+    pages = _walk(SEARCHES['allergy'][0], 5)
+    keys = [(recipe['recipe_name'], recipe['recipe_id']) for page in pages for recipe in page['recipes']]
+    assert keys == sorted(keys)
+
+
+def test_cursor_from_another_search_is_rejected(data_dir):
+    cursor = RecipeService.get_all_recipes_cursor(2, per_page=3)['next_cursor']
+    with pytest.raises(InvalidCursorError):
+        RecipeService.search_recipes_by_budget_cursor(3000, 2, cursor)
+    with pytest.raises(InvalidCursorError):
+        RecipeService.search_recipes_by_budget_cursor(3000, 2, 'not-a-cursor')
+
+
+@pytest.mark.parametrize('kind', sorted(SEARCHES))
+def test_totals_match_rows(data_dir, kind):
+    by_cursor, by_page = SEARCHES[kind]
+    pages = _walk(by_cursor, 6)
+    total = len(_ids(pages))
+    assert {page['total_count'] for page in pages} == {total}
+    assert {by_page(page, 6)['total_count'] for page in range(1, len(pages) + 1)} == {total}
+
+
+def test_budget_total_matches_catalog(data_dir):
+    expected = sorted(((cost, recipe_id) for recipe_id, cost in quarter_costs(data_dir, 2).items()
+                       if cost <= 3000), reverse=True)
+    pages = _walk(SEARCHES['budget'][0], 10)
+    assert pages[0]['total_count'] == len(expected)
+    assert _ids(pages) == [recipe_id for _, recipe_id in expected]
+
+
+@pytest.mark.parametrize('count_mode', ['exact', 'estimate'])
+def test_total_past_last_page(data_dir, count_mode):
+    total = RecipeService.search_recipes_by_budget(3000, 2, count_mode=count_mode)['total_count']
+    result = RecipeService.search_recipes_by_budget(3000, 2, page=100, count_mode=count_mode)
+    assert result['recipes'] == []
+    assert result['total_count'] == total
+    assert not result['has_more']
+    assert RecipeService.get_all_recipes(2, page=100, count_mode=count_mode)['total_count'] == 92
+
+
+@pytest.mark.parametrize('count_mode', ['exact', 'estimate'])
+def test_empty_offset_page_needs_count_query(count_mode):
+    # PostgreSQL 경로: 마지막 페이지를 넘어선 OFFSET 은 OFFSET 을 개수로 쓰지 않고 따로 센다
+    assert _page_total([], count_mode, 40, None) is None
+    assert _page_total([], count_mode, 0, None) == 0
+    assert _page_total([], count_mode, 40, (1000, 1, 40)) == 40
+    assert _build_page('budget', [], 10, 40, 12, 2, count_mode)['total_count'] == 12
+
+
+def test_unknown_count_mode(data_dir):
+    with pytest.raises(ValueError):
+        RecipeService.search_recipes_by_budget(3000, 2, count_mode='guess')
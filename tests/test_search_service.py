@@ -0,0 +1,80 @@
+# tests/test_search_service.py
+import pytest
+
+from conftest import append_csv
+from database.events import notify_data_reload
+from services.search_service import SearchService
+from services.text_index import TextIndex
+
+
+def _ranked(rows, query):
+    """rows 로 만든 색인에서 query 의 (레시피 ID, 점수) 를 점수순으로"""
+    snapshot, docs, scores = TextIndex(loader=lambda: rows).search(query.split())
+    return sorted(zip(snapshot['recipe_ids'][docs].tolist(), scores.tolist()), key=lambda item: -item[1])
+
+
+FILLER = ('냄비에 물을 붓고 끓인다', '채소를 손질한다')
+
+
+def test_name_match_ranks_above_step_match():
+    rows = [(1, '된장국', FILLER), (2, '채소국', FILLER + ('된장을 푼다',)), (3, '무침', FILLER)]
+    ranked = _ranked(rows, '된장')
+    assert [recipe_id for recipe_id, _ in ranked] == [1, 2]
+
+
+def test_term_frequency_and_length_normalization():
+    rows = [(1, '볶음', ('양파를 볶는다', '양파를 더 넣는다')),
+            (2, '볶음', ('양파를 볶는다', '간장을 넣는다')),
+            (3, '볶음', ('양파를 볶는다', '간장을 넣는다', '설탕과 식초와 참기름과 깨를 넣고 오래 버무린다'))]
+    ranked = dict(_ranked(rows, '양파'))
+    assert ranked[1] > ranked[2] > ranked[3]
+
+
+def test_rare_terms_weigh_more():
+    rows = [(1, '국', ('소금을 넣는다', '후추를 넣는다')),
+            (2, '국', ('소금을 넣는다', '간장을 넣는다')),
+            (3, '국', ('소금을 넣는다', '간장을 넣는다')),
+            (4, '국', ('후추를 넣는다', '간장을 넣는다'))]
+    ranked = dict(_ranked(rows, '소금 후추'))
+    assert list(ranked) == [1]
+    # 모든 문서에 나오는 단어보다 한 문서에만 나오는 단어가 점수를 더 올린다
+    assert dict(_ranked(rows, '후추'))[1] > dict(_ranked(rows, '넣는'))[1]
+
+
+def test_every_term_must_appear_as_written():
+    rows = [(1, '김치찌개', ()), (2, '김치', ('찌개 국물을 낸다',)), (3, '치찌 개', ('김치',))]
+    assert [recipe_id for recipe_id, _ in _ranked(rows, '김치찌개')] == [1]
+    assert {recipe_id for recipe_id, _ in _ranked(rows, '김치 찌개')} == {1, 2}
+    assert _ranked(rows, '없는말') == []
+
+
+def test_service_orders_pages_and_filters(data_dir):
+    result = SearchService.search_recipes('새우', quarter=2, per_page=100)
+    recipes = result['recipes']
+    assert len(recipes) == result['total_count'] > 3
+    keys = [(-recipe['score'], recipe['recipe_id']) for recipe in recipes]
+    assert keys == sorted(keys)
+    assert all(any(h['spans'] for h in recipe['highlights']) for recipe in recipes)
+
+    pages = [SearchService.search_recipes('새우', quarter=2, page=page, per_page=3)
+             for page in range(1, (len(recipes) + 2) // 3 + 1)]
+    assert [recipe['recipe_id'] for page in pages for recipe in page['recipes']] == \
+        [recipe['recipe_id'] for recipe in recipes]
+
+    budget = sorted(recipe['total_price'] for recipe in recipes)[len(recipes) // 2]
+    cheap = SearchService.search_recipes('새우', quarter=2, budget=budget, per_page=100)['recipes']
+    assert [recipe['recipe_id'] for recipe in cheap] == \
+        [recipe['recipe_id'] for recipe in recipes if recipe['total_price'] <= budget]
+
+    # 검색어가 알레르기 재료 이름이면 그 재료를 쓰는 레시피는 모두 빠진다
+    safe = SearchService.search_recipes('새우', allergy='새우', per_page=100)['recipes']
+    assert len(safe) < len(recipes)
+    with pytest.raises(ValueError):
+        SearchService.search_recipes('새우', budget=1000)
+
+
+def test_new_recipe_is_searchable_after_reload(data_dir):
+    assert SearchService.search_recipes('시험용레시피')['total_count'] == 0
+    append_csv(data_dir, 'Recipe.csv', [(1001, '시험용레시피 볶음')])
+    notify_data_reload(['Recipe'])
+    assert [recipe['recipe_id'] for recipe in SearchService.search_recipes('시험용레시피')['recipes']] == [1001]
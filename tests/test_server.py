@@ -0,0 +1,117 @@
+# tests/test_server.py
+import http.client
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from server import make_server
+
+
+@pytest.fixture
+def start_server(data_dir):
+    """make_server 인자로 서버를 띄우고 (host, port) 를 돌려준다 - 테스트가 끝나면 닫는다"""
+    servers = []
+
+    def start(**options):
+        options.setdefault('threads', 2)
+        server = make_server('127.0.0.1', 0, quiet=True, **options)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server.server_address
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _request(address, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection(*address, timeout=5)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read()), response
+    finally:
+        conn.close()
+
+
+def test_routes_and_errors(start_server):
+    address = start_server()
+    status, result, response = _request(address, 'GET', '/recipes/budget?budget=5000&quarter=2&per_page=5')
+    assert status == 200 and 0 < len(result['recipes']) <= 5
+    assert all(recipe['total_price'] <= 5000 for recipe in result['recipes'])
+    assert response.getheader('Server-Timing').startswith('app;dur=')
+
+    assert _request(address, 'GET', '/recipes/1')[1]['recipe_id'] == 1
+    assert _request(address, 'GET', '/recipes/99999')[0] == 404
+    assert _request(address, 'GET', '/nowhere')[0] == 404
+    assert _request(address, 'POST', '/recipes/budget')[0] == 405
+    assert _request(address, 'GET', '/recipes/budget?budget=5000&quarter=7')[0] == 400
+    assert _request(address, 'GET', '/recipes?quarter=1&cursor=garbage')[0] == 400
+
+    status, result, _ = _request(address, 'POST', '/shopping-lists',
+                                 json.dumps({'recipes': [{'recipe_id': 1, 'servings': 2}]}))
+    assert status == 200 and result['recipes'][0]['servings'] == 2
+
+
+def test_large_responses_are_gzipped(start_server):
+    address = start_server(gzip_min_size=100)
+    conn = http.client.HTTPConnection(*address, timeout=5)
+    conn.request('GET', '/recipes?quarter=1&per_page=50', headers={'Accept-Encoding': 'gzip'})
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    assert response.getheader('Content-Encoding') == 'gzip'
+
+
+def test_oversized_body_is_rejected_and_connection_closed(start_server):
+    address = start_server()
+    conn = http.client.HTTPConnection(*address, timeout=5)
+    conn.putrequest('POST', '/shopping-lists')
+    conn.putheader('Content-Length', str(10 * 1024 * 1024))
+    conn.endheaders()
+    response = conn.getresponse()
+    assert response.status == 413
+    assert response.getheader('Connection') == 'close'
+    conn.close()
+
+
+def test_idle_keepalive_connection_is_closed(start_server):
+    address = start_server(keepalive_timeout=0.3)
+    conn = http.client.HTTPConnection(*address, timeout=5)
+    for _ in range(2):
+        conn.request('GET', '/health')
+        assert conn.getresponse().read()
+    # 다음 요청 없이 기다리면 서버가 커넥션을 닫는다 (스레드를 돌려받는다)
+    conn.sock.settimeout(5)
+    start = time.monotonic()
+    assert conn.sock.recv(1) == b''
+    assert time.monotonic() - start < 3
+    conn.close()
+
+
+def test_connections_beyond_queue_are_rejected(start_server):
+    address = start_server(threads=1, queue_size=1, keepalive_timeout=5)
+    # 하나는 스레드를 차지하고 하나는 대기열을 채운다
+    idle = [socket.create_connection(address, timeout=5) for _ in range(2)]
+    time.sleep(0.2)
+    status, result, response = _request(address, 'GET', '/health')
+    assert status == 503
+    assert response.getheader('Retry-After') == '1'
+    for sock in idle:
+        sock.close()
+    # 커넥션이 풀리면 다시 받는다
+    deadline = time.monotonic() + 5
+    while _request(address, 'GET', '/health')[0] != 200:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+def test_infinite_servings_are_a_bad_request(start_server):
+    address = start_server()
+    status, result, _ = _request(address, 'POST', '/shopping-lists',
+                                 '{"recipes": [{"recipe_id": 1, "servings": 1e999}]}')
+    assert status == 400 and 'error' in result
@@ -0,0 +1,99 @@
+# tests/test_shopping_list_service.py
+from decimal import Decimal
+
+import pytest
+
+from conftest import read_csv, write_csv
+from database.events import notify_data_reload
+from services.shopping_list_service import ShoppingListService
+
+
+def _usage(data_dir):
+    """{레시피 ID: {재료 ID: 사용량(g)}} - (레시피, 재료) 가 기본 키라 중복 행은 한 번만 센다"""
+    usage = {}
+    for row in read_csv(data_dir, 'RecipeIngredientInfo.csv'):
+        usage.setdefault(int(row['recipeID']), {})[int(row['ingredientID'])] = Decimal(row['amount'])
+    return usage
+
+
+def _prices(data_dir):
+    return {(int(row['ingredientID']), int(row['quarter'])): Decimal(row['price'])
+            for row in read_csv(data_dir, 'IngredientPrice.csv')}
+
+
+def _shared_recipes(usage):
+    """재료를 하나 이상 함께 쓰는 레시피 두 개"""
+    recipe_ids = sorted(usage)
+    return next((a, b) for a in recipe_ids for b in recipe_ids if a < b and set(usage[a]) & set(usage[b]))
+
+
+def test_amounts_are_summed_per_ingredient(data_dir):
+    usage = _usage(data_dir)
+    first, second = _shared_recipes(usage)
+    result = ShoppingListService.build_shopping_list({first: 2, second: 1})
+
+    expected = {}
+    for recipe_id, servings in ((first, 2), (second, 1)):
+        for ingredient_id, amount in usage[recipe_id].items():
+            expected[ingredient_id] = expected.get(ingredient_id, 0) + amount * servings
+    assert {item['ingredient_id']: item['amount'] for item in result['ingredients']} == \
+        {ingredient_id: float(amount) for ingredient_id, amount in expected.items()}
+    names = [(item['name'], item['ingredient_id']) for item in result['ingredients']]
+    assert names == sorted(names)
+
+
+def test_quarter_totals_roll_up_recipe_costs(data_dir):
+    usage = _usage(data_dir)
+    prices = _prices(data_dir)
+    first, second = _shared_recipes(usage)
+    result = ShoppingListService.build_shopping_list([(first, 1.5), second])
+
+    for total in result['quarters']:
+        expected = sum(amount * servings * prices[ingredient_id, total['quarter']]
+                       for recipe_id, servings in ((first, Decimal('1.5')), (second, 1))
+                       for ingredient_id, amount in usage[recipe_id].items())
+        assert total['total_price'] == pytest.approx(float(expected), abs=0.01)
+        assert total['missing_ingredients'] == []
+    cheapest = min(result['quarters'], key=lambda total: total['total_price'])
+    assert result['cheapest_quarter'] == cheapest['quarter']
+
+    single = ShoppingListService.build_shopping_list([first], quarter=2)
+    assert [total['quarter'] for total in single['quarters']] == [2]
+
+
+def test_duplicates_and_unknown_recipes(data_dir):
+    result = ShoppingListService.build_shopping_list([(1, 1), (1, 2), (99999, 1)])
+    assert [(recipe['recipe_id'], recipe['servings']) for recipe in result['recipes']] == [(1, 3.0)]
+    assert result['missing_recipes'] == [99999]
+    with pytest.raises(ValueError):
+        ShoppingListService.build_shopping_list({1: 0})
+    with pytest.raises(ValueError):
+        ShoppingListService.build_shopping_list({1: 'two'})
+
+
+@pytest.mark.parametrize('servings', [float('inf'), float('-inf'), float('nan'), 1e999, -1, 10001])
+def test_non_finite_or_huge_servings_are_rejected(data_dir, servings):
+    with pytest.raises(ValueError):
+        ShoppingListService.build_shopping_list([(1, servings)])
+
+
+def test_merged_servings_are_capped(data_dir):
+    assert ShoppingListService.build_shopping_list([(1, 5000), (1, 5000)])['recipes'][0]['servings'] == 10000
+    with pytest.raises(ValueError):
+        ShoppingListService.build_shopping_list([(1, 1e308), (1, 1e308)])
+
+
+def test_unpriced_quarter_is_reported(data_dir):
+    usage = _usage(data_dir)
+    ingredient_id = min(usage[1])
+    write_csv(data_dir, 'IngredientPrice.csv',
+              [row for row in read_csv(data_dir, 'IngredientPrice.csv')
+               if not (int(row['ingredientID']) == ingredient_id and row['quarter'] == '1')])
+    notify_data_reload(['IngredientPrice'])
+
+    result = ShoppingListService.build_shopping_list([1])
+    by_quarter = {total['quarter']: total for total in result['quarters']}
+    item = next(item for item in result['ingredients'] if item['ingredient_id'] == ingredient_id)
+    assert by_quarter[1]['missing_ingredients'] == [item['name']]
+    assert 1 not in [price['quarter'] for price in item['prices']]
+    assert result['cheapest_quarter'] != 1
@@ -0,0 +1,139 @@
+# tests/test_statements.py
+# 준비된 문장 - 쿼리 변환/준비 흐름은 가짜 커서로, 실제 PREPARE/EXECUTE 는 PostgreSQL 에서 확인한다
+import pytest
+from psycopg2 import errors, extensions
+
+from database.db_connector import get_connection
+from database.statements import StatementRegistry, server_plan_stats, to_server_params
+
+QUERY = "SELECT recipeName FROM Recipe WHERE recipeID = %s"
+
+
+class FakeConnection:
+    def __init__(self):
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+        self.rollbacks = 0
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeCursor:
+    """실행한 쿼리를 기록하고, fail 에 든 접두어로 시작하는 쿼리는 한 번 실패시킨다"""
+    def __init__(self, connection=None):
+        self.connection = connection or FakeConnection()
+        self.executed = []
+        self.fail = {}
+
+    def execute(self, query, params=None):
+        self.executed.append(query.split(' (')[0] if query.startswith('EXECUTE') else query.split(' AS ')[0])
+        for prefix, error in list(self.fail.items()):
+            if query.startswith(prefix):
+                del self.fail[prefix]
+                raise error
+
+
+def test_to_server_params_numbers_placeholders():
+    assert to_server_params("SELECT %s, %s WHERE name LIKE '%%두부'") == ("SELECT $1, $2 WHERE name LIKE '%두부'", 2)
+    assert to_server_params("SELECT 1") == ("SELECT 1", 0)
+    assert to_server_params("SELECT %(name)s") == (None, 0)
+
+
+def test_statement_names_are_stable_across_processes():
+    first, second = StatementRegistry(), StatementRegistry()
+    assert first.statement(QUERY).name == second.statement(QUERY).name
+    assert first.statement(QUERY).name != first.statement(QUERY + " LIMIT 1").name
+
+
+def test_prepares_once_per_connection():
+    registry = StatementRegistry(enabled=True)
+    name = registry.statement(QUERY).name
+    cur = FakeCursor()
+    registry.execute(cur, QUERY, (1,))
+    registry.execute(cur, QUERY, (2,))
+    assert cur.executed == [f"PREPARE {name}", f"EXECUTE {name}", f"EXECUTE {name}"]
+
+    other = FakeCursor()
+    registry.execute(other, QUERY, (3,))
+    assert other.executed == [f"PREPARE {name}", f"EXECUTE {name}"]
+    stats = registry.stats()[0]
+    assert (stats['prepares'], stats['executions'], stats['hits']) == (2, 3, 1)
+
+
+@pytest.mark.parametrize('enabled, params, status', [
+    (False, (1,), extensions.TRANSACTION_STATUS_IDLE),
+    (True, (1, 2), extensions.TRANSACTION_STATUS_IDLE),
+    # 트랜잭션 중간에는 PREPARE 하지 않는다 (실패하면 앞선 작업까지 버려진다)
+    (True, (1,), extensions.TRANSACTION_STATUS_INTRANS),
+])
+def test_falls_back_to_plain_execute(enabled, params, status):
+    registry = StatementRegistry(enabled=enabled)
+    cur = FakeCursor()
+    cur.connection.status = status
+    registry.execute(cur, QUERY, params)
+    assert cur.executed == [QUERY]
+    assert registry.stats()[0]['fallbacks'] == 1
+
+
+def test_stale_statement_is_prepared_again():
+    registry = StatementRegistry(enabled=True)
+    name = registry.statement(QUERY).name
+    cur = FakeCursor()
+    registry.execute(cur, QUERY, (1,))
+    cur.executed.clear()
+
+    # 서버에서 문장이 사라졌으면 (DISCARD ALL 등) 이번에는 일반 실행, 다음 호출에서 다시 준비한다
+    cur.fail['EXECUTE'] = errors.InvalidSqlStatementName()
+    registry.execute(cur, QUERY, (1,))
+    registry.execute(cur, QUERY, (1,))
+    assert cur.executed == [f"EXECUTE {name}", f"DEALLOCATE {name}", QUERY, f"PREPARE {name}", f"EXECUTE {name}"]
+    assert registry.stats()[0]['errors'] == 1
+
+
+def test_unpreparable_query_switches_to_plain_execute():
+    registry = StatementRegistry(enabled=True)
+    cur = FakeCursor()
+    cur.fail['PREPARE'] = errors.IndeterminateDatatype()
+    registry.execute(cur, "SELECT %s", (1,))
+    registry.execute(cur, "SELECT %s", (1,))
+    assert cur.executed == [f"PREPARE {registry.statement('SELECT %s').name}", "SELECT %s", "SELECT %s"]
+    assert registry.statement("SELECT %s").preparable is False
+
+
+def test_prepared_results_match_plain_execute(postgres):
+    registry = StatementRegistry(enabled=True)
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        plain = []
+        for recipe_id in (1, 2, 99999):
+            cur.execute(QUERY, (recipe_id,))
+            plain.append(cur.fetchall())
+        conn.rollback()
+
+        prepared = []
+        for recipe_id in (1, 2, 99999):
+            registry.execute(cur, QUERY, (recipe_id,))
+            prepared.append(cur.fetchall())
+        assert prepared == plain
+        assert registry.statement(QUERY).name in {item['name'] for item in server_plan_stats(conn)}
+
+        conn.rollback()
+        cur.execute("DEALLOCATE ALL")
+        conn.commit()
+        # 문장이 사라진 커넥션: 이번에는 일반 실행, 풀에 반환된 뒤(트랜잭션 종료) 다음 호출에서 다시 준비한다
+        registry.execute(cur, QUERY, (1,))
+        assert cur.fetchall() == plain[0]
+        conn.rollback()
+        registry.execute(cur, QUERY, (1,))
+        assert cur.fetchall() == plain[0]
+        stats = registry.stats()[0]
+        assert (stats['prepares'], stats['errors'], stats['fallbacks']) == (2, 1, 1)
+    finally:
+        conn.rollback()
+        cur.close()
+        conn.close()
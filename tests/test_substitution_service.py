@@ -0,0 +1,75 @@
+# tests/test_substitution_service.py
+from decimal import Decimal
+
+import pytest
+
+from conftest import append_csv, read_csv
+from database.events import notify_data_reload
+from services.substitution_service import SubstitutionService
+
+
+def _catalog(data_dir, quarter):
+    """(재료 ID -> 대체 그룹, 재료 ID -> 분기 가격, 레시피 ID -> 재료 ID 집합)"""
+    groups = {int(row['ingredientID']): row['group_name'] for row in read_csv(data_dir, 'IngredientSubstitute.csv')}
+    prices = {int(row['ingredientID']): Decimal(row['price'])
+              for row in read_csv(data_dir, 'IngredientPrice.csv') if int(row['quarter']) == quarter}
+    recipes = {}
+    for row in read_csv(data_dir, 'RecipeIngredientInfo.csv'):
+        recipes.setdefault(int(row['recipeID']), set()).add(int(row['ingredientID']))
+    return groups, prices, recipes
+
+
+def test_swaps_use_cheaper_members_of_the_same_group(data_dir):
+    groups, prices, recipes = _catalog(data_dir, 2)
+    suggestions = SubstitutionService.suggest_substitutions_many(sorted(recipes), 2)
+    assert any(suggestion['swaps'] for suggestion in suggestions.values())
+
+    for recipe_id, suggestion in suggestions.items():
+        swaps = suggestion['swaps']
+        assert len(swaps) <= 3
+        assert [swap['cost'] for swap in swaps] == sorted((swap['cost'] for swap in swaps), reverse=True)
+        chosen = [swap['substitute']['ingredient_id'] for swap in swaps]
+        # 대체 재료는 레시피에 없던 재료이고 한 레시피에서 두 번 고르지 않는다
+        assert len(set(chosen)) == len(chosen)
+        assert not set(chosen) & recipes[recipe_id]
+        for swap in swaps:
+            for option in [swap['substitute']] + swap['alternatives']:
+                assert groups[option['ingredient_id']] == groups[swap['ingredient_id']]
+                assert prices[option['ingredient_id']] < prices[swap['ingredient_id']]
+        savings = sum(swap['substitute']['savings'] for swap in swaps)
+        assert suggestion['new_total_price'] == pytest.approx(suggestion['total_price'] - savings, abs=0.01 * len(swaps) + 0.01)
+
+
+def test_budget_stops_swapping(data_dir):
+    _, _, recipes = _catalog(data_dir, 2)
+    suggestions = SubstitutionService.suggest_substitutions_many(sorted(recipes), 2)
+    recipe_id, suggestion = next((recipe_id, suggestion) for recipe_id, suggestion in suggestions.items()
+                                 if len(suggestion['swaps']) >= 2)
+    budget = suggestion['total_price'] - suggestion['swaps'][0]['substitute']['savings']
+
+    limited = SubstitutionService.suggest_substitutions(recipe_id, 2, budget=budget)
+    assert len(limited['swaps']) == 1
+    assert limited['within_budget']
+    assert SubstitutionService.suggest_substitutions(recipe_id, 2, max_swaps=1)['swaps'] == limited['swaps']
+
+
+def test_same_substitute_is_not_chosen_twice(data_dir):
+    # 같은 그룹의 비싼 재료 두 개 - 두 번째 재료는 첫 번째가 고른 가장 싼 재료 대신 다음 후보로 바뀐다
+    append_csv(data_dir, 'IngredientName.csv', [(9001, '시험재료가'), (9002, '시험재료나'),
+                                                (9003, '시험재료다'), (9004, '시험재료라')])
+    append_csv(data_dir, 'IngredientSubstitute.csv', [(ingredient_id, '시험그룹') for ingredient_id in range(9001, 9005)])
+    append_csv(data_dir, 'IngredientPrice.csv', [(9001, 2, 10), (9002, 2, 9), (9003, 2, 1), (9004, 2, 2)])
+    append_csv(data_dir, 'Recipe.csv', [(1001, '시험 레시피')])
+    append_csv(data_dir, 'RecipeIngredientInfo.csv', [(1001, 9001, 100), (1001, 9002, 100)])
+    notify_data_reload(['IngredientName', 'IngredientSubstitute', 'IngredientPrice', 'Recipe', 'RecipeIngredient_info'])
+
+    suggestion = SubstitutionService.suggest_substitutions(1001, 2)
+    assert [(swap['ingredient_id'], swap['substitute']['ingredient_id']) for swap in suggestion['swaps']] == \
+        [(9001, 9003), (9002, 9004)]
+    assert suggestion['total_price'] == 1900
+    assert suggestion['new_total_price'] == 300
+
+
+def test_unknown_recipe_or_quarter(data_dir):
+    assert SubstitutionService.suggest_substitutions(99999, 2) is None
+    assert SubstitutionService.suggest_substitutions_many([1], 9) == {}
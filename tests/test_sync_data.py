@@ -0,0 +1,115 @@
+# tests/test_sync_data.py
+# 증분 동기화 - 바뀐 행 골라내기는 DB 없이, 반영 결과가 전체 재적재와 같은지는 PostgreSQL 에서 확인한다
+from conftest import append_csv, query_db, read_csv, write_csv
+from database.db_connector import get_connection
+from scripts.bulk_load import LOAD_SPECS, key_positions, row_hash, row_key
+from scripts.init_db import init_cooking_step_table, init_database, sync_database
+from scripts.sync_data import _changed_rows
+
+
+def _dump():
+    """적재 대상 테이블 + recipe_cost 전체 내용"""
+    tables = {}
+    for table, spec in LOAD_SPECS.items():
+        columns = ', '.join(column for _, column, _ in spec['columns'])
+        tables[table] = sorted(query_db(f"SELECT {columns} FROM {table}"))
+    tables['recipe_cost'] = sorted(query_db("SELECT recipeID, quarter, total_cost, ingredients_detail FROM recipe_cost"))
+    return tables
+
+
+def _edit_csv(data_dir):
+    """수정 1, 추가 1, 삭제 1 씩 - 레시피/가격/조리 단계"""
+    recipes = read_csv(data_dir, 'Recipe.csv')
+    recipes[0]['recipeName'] = '이름 바꾼 레시피'
+    write_csv(data_dir, 'Recipe.csv', recipes)
+    append_csv(data_dir, 'Recipe.csv', [(5001, '새 레시피')])
+    append_csv(data_dir, 'RecipeIngredientInfo.csv', [(5001, 14, 30)])
+
+    prices = read_csv(data_dir, 'IngredientPrice.csv')
+    write_csv(data_dir, 'IngredientPrice.csv', prices[1:])
+
+    steps = read_csv(data_dir, 'CookingMethod.csv')
+    steps[0]['MANUAL01'] = ''
+    write_csv(data_dir, 'CookingMethod.csv', steps)
+
+
+def _execute(query, params=None):
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(query, params)
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+
+
+def test_changed_rows_pass_only_new_or_changed_keys():
+    positions = key_positions('Recipe')
+    old = [(1, '두부찜', 2), (2, '계란찜', 3), (3, '김치찌개', 4)]
+    stored = {row_key(positions, row): row_hash(row) for row in old}
+    rows = [(1, '두부찜', 2), (2, '계란말이', 3), (4, '된장국', 4)]
+    result = {'seen': set(), 'hashes': {}}
+
+    assert list(_changed_rows('Recipe', rows, stored, result)) == rows[1:]
+    assert result['seen'] == {'1', '2', '4'}
+    assert result['hashes'] == {row_key(positions, row): row_hash(row) for row in rows}
+
+
+def test_changed_rows_stage_every_repeat_of_a_key():
+    positions = key_positions('Recipe')
+    stored = {'1': row_hash((1, '두부찜', 0))}
+    rows = [(1, '두부찜', 2), (1, '다른 이름', 3), (1, '두부찜', 4)]
+    result = {'seen': set(), 'hashes': {}}
+
+    # 변경 없는 첫 행은 건너뛰지만 뒤에 다시 나온 행은 모두 스테이징해 마지막 행이 이기게 한다
+    assert list(_changed_rows('Recipe', rows, stored, result)) == rows[1:]
+    assert result['hashes'] == {row_key(positions, rows[-1]): row_hash(rows[-1])}
+
+
+def test_sync_matches_full_reload(postgres):
+    _edit_csv(postgres)
+    stats = sync_database(postgres)
+    synced = _dump()
+
+    assert stats['Recipe'] == {**stats['Recipe'], 'inserted': 1, 'updated': 1, 'deleted': 0}
+    assert stats['RecipeIngredient_info']['inserted'] == 1
+    assert stats['IngredientPrice']['deleted'] == 1
+    # 첫 단계를 비우면 남은 단계 번호가 하나씩 당겨지고 마지막 단계가 지워진다
+    assert stats['cooking_step']['deleted'] == 1 and stats['cooking_step']['updated'] > 0
+    assert stats['IngredientName'] == {**stats['IngredientName'], 'inserted': 0, 'updated': 0, 'deleted': 0}
+
+    init_database(postgres)
+    init_cooking_step_table(postgres)
+    assert synced == _dump()
+
+
+def test_sync_without_changes_touches_nothing(postgres):
+    before = query_db("SELECT recipeID, xmin::text FROM Recipe ORDER BY recipeID")
+    stats = sync_database(postgres)
+    assert all(stat['inserted'] == stat['updated'] == stat['deleted'] == 0 for stat in stats.values())
+    assert query_db("SELECT recipeID, xmin::text FROM Recipe ORDER BY recipeID") == before
+
+
+def test_sync_keeps_users_and_existing_triggers(postgres):
+    _execute("INSERT INTO users (user_name, password, allergy) VALUES ('tester', 'pw', '새우')")
+    triggers = query_db("SELECT tgname, oid FROM pg_trigger WHERE NOT tgisinternal ORDER BY tgname")
+
+    _edit_csv(postgres)
+    sync_database(postgres)
+
+    assert query_db("SELECT user_name, allergy FROM users") == [('tester', '새우')]
+    assert query_db("SELECT tgname, oid FROM pg_trigger WHERE NOT tgisinternal ORDER BY tgname") == triggers
+
+
+def test_sync_without_manifest_compares_every_row(postgres):
+    # 이전 버전으로 적재된 DB (manifest 없음) - 전체 행을 스테이징하고 CSV 에 없는 행을 지운다
+    _execute("DELETE FROM load_manifest")
+    _edit_csv(postgres)
+    sync_database(postgres)
+    synced = _dump()
+
+    init_database(postgres)
+    init_cooking_step_table(postgres)
+    assert synced == _dump()
+    assert sync_database(postgres)['Recipe']['inserted'] == 0